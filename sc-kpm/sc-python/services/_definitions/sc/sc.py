@@ -14,6 +14,9 @@ class ScMemoryContext:
   def Create(self, name: str):
     return ScMemoryContext()
 
+  def Destroy(self):
+    pass
+
   def CreateNode(self, nodeType: ScType) -> ScAddr:
     return ScAddr()
 
@@ -56,6 +59,9 @@ class ScMemoryContext:
   def HelperResolveSystemIdtf(self, idtf: str, elType: ScType=ScType.Unknown) -> ScAddr:
     return ScAddr()
 
+  def HelperResolveSystemIdtfs(self, idtfs: [str], types: [ScType]=None) -> [ScAddr]:
+    return []
+
   def HelperSetSystemIdtf(self, idtf: str, addr: ScAddr) -> bool:
     return False
 
@@ -83,6 +89,14 @@ def ScAddrFromHash(hash) -> ScAddr:
   return ScAddr()
 
 
+def getScConfigValue(group: str, key: str) -> str:
+  return ''
+
+
+def getScStorageGeneration() -> str:
+  return ''
+
+
 class ScResult(Enum):
   Ok = 0
   Error = 1
@@ -104,4 +118,45 @@ class ScKeynodes:
 
   @staticmethod
   def GetResultCodeByAddr(addr: ScAddr) -> ScResult:
-    return ScResult.Ok
\ No newline at end of file
+    return ScResult.Ok
+class ScSetImpl:
+  @staticmethod
+  def HasMany(ctx: ScMemoryContext, setAddr: ScAddr, elements: [ScAddr]) -> [bool]:
+    return []
+
+  @staticmethod
+  def AddMany(ctx: ScMemoryContext, setAddr: ScAddr, elements: [ScAddr]) -> [bool]:
+    return []
+
+  @staticmethod
+  def RemoveMany(ctx: ScMemoryContext, setAddr: ScAddr, elements: [ScAddr]) -> [bool]:
+    return []
+
+  @staticmethod
+  def Union(ctx: ScMemoryContext, setAddr: ScAddr, otherAddr: ScAddr, targetAddr: ScAddr) -> [ScAddr]:
+    return []
+
+  @staticmethod
+  def Intersect(ctx: ScMemoryContext, setAddr: ScAddr, otherAddr: ScAddr, targetAddr: ScAddr) -> [ScAddr]:
+    return []
+
+  @staticmethod
+  def Difference(ctx: ScMemoryContext, setAddr: ScAddr, otherAddr: ScAddr, targetAddr: ScAddr) -> [ScAddr]:
+    return []
+
+  @staticmethod
+  def Count(ctx: ScMemoryContext, setAddr: ScAddr, elType: ScType) -> int:
+    return 0
+
+  @staticmethod
+  def CountRelation(ctx: ScMemoryContext, addr: ScAddr, relAddr: ScAddr, elType: ScType) -> int:
+    return 0
+
+  @staticmethod
+  def GetRelationPairs(ctx: ScMemoryContext, relAddr: ScAddr) -> [tuple]:
+    return []
+
+class ScHelperImpl:
+  @staticmethod
+  def UpdateStructureValues(ctx: ScMemoryContext, structAddr: ScAddr, values: [tuple]) -> bool:
+    return False
@@ -10,6 +10,15 @@ class ScIterator3:
   def Get(self, idx: int) -> ScAddr:
     return ScAddr()
 
+  def NextBatch(self, count: int) -> [tuple]:
+    return []
+
+  def NextBatchAt(self, count: int, idx: int) -> [ScAddr]:
+    return []
+
+  def NextBatchHashes(self, count: int) -> [int]:
+    return []
+
 
 class ScIterator5:
   def Next(self) -> bool:
@@ -19,4 +28,13 @@ class ScIterator5:
     return False
 
   def Get(self, idx: int) -> ScAddr:
-    return ScAddr()
\ No newline at end of file
+    return ScAddr()
+
+  def NextBatch(self, count: int) -> [tuple]:
+    return []
+
+  def NextBatchAt(self, count: int, idx: int) -> [ScAddr]:
+    return []
+
+  def NextBatchHashes(self, count: int) -> [int]:
+    return []
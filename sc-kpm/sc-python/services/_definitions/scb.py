@@ -6,4 +6,9 @@ class ScPythonEventType(Enum):
     ContentChanged = 2
     EraseElement = 3
     RemoveInputEdge = 4
-    RemoveOutputEdge = 5
\ No newline at end of file
+    RemoveOutputEdge = 5
+
+class ScPythonEventFilter:
+    other_type = None
+    edge_type = None
+    other_in_class = None
@@ -1,7 +1,10 @@
-from .sc_keynodes import ScKeynodes
+from .sc_keynodes import ScKeynodes, ScKeynodeRegistry
 from .sc_module import ScModule
+from .sc_module_async import AsyncScModule
+from .sc_task_queue import ScTaskQueue, ScQueuePolicy, ScTaskPriority
 from .sc_exception import *
-from .sc_event import ScEventManager, ScEvent, ScEventParams
+from .sc_event import ScEventManager, ScEvent, ScEventParams, ScEventFilter
+from .sc_cache import ScEventCache
 from .sc_set import *
 from .sc_agent import *
 from .sc_helper import *
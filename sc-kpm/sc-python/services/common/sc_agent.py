@@ -1,8 +1,17 @@
 from enum import Enum
 
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+import time
+import traceback
+
+from common.sc_cache import ScEventCache
 from common.sc_keynodes import ScKeynodes
 from common.sc_set import ScSet
 from common.sc_event import ScEventParams
+from common.sc_task_queue import ScTaskPriority
 
 from sc import *
 from scb import *
@@ -26,31 +35,48 @@ class ScAgent:
   kResultErrorNoWriteRights = 'sc_result_error_no_write_rights'
   kResultErrorNoReadRights = 'sc_result_error_no_read_rights'
 
+  # maximum number of concurrent runs of this agent in module executor.
+  # 0 - agent runs in main thread of module
+  max_concurrency = 0
+  # if True, then runs in module executor are processed one by one in order of events
+  keep_order = False
+  # `ScTaskPriority` of events of this agent in module queue
+  priority = ScTaskPriority.Normal
+
   def __init__(self, module):
     self.module = module
     self.evt = None
     self.keynodes = ScKeynodes(module.ctx)
 
-  def Register(self, addr, evt_type):
+  def Register(self, addr, evt_type, event_filter=None):
     """Register this agent to a specified event
     addr - ScAddr of sc-element to subscribe event
     evt_type - on of ScPythonEventType values (type of event)
+    event_filter - `ScEventFilter`, that is checked in sc-memory before event comes into python.
+      Use it instead of `CheckImpl` for simple checks
     """
     assert self.evt == None
     self.evt = self.module.events.CreateEventInternal(
-        addr, evt_type, self._run)
+        addr, evt_type, self._run, self.priority, event_filter=event_filter)
     
     self.module.log.info(self.__class__.__name__ + ' registered')
 
   def Unregister(self):
-    self.module.events.DestroyEvent(self.evt)
-    self.evt = None
+    if self.evt is not None:
+      self.module.events.DestroyEvent(self.evt)
+      self.evt = None
+
+    if self.max_concurrency > 0 or self.keep_order:
+      self.module.executor.Remove(self)
 
     self.module.log.info(self.__class__.__name__ + ' unregistered')
 
   def RunImpl(self, evt: ScEventParams) -> ScResult:
     """Should be override and do agent logic.
-    It should return one of ScAgent.Status values
+    It should return one of ScAgent.Status values.
+    It can be overrided with `async def`, then it runs with `module.RunCoroutine`.
+    Also it can return `concurrent.futures.Future` of result, then run is recorded
+    when it's resolved
 
     evt - ScEventParams instance
     """
@@ -67,13 +93,81 @@ class ScAgent:
   def _run(self, evt: ScEventParams):
     """Just for internal usage
     """
-    if self.CheckImpl(evt):
-      self.module.log.info(self.__class__.__name__ + ' emited')
-      result = self.RunImpl(evt)
-      if result != ScResult.Ok:
-        self.module.log.warning(self.__class__.__name__ + ' finished with error')
-      else:
-        self.module.log.info(self.__class__.__name__ + ' finished')
+    if self.max_concurrency > 0 or self.keep_order:
+      self.module.executor.Submit(self, self._run_impl, evt)
+    else:
+      self._run_impl(evt)
+
+  def _run_impl(self, evt: ScEventParams):
+    name = self.__class__.__name__
+    stats = self.module.agent_stats if self.module.collect_agent_stats else None
+
+    if not self.CheckImpl(evt):
+      if stats is not None:
+        stats.AddRejection(name)
+      return
+
+    self.module.log.info(name + ' emited')
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+      result = self.module.agent_stats.Call(name, self.RunImpl, evt)
+    except:
+      if stats is not None:
+        stats.AddException(name)
+      raise
+
+    if asyncio.iscoroutine(result):
+      self.module.RunCoroutine(self._run_async(result, wall_start))
+    elif isinstance(result, concurrent.futures.Future):
+      result.add_done_callback(lambda future: self._on_run_done(future, wall_start))
+    else:
+      self._log_result(result)
+      if stats is not None:
+        stats.AddRun(
+            name,
+            ScAgent._result_name(result),
+            time.perf_counter() - wall_start,
+            time.thread_time() - cpu_start)
+
+  async def _run_async(self, coro, wall_start):
+    name = self.__class__.__name__
+    stats = self.module.agent_stats if self.module.collect_agent_stats else None
+    try:
+      result = await coro
+    except:
+      if stats is not None:
+        stats.AddException(name)
+      raise
+
+    self._log_result(result)
+    if stats is not None:
+      stats.AddRun(name, ScAgent._result_name(result), time.perf_counter() - wall_start)
+
+  def _on_run_done(self, future, wall_start):
+    name = self.__class__.__name__
+    stats = self.module.agent_stats if self.module.collect_agent_stats else None
+    ex = future.exception()
+    if ex is not None:
+      self.module.log.error('{} failed: {}'.format(name, ex))
+      if stats is not None:
+        stats.AddException(name)
+      return
+
+    result = future.result()
+    self._log_result(result)
+    if stats is not None:
+      stats.AddRun(name, ScAgent._result_name(result), time.perf_counter() - wall_start)
+
+  @staticmethod
+  def _result_name(result) -> str:
+    return getattr(result, 'name', str(result))
+
+  def _log_result(self, result):
+    if result != ScResult.Ok:
+      self.module.log.warning(self.__class__.__name__ + ' finished with error')
+    else:
+      self.module.log.info(self.__class__.__name__ + ' finished')
 
 
 class ScAgentCommand(ScAgent):
@@ -81,97 +175,271 @@ class ScAgentCommand(ScAgent):
   It check if initiated command class is equal to specified one,
   then run it. You doesn't need to call register function for this
   type of agents
+
+  CPU-bound commands can be run in a worker process of module (see `offload_func`)
   """
 
+  # function that runs in a worker process instead of `DoCommand`. It receives
+  # payload made by `MakeOffloadPayload` and its result passes into `ApplyOffloadResult`.
+  # It should be picklable, so define it in a module that doesn't import `sc` or `scb`
+  offload_func = None
+  # indices of command parameters that are passed into `offload_func`
+  offload_params = []
+
+  # if True, then successful results of commands are memoized by command parameters.
+  # Next commands with the same parameters are linked to the memoized result structure
+  # without `DoCommand` call. Use it just for commands, that depend on parameters only
+  memoize = False
+  # maximum number of memoized results
+  memoize_max_size = 128
+
+  # number of `rrel_<index>` keynodes, that are resolved once for all command agents.
+  # Attributes with greater index are resolved by their system identifier on demand
+  kMaxParams = 20
+  # number of stored attributes, that aren't `rrel_<index>`, after that they are forgotten
+  kMaxUnknownAttrs = 1024
+
+  # templates and keynodes, that are shared by all command agents
+  _result_templ = None
+  _rrel_addrs = None
+  _rrel_indices = None
+  _unknown_attrs = set()
+  _shared_lock = threading.Lock()
+
   def __init__(self, module, cmd_class_addr):
     ScAgent.__init__(self, module)
     self.cmd_class = cmd_class_addr
-    self.cmd_addr = ScAddr()
-    self.result_set = None
 
-    self.Register(
-        self.keynodes[ScAgent.kCmdInitiated],
-        ScPythonEventType.AddOutputEdge)
+    # command state is stored per context, so concurrent runs (async ones) don't mix it
+    self._cmd_addr = contextvars.ContextVar('cmd_addr', default=ScAddr())
+    self._result_set = contextvars.ContextVar('result_set', default=None)
+
+    # memoized results: parameters -> (result structure, result code)
+    self.memo = ScEventCache(module.events, self.memoize_max_size) if self.memoize else None
+
+    # all command agents of module share one event, that routes commands by class
+    self.module.command_dispatcher.Add(self)
+    self.module.log.info(self.__class__.__name__ + ' registered')
+
+  @property
+  def cmd_addr(self) -> ScAddr:
+    return self._cmd_addr.get()
+
+  @cmd_addr.setter
+  def cmd_addr(self, value: ScAddr):
+    self._cmd_addr.set(value)
+
+  @property
+  def result_set(self) -> ScSet:
+    return self._result_set.get()
+
+  @result_set.setter
+  def result_set(self, value: ScSet):
+    self._result_set.set(value)
+
+  def Unregister(self):
+    self.module.command_dispatcher.Remove(self)
+    if self.memo is not None:
+      self.memo.Clear()
+    ScAgent.Unregister(self)
 
   def CheckImpl(self, evt):
-    """Check if type of initiated command is equal to specified one
+    """Type of initiated command is checked by `ScAgentCommandDispatcher`,
+    so commands of other types don't come here
     """
-    return self.module.ctx.HelperCheckEdge(
-        self.cmd_class,
-        evt.other_addr,
-        ScType.EdgeAccessConstPosPerm)
+    return True
 
   def RunImpl(self, evt):
-    self.cmd_addr = evt.other_addr
-    assert self.cmd_addr.IsValid()
+    self.cmd_addr = cmd_addr = evt.other_addr
+    assert cmd_addr.IsValid()
 
     # change state to a progress
     progress_edge = evt.edge_addr
 
     def change_progress(state: ScAddr):
       self.module.ctx.DeleteElement(progress_edge)
-      self.module.ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, state, self.cmd_addr)
+      self.module.ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, state, cmd_addr)
 
     change_progress(ScKeynodes.kCommandProgressdAddr())
 
+    memo_key = None
+    memo_token = None
+    if self.memo is not None:
+      cmd_params = self.GetParams()
+      memo_key = tuple(sorted((index, addr.ToInt()) for index, addr in cmd_params.items()))
+      memoized = self.memo.Get(memo_key)
+      if memoized is not None:
+        memo_res_addr, memo_result = memoized
+        # result structure could be erased, while its event waits in queue
+        if self.module.ctx.IsElement(memo_res_addr):
+          self._link_result(cmd_addr, memo_res_addr)
+          change_progress(ScKeynodes.kCommandFinishedAddr())
+          return memo_result
+
+        self.memo.Invalidate(memo_key)
+
+      # parameters are watched before run, so their changes during it aren't missed
+      memo_token = self.memo.Reserve(memo_key, self._memo_params_watch(cmd_params))
+
+    def release_memo():
+      if memo_token is not None:
+        self.memo.Release(memo_key, memo_token)
+
     # create result structure
-    templ = ScTemplate()
-    templ.TripleWithRelation(
-        self.cmd_addr,
-        ScType.EdgeDCommonVar,
-        ScType.NodeVarStruct >> '_result',
-        ScType.EdgeAccessVarPosPerm,
-        self.keynodes[ScAgent.kNrelResult])
+    params = ScTemplateParams()
+    params.Add('_cmd', cmd_addr)
 
-    gen_res = self.module.ctx.HelperGenTemplate(templ, ScTemplateParams())
+    gen_res = self.module.ctx.HelperGenTemplate(self._get_result_template(), params)
     assert gen_res.Size() > 0
 
     res_addr = gen_res['_result']
     self.result_set = ScSet(self.module.ctx, res_addr)
 
+    def finish(result: ScResult) -> ScResult:
+      # generate result type
+      self.module.ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, ScKeynodes.GetResultCodeAddr(result), res_addr)
+      if memo_token is not None and result == ScResult.Ok:
+        self.memo.Put(memo_key, (res_addr, result), self._memo_result_watch(res_addr), memo_token)
+      else:
+        release_memo()
+      change_progress(ScKeynodes.kCommandFinishedAddr())
+
+      return result
+
+    async def finish_async(coro) -> ScResult:
+      try:
+        result = await coro
+      except:
+        release_memo()
+        raise
+
+      return finish(result)
+
+    if self.offload_func is not None:
+      # result is known, when offloaded function is finished
+      return self._offload(finish, release_memo)
+
     # run implementation of command
-    result = self.DoCommand()
+    try:
+      result = self.DoCommand()
+    except:
+      release_memo()
+      raise
 
-    # generate result type
-    self.module.ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, ScKeynodes.GetResultCodeAddr(result), res_addr)
-    change_progress(ScKeynodes.kCommandFinishedAddr())
+    if asyncio.iscoroutine(result):
+      return finish_async(result)
 
-    return result
+    return finish(result)
 
   def DoCommand(self) -> ScResult:
     """Should be overrided.
     This method calls to run command implementation
-    Should return value like RunImpl
+    Should return value like RunImpl. It can be overrided with `async def`
     """
     return ScResult.No
 
+  def _on_dropped(self, evt: ScEventParams):
+    # command, that was dropped by module queue, is finished without result,
+    # so commands and their futures don't wait forever
+    self.module.CallLater(self._finish_dropped, evt)
+
+  def _finish_dropped(self, evt: ScEventParams):
+    self.module.log.warning(self.__class__.__name__ + ' command is dropped by queue')
+    if self.module.ctx.IsElement(evt.edge_addr):
+      self.module.ctx.DeleteElement(evt.edge_addr)
+    self.module.ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, ScKeynodes.kCommandFinishedAddr(), evt.other_addr)
+
+  def MakeOffloadPayload(self) -> dict:
+    """Collects command parameters with indices from `offload_params` into a dictionary
+    that passed to `offload_func`. Each item of dictionary is `index: value`,
+    where value is a content of sc-link (`str`, `int` or `float`) or hash of `ScAddr`
+    for any other sc-element (`None` if parameter doesn't exist)
+    """
+    params = self.GetParams()
+    payload = {}
+    for index in self.offload_params:
+      addr = params.get(index, ScAddr())
+      value = None
+      if addr.IsValid():
+        value = addr.ToInt()
+        if self.module.ctx.GetElementType(addr).IsLink():
+          value = ScAgentCommand._link_content_value(self.module.ctx.GetLinkContent(addr))
+
+      payload[index] = value
+
+    return payload
+
+  def ApplyOffloadResult(self, data) -> ScResult:
+    """Should be overrided for commands with `offload_func`.
+    This method calls in main thread of module with a result of `offload_func`
+    to generate result structure (`self.result_set`)
+    """
+    return ScResult.Ok
+
   def GetParam(self, index):
     """Return parameter of command by specified index.
     Index value starts from 1. This function trying to find
     sc-element in command structure with attribute `rrel_<index>`
     """
-    templ = ScTemplate()
-    templ.TripleWithRelation(
+    rrel_addr = self._get_rrel_addr(index)
+    if not rrel_addr.IsValid():
+      return ScAddr()
+
+    it = self.module.ctx.Iterator5(
         self.cmd_addr,
-        ScType.EdgeAccessVarPosPerm,
-        ScType.Unknown >> '_el',
-        ScType.EdgeAccessVarPosPerm,
-        self.keynodes['rrel_{}'.format(index)])
+        ScType.EdgeAccessConstPosPerm,
+        ScType.Unknown,
+        ScType.EdgeAccessConstPosPerm,
+        rrel_addr)
 
-    search_res = self.module.ctx.HelperSearchTemplate(templ)
-    if search_res.Size() == 0:
-      return ScAddr()
+    if it.Next():
+      return it.Get(2)
 
-    return search_res[0]['_el']
+    return ScAddr()
+
+  def GetParams(self) -> dict:
+    """Return all parameters of command as `dict` of `index: ScAddr`.
+    It finds them with one iterator, so use it instead of `GetParam`
+    for commands with several parameters
+    """
+    self._ensure_shared()
+
+    result = {}
+    it = self.module.ctx.Iterator5(
+        self.cmd_addr,
+        ScType.EdgeAccessConstPosPerm,
+        ScType.Unknown,
+        ScType.EdgeAccessConstPosPerm,
+        ScType.Unknown)
+
+    while it.Next():
+      index = self._get_rrel_index(it.Get(4))
+      if index is not None:
+        result[index] = it.Get(2)
+
+    return result
 
   @staticmethod
   def CreateCommand(ctx: ScMemoryContext, cmd_class_addr: ScAddr, params: [ScAddr]) -> ScAddr:
     return ScAgentCommandImpl.CreateCommand(ctx, cmd_class_addr, params)
 
+  @staticmethod
+  def CreateCommands(ctx: ScMemoryContext, commands: [(ScAddr, [ScAddr])]) -> [ScAddr]:
+    """Creates commands with one call of sc-memory.
+    commands - list of `(cmd_class_addr, params)` tuples
+    """
+    return ScAgentCommandImpl.CreateCommands(ctx, commands)
+
   @staticmethod
   def RunCommand(ctx: ScMemoryContext, cmd_addr: ScAddr) -> bool:
     return ScAgentCommandImpl.RunCommand(ctx, cmd_addr)
 
+  @staticmethod
+  def RunCommands(ctx: ScMemoryContext, cmd_addrs: [ScAddr]) -> [bool]:
+    """Initiates commands with one call of sc-memory
+    """
+    return ScAgentCommandImpl.RunCommands(ctx, cmd_addrs)
+
   @staticmethod
   def RunCommandWait(ctx: ScMemoryContext, cmd_addr: ScAddr, wait_timeout_ms: int) -> bool:
     return ScAgentCommandImpl.RunCommandWait(ctx, cmd_addr, wait_timeout_ms)
@@ -181,6 +449,142 @@ class ScAgentCommand(ScAgent):
     return ScAgentCommandImpl.GetCommandResultAddr(ctx, cmd_addr)
 
   # --- internal functions ---
+  def _ensure_shared(self):
+    if ScAgentCommand._rrel_addrs is not None:
+      return
+
+    with ScAgentCommand._shared_lock:
+      if ScAgentCommand._rrel_addrs is not None:
+        return
+
+      templ = ScTemplate()
+      templ.TripleWithRelation(
+          ScType.NodeVar >> '_cmd',
+          ScType.EdgeDCommonVar,
+          ScType.NodeVarStruct >> '_result',
+          ScType.EdgeAccessVarPosPerm,
+          self.keynodes[ScAgent.kNrelResult])
+
+      rrel_addrs = self.keynodes.GetMany(['rrel_{}'.format(i + 1) for i in range(self.kMaxParams)])
+
+      ScAgentCommand._result_templ = templ
+      ScAgentCommand._rrel_indices = {
+          addr.ToInt(): i + 1 for i, addr in enumerate(rrel_addrs) if addr.IsValid()
+      }
+      ScAgentCommand._rrel_addrs = rrel_addrs
+
+  def _get_result_template(self) -> ScTemplate:
+    self._ensure_shared()
+    return ScAgentCommand._result_templ
+
+  def _get_rrel_addr(self, index) -> ScAddr:
+    self._ensure_shared()
+    if 0 < index <= len(ScAgentCommand._rrel_addrs):
+      return ScAgentCommand._rrel_addrs[index - 1]
+
+    return self.keynodes['rrel_{}'.format(index)]
+
+  def _get_rrel_index(self, attr_addr) -> int:
+    """Returns index of `rrel_<index>` attribute `attr_addr` or `None`
+    """
+    key = attr_addr.ToInt()
+    index = ScAgentCommand._rrel_indices.get(key)
+    if index is not None or key in ScAgentCommand._unknown_attrs:
+      return index
+
+    idtf = self.module.ctx.HelperGetSystemIdtf(attr_addr)
+    if idtf.startswith('rrel_') and idtf[5:].isdigit():
+      index = int(idtf[5:])
+
+    with ScAgentCommand._shared_lock:
+      if index is not None:
+        ScAgentCommand._rrel_indices[key] = index
+      else:
+        if len(ScAgentCommand._unknown_attrs) >= self.kMaxUnknownAttrs:
+          ScAgentCommand._unknown_attrs.clear()
+        ScAgentCommand._unknown_attrs.add(key)
+
+    return index
+
+  def _link_result(self, cmd_addr, res_addr):
+    edge = self.module.ctx.CreateEdge(ScType.EdgeDCommonConst, cmd_addr, res_addr)
+    self.module.ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, self.keynodes[ScAgent.kNrelResult], edge)
+
+  def _memo_params_watch(self, cmd_params):
+    """Returns events of parameters, that invalidate memoized result:
+    erase of parameters and change of their content
+    """
+    watch = []
+    for addr in cmd_params.values():
+      watch.append((addr, ScPythonEventType.EraseElement))
+      if self.module.ctx.GetElementType(addr).IsLink():
+        watch.append((addr, ScPythonEventType.ContentChanged))
+
+    return watch
+
+  def _memo_result_watch(self, res_addr):
+    """Returns events of result structure, that invalidate memoized result: its erase
+    and any change of its elements. They are watched after run, because command
+    changes result structure itself
+    """
+    return [
+        (res_addr, ScPythonEventType.EraseElement),
+        (res_addr, ScPythonEventType.AddOutputEdge),
+        (res_addr, ScPythonEventType.RemoveOutputEdge),
+    ]
+
+  @staticmethod
+  def _link_content_value(content):
+    if content is None:
+      return None
+
+    content_type = content.GetType()
+    if content_type == ScLinkContent.Int:
+      return content.AsInt()
+    elif content_type == ScLinkContent.Float:
+      return content.AsFloat()
+
+    return content.AsString()
+
+  def _offload(self, finish, release_memo) -> concurrent.futures.Future:
+    """Runs `offload_func` in process pool. Returns future of command result,
+    that is resolved in main thread of module
+    """
+    cmd_addr = self.cmd_addr
+    result_set = self.result_set
+    done = concurrent.futures.Future()
+
+    def on_done(future):
+      self.module.CallLater(apply_result, future)
+
+    def apply_result(future):
+      self.cmd_addr = cmd_addr
+      self.result_set = result_set
+
+      try:
+        result = self.ApplyOffloadResult(future.result())
+      except:
+        self.module.log.error('{} offloaded command failed: {}'.format(
+            self.__class__.__name__, traceback.format_exc()))
+        result = ScResult.Error
+
+      try:
+        done.set_result(finish(result))
+      except Exception as ex:
+        done.set_exception(ex)
+
+    try:
+      future = self.module.process_pool.submit(
+          self.__class__.offload_func, self.MakeOffloadPayload())
+    except:
+      release_memo()
+      raise
+
+    future.add_done_callback(on_done)
+    self.module.log.info(self.__class__.__name__ + ' offloaded')
+
+    return done
+
   def _kb_resolve_status_addr(self, status):
     if status == ScAgent.Status.SC_RESULT_ERROR:
       sc_result_ok
@@ -191,3 +595,163 @@ class ScAgentCommand(ScAgent):
     """Append result structure to a special set depending on a status
     """
     pass
+
+
+class ScAgentCommandDispatcher:
+  """Routes initiated commands to `ScAgentCommand` agents of module by class of command.
+  It subscribes to `command_initiated` just once and finds classes of each command
+  with one iterator, so cost of command doesn't depend on number of agents.
+  Each agent runs with its own `priority`
+  """
+
+  # priority of `command_initiated` event. Agents with this priority run right in its task
+  priority = ScTaskPriority.High
+
+  def __init__(self, module):
+    self.module = module
+    self.evt = None
+    # hash of command class -> tuple of agents
+    self.agents = {}
+    self.lock = threading.Lock()
+
+  def Add(self, agent: ScAgentCommand):
+    with self.lock:
+      key = agent.cmd_class.ToInt()
+      self.agents[key] = self.agents.get(key, ()) + (agent,)
+
+      if self.evt is None:
+        self.evt = self.module.events.CreateEventAddOutputEdge(
+            ScKeynodes(self.module.ctx)[ScAgent.kCmdInitiated],
+            self._on_command,
+            self.priority)
+
+  def Remove(self, agent: ScAgentCommand):
+    with self.lock:
+      key = agent.cmd_class.ToInt()
+      agents = tuple(a for a in self.agents.get(key, ()) if a is not agent)
+      if len(agents) > 0:
+        self.agents[key] = agents
+      else:
+        self.agents.pop(key, None)
+
+      if len(self.agents) == 0 and self.evt is not None:
+        self.module.events.DestroyEvent(self.evt)
+        self.evt = None
+
+  def _on_command(self, evt: ScEventParams):
+    it = self.module.ctx.Iterator3(
+        ScType.Unknown,
+        ScType.EdgeAccessConstPosPerm,
+        evt.other_addr)
+
+    while it.Next():
+      for agent in self.agents.get(it.Get(0).ToInt(), ()):
+        if agent.priority == self.priority:
+          agent._run(evt)
+          continue
+
+        # run with priority of agent, but bounded by queue policy as any event
+        # each initiation of command should be run, so it isn't coalesced
+        self.module.CallLaterBounded(
+            agent.priority,
+            None,
+            lambda agent=agent: agent._on_dropped(evt),
+            agent._run, evt)
+
+
+class ScAgentCommandTracker:
+  """Resolves futures of commands with their `ScResult`, when they are finished.
+  It subscribes to `command_finished` just once for all tracked commands
+  """
+
+  def __init__(self, module):
+    self.module = module
+    self.evt = None
+    # hash of command -> concurrent.futures.Future
+    self.futures = {}
+    self.lock = threading.Lock()
+
+  def Track(self, cmd_addrs: [ScAddr], timeout=None) -> [concurrent.futures.Future]:
+    """Returns futures of commands `cmd_addrs`.
+    timeout - time (in seconds), after that future of not finished command is resolved
+      with `concurrent.futures.TimeoutError`. `None` - wait without timeout.
+    Cancelled futures and futures with timeout aren't tracked anymore
+    """
+    result = []
+    with self.lock:
+      if self.evt is None:
+        self.evt = self.module.events.CreateEventAddOutputEdge(
+            ScKeynodes.kCommandFinishedAddr(),
+            self._on_finished,
+            ScTaskPriority.High)
+
+      for addr in cmd_addrs:
+        key = addr.ToInt()
+        future = concurrent.futures.Future()
+        future.add_done_callback(lambda f, key=key: self._forget(key, f))
+        self.futures[key] = future
+        result.append(future)
+
+    if timeout is not None:
+      for addr, future in zip(cmd_addrs, result):
+        self.module.CallDelayed(timeout, self._on_timeout, addr, future, timeout)
+
+    return result
+
+  def Untrack(self, cmd_addr: ScAddr) -> concurrent.futures.Future:
+    with self.lock:
+      return self.futures.pop(cmd_addr.ToInt(), None)
+
+  def Clear(self):
+    """Cancels all tracked futures and destroys event
+    """
+    with self.lock:
+      futures = list(self.futures.values())
+      self.futures.clear()
+
+      if self.evt is not None:
+        self.module.events.DestroyEvent(self.evt)
+        self.evt = None
+
+    for future in futures:
+      future.cancel()
+
+  def _forget(self, key, future):
+    with self.lock:
+      if self.futures.get(key) is future:
+        del self.futures[key]
+
+  def _on_timeout(self, cmd_addr: ScAddr, future, timeout):
+    if future.done() or not future.set_running_or_notify_cancel():
+      return
+
+    future.set_exception(concurrent.futures.TimeoutError(
+        "Command {} isn't finished in {} seconds".format(cmd_addr.ToInt(), timeout)))
+
+  def _on_finished(self, evt: ScEventParams):
+    future = self.Untrack(evt.other_addr)
+    if future is None or not future.set_running_or_notify_cancel():
+      return
+
+    try:
+      future.set_result(self._get_result_code(evt.other_addr))
+    except Exception as ex:
+      future.set_exception(ex)
+
+  def _get_result_code(self, cmd_addr: ScAddr) -> ScResult:
+    ctx = self.module.ctx
+    res_addr = ScAgentCommand.GetCommandResultAddr(ctx, cmd_addr)
+    if not res_addr.IsValid():
+      return ScResult.Unknown
+
+    it = ctx.Iterator3(
+        ScType.Unknown,
+        ScType.EdgeAccessConstPosPerm,
+        res_addr)
+
+    while it.Next():
+      code = ScKeynodes.GetResultCodeByAddr(it.Get(0))
+      if code != ScResult.Unknown:
+        return code
+
+    return ScResult.Unknown
@@ -0,0 +1,177 @@
+from collections import OrderedDict
+
+import threading
+
+
+class _CacheEntry:
+
+  def __init__(self, value=None):
+    self.value = value
+    self.events = []
+    # entry was invalidated, while its value was loaded
+    self.invalidated = False
+
+
+class ScEventCache:
+  """LRU cache, which entries are invalidated by events of sc-elements.
+  Each entry watches list of `(addr, ScPythonEventType)` pairs and it's removed
+  from cache, when any of these events comes.
+
+  To don't miss changes, that are made while value is loaded from sc-memory, reserve
+  entry with known events before loading (`Reserve`) and pass it into `Put`.
+
+  This class is thread safe
+  """
+
+  def __init__(self, events, max_size=128):
+    """events - `ScEventManager` of module
+    max_size - maximum number of entries (0 - unbounded)
+    """
+    self.events = events
+    self.max_size = max_size
+    self.entries = OrderedDict()
+    # key -> list of reserved entries, which values are loaded
+    self.reserved = {}
+    self.lock = threading.Lock()
+
+    # stats
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.invalidations = 0
+
+  def Get(self, key, default=None):
+    with self.lock:
+      entry = self.entries.get(key)
+      if entry is None:
+        self.misses += 1
+        return default
+
+      self.entries.move_to_end(key)
+      self.hits += 1
+      return entry.value
+
+  def Reserve(self, key, watch=[]):
+    """Subscribes events, that invalidate value of `key`, before it's loaded.
+    watch - list of `(addr, ScPythonEventType)` pairs
+
+    Returns token, that should be passed into `Put` (or `Release`, if value isn't put).
+    When any event of token comes before `Put`, then value isn't put into cache
+    """
+    entry = _CacheEntry()
+    with self.lock:
+      self._subscribe(key, entry, watch)
+      self.reserved.setdefault(key, []).append(entry)
+
+    return entry
+
+  def Watch(self, key, token, watch):
+    """Subscribes more events for reserved `token` of `key`. Use it for sc-elements,
+    that were found during loading, before their content is read
+    """
+    with self.lock:
+      self._subscribe(key, token, watch)
+
+  def Release(self, key, token):
+    """Releases reserved `token` of `key`, that won't be put into cache
+    """
+    with self.lock:
+      self._unreserve(key, token)
+      self._unsubscribe(token)
+
+  def Put(self, key, value, watch=[], token=None) -> bool:
+    """Puts `value` into cache.
+    watch - list of `(addr, ScPythonEventType)` pairs, that invalidate this entry
+    token - result of `Reserve`, that was called before `value` was loaded
+
+    Returns `False`, if value was invalidated while it was loaded
+    """
+    entry = _CacheEntry() if token is None else token
+    with self.lock:
+      if token is not None:
+        self._unreserve(key, token)
+        if token.invalidated:
+          self._unsubscribe(token)
+          return False
+
+      entry.value = value
+      self._remove(key)
+      self._subscribe(key, entry, watch)
+
+      self.entries[key] = entry
+      while self.max_size > 0 and len(self.entries) > self.max_size:
+        self._remove(next(iter(self.entries)))
+        self.evictions += 1
+
+    return True
+
+  def Invalidate(self, key):
+    with self.lock:
+      for entry in self.reserved.get(key, []):
+        entry.invalidated = True
+
+      if self._remove(key):
+        self.invalidations += 1
+
+  def Clear(self):
+    with self.lock:
+      for key in list(self.entries.keys()):
+        self._remove(key)
+
+      for entries in self.reserved.values():
+        for entry in entries:
+          entry.invalidated = True
+          self._unsubscribe(entry)
+      self.reserved = {}
+
+  def __len__(self):
+    with self.lock:
+      return len(self.entries)
+
+  def Snapshot(self) -> dict:
+    with self.lock:
+      return {
+          'size': len(self.entries),
+          'max_size': self.max_size,
+          'hits': self.hits,
+          'misses': self.misses,
+          'evictions': self.evictions,
+          'invalidations': self.invalidations,
+      }
+
+  # --- internal functions ---
+  def _on_event(self, key, entry):
+    with self.lock:
+      # entry could be already replaced by a new one
+      if self.entries.get(key) is entry:
+        self._remove(key)
+        self.invalidations += 1
+      elif entry in self.reserved.get(key, []):
+        entry.invalidated = True
+
+  def _subscribe(self, key, entry, watch):
+    for addr, evt_type in watch:
+      evt = self.events.CreateEventInternal(
+          addr, evt_type, lambda evt_params, key=key, entry=entry: self._on_event(key, entry))
+      if evt is not None:
+        entry.events.append(evt)
+
+  def _unsubscribe(self, entry):
+    for evt in entry.events:
+      self.events.DestroyEvent(evt)
+    entry.events = []
+
+  def _unreserve(self, key, entry):
+    entries = [e for e in self.reserved.get(key, []) if e is not entry]
+    if len(entries) > 0:
+      self.reserved[key] = entries
+    else:
+      self.reserved.pop(key, None)
+
+  def _remove(self, key) -> bool:
+    entry = self.entries.pop(key, None)
+    if entry is None:
+      return False
+
+    self._unsubscribe(entry)
+    return True
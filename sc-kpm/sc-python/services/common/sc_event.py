@@ -1,31 +1,139 @@
+from common.sc_task_queue import ScTaskPriority
+
 from sc import *
 from scb import *
 
+import itertools
 import threading
 import json
+import time
 
 
 class ScEventParams:
 
-  def __init__(self, eid, addr, edge_addr, other_addr):
+  def __init__(self, eid, addr, edge_addr, other_addr, emit_time=None):
     self.id = eid
     self.addr = addr
     self.edge_addr = edge_addr
     self.other_addr = other_addr
+    # time of event emit in sc-memory (`time.monotonic()` clock)
+    self.emit_time = emit_time
 
 
 class ScEvent:
 
-  def __init__(self, evt, callback):
-    self.evt = evt  # pointer to ScPythonEvent
+  # number of stored delivery times, after that old ones are removed
+  kMaxLastEmitTimes = 1024
+
+  def __init__(self, evt, callback, priority=ScTaskPriority.Normal, evt_type=None, coalesce=None, force=False):
+    self.evt = evt  # pointer to ScPythonEvent (shared between subscribers)
+    self.id = None  # assigned by ScEventManager
     self.callback = callback
+    self.priority = priority
+    self.evt_type = evt_type
+    # forced events are never dropped by module queue and python bridge
+    self.force = force
+
+    # coalescing window in seconds (None - coalescing disabled)
+    self.coalesce = coalesce
+    self.merged = 0
+    self.lock = threading.Lock()
+    self.pending = {}
+    self.last_emit = {}
 
   def Emit(self, evt):
     if self.callback:
       self.callback(evt)
 
+  def Coalesce(self, evt_params) -> float:
+    """Merge `evt_params` with the event of the same element, that waits for delivery.
+    Returns `None`, if they were merged; otherwise returns delay (in seconds)
+    to deliver them according to coalescing window
+    """
+    key = evt_params.other_addr.ToInt()
+    with self.lock:
+      if key in self.pending:
+        self.pending[key] = evt_params
+        self.merged += 1
+        return None
+
+      self.pending[key] = evt_params
+      last_emit = self.last_emit.get(key)
+
+    if last_emit is None:
+      return 0.0
+
+    return max(0.0, last_emit + self.coalesce - time.monotonic())
+
+  def TakePending(self, evt_params):
+    """Returns the latest params of event of the same element as `evt_params`
+    """
+    key = evt_params.other_addr.ToInt()
+    now = time.monotonic()
+    with self.lock:
+      result = self.pending.pop(key, evt_params)
+
+      if self.coalesce > 0.0:
+        self.last_emit[key] = now
+        if len(self.last_emit) > ScEvent.kMaxLastEmitTimes:
+          self.last_emit = {
+              k: t for k, t in self.last_emit.items() if now - t < self.coalesce
+          }
+
+    return result
+
+  def DropPending(self, evt_params):
+    """Forget event of the same element as `evt_params`, that won't be delivered
+    (for example, it was dropped by module queue)
+    """
+    with self.lock:
+      self.pending.pop(evt_params.other_addr.ToInt(), None)
+
   def GetID(self):
-    return self.evt.GetID()
+    return self.id
+
+
+class ScEventFilter:
+  """Filter, that sc-memory checks before event comes into python.
+  Events, that doesn't pass it, are just counted.
+
+  other_type - `ScType`, that other element should have (all its bits)
+  edge_type - `ScType`, that edge should have (all its bits)
+  other_in_class - `ScAddr` of class, that other element should belong to
+  """
+
+  def __init__(self, other_type: ScType = None, edge_type: ScType = None, other_in_class: ScAddr = None):
+    self.other_type = other_type
+    self.edge_type = edge_type
+    self.other_in_class = other_in_class
+
+  def Key(self) -> tuple:
+    def _to_int(value):
+      return None if value is None else value.ToInt()
+
+    return (_to_int(self.other_type), _to_int(self.edge_type), _to_int(self.other_in_class))
+
+  def ToNative(self) -> ScPythonEventFilter:
+    result = ScPythonEventFilter()
+    if self.other_type is not None:
+      result.other_type = self.other_type
+    if self.edge_type is not None:
+      result.edge_type = self.edge_type
+    if self.other_in_class is not None:
+      result.other_in_class = self.other_in_class
+
+    return result
+
+
+class _ScSubscription:
+  """Native subscription, that is shared between all events of
+  the same sc-element and event type
+  """
+
+  def __init__(self, key, evt):
+    self.key = key
+    self.evt = evt  # pointer to ScPythonEvent
+    self.subscribers = ()
 
 
 '''This class is thread safe
@@ -37,46 +145,154 @@ class ScEventManager:
   def __init__(self, cpp):
     self.cpp = cpp
     self.events = {}
+    # native event id -> _ScSubscription
+    self.subscriptions = {}
+    # (addr hash, event type) -> _ScSubscription
+    self.shared = {}
+    self.lock = threading.Lock()
+    self.id_counter = itertools.count(1)
+
+  def CreateEventInternal(self, addr, evtType, callback, priority=ScTaskPriority.Normal, coalesce=None, event_filter=None, force=False):
+    """Subscribe `callback` to event `evtType` of sc-element `addr`.
+    priority - `ScTaskPriority` of event emit tasks in module queue
+    coalesce - coalescing window in seconds. Events of the same element (`other_addr`),
+      that wait for delivery or emited inside this window after the last delivery, are
+      merged into one delivery with the latest params. `0` - merge just events that wait
+      for delivery, `None` - coalescing disabled
+    event_filter - `ScEventFilter`, that is checked in sc-memory before event comes into python
+    force - if True, then events are never dropped by queue policy of module and python bridge.
+      Use it for callbacks, that keep state (for example, `ScSetMirror`)
+    """
+    key = (addr.ToInt(), evtType)
+    if event_filter is not None:
+      key += event_filter.Key()
 
-  def CreateEventInternal(self, addr, evtType, callback):
     result = None
     try:
-      evt = self.cpp.SubscribeEvent(addr, evtType)
-      result = ScEvent(evt, callback)
-      self.events[evt.GetID()] = result
+      with self.lock:
+        sub = self.shared.get(key)
+        if sub is None:
+          if event_filter is None:
+            evt = self.cpp.SubscribeEvent(addr, evtType)
+          else:
+            evt = self.cpp.SubscribeEventFiltered(addr, evtType, event_filter.ToNative())
+          sub = _ScSubscription(key, evt)
+          self.shared[key] = sub
+          self.subscriptions[sub.evt.GetID()] = sub
+
+        result = ScEvent(sub.evt, callback, priority, evtType, coalesce, force)
+        result.id = next(self.id_counter)
+        self.events[result.id] = result
+        sub.subscribers = sub.subscribers + (result,)
+        if force:
+          sub.evt.SetForced(True)
     except:
       pass
 
     return result
 
   def DestroyEvent(self, evt):
-    try:
-      del self.events[evt.GetID()]
-      evt.evt.Destroy()
-    except KeyError:
-      pass
+    with self.lock:
+      if self.events.pop(evt.GetID(), None) is None:
+        return
+
+      sub = self.subscriptions.get(evt.evt.GetID())
+      if sub is None:
+        return
+
+      sub.subscribers = tuple(s for s in sub.subscribers if s is not evt)
+      if len(sub.subscribers) > 0:
+        if evt.force:
+          sub.evt.SetForced(any(s.force for s in sub.subscribers))
+        return
+
+      # the last subscriber, so destroy native event
+      del self.subscriptions[evt.evt.GetID()]
+      del self.shared[sub.key]
+
+    evt.evt.Destroy()
+
+  def Fanout(self, evt_params) -> list:
+    """Returns list of params for each subscriber of native event `evt_params.id`
+    """
+    sub = self.subscriptions.get(evt_params.id)
+    if sub is None:
+      return []
+
+    return [
+        ScEventParams(evt.id, evt_params.addr, evt_params.edge_addr, evt_params.other_addr, evt_params.emit_time)
+        for evt in sub.subscribers
+    ]
+
+  def CreateEventAddOutputEdge(self, addr: ScAddr, callback, priority=ScTaskPriority.Normal, coalesce=None, event_filter=None, force=False) -> ScEvent:
+    return self.CreateEventInternal(addr, ScPythonEventType.AddOutputEdge, callback, priority, coalesce, event_filter, force)
+
+  def CreateEventAddInputEdge(self, addr: ScAddr, callback, priority=ScTaskPriority.Normal, coalesce=None, event_filter=None, force=False) -> ScEvent:
+    return self.CreateEventInternal(addr, ScPythonEventType.AddInputEdge, callback, priority, coalesce, event_filter, force)
+
+  def CreateEventRemoveOutputEdge(self, addr: ScAddr, callback, priority=ScTaskPriority.Normal, coalesce=None, event_filter=None, force=False) -> ScEvent:
+    return self.CreateEventInternal(addr, ScPythonEventType.RemoveOutputEdge, callback, priority, coalesce, event_filter, force)
+
+  def CreateEventRemoveInputEdge(self, addr: ScAddr, callback, priority=ScTaskPriority.Normal, coalesce=None, event_filter=None, force=False) -> ScEvent:
+    return self.CreateEventInternal(addr, ScPythonEventType.RemoveInputEdge, callback, priority, coalesce, event_filter, force)
+
+  def CreateEventContentChanged(self, addr: ScAddr, callback, priority=ScTaskPriority.Normal, coalesce=None, event_filter=None, force=False) -> ScEvent:
+    return self.CreateEventInternal(addr, ScPythonEventType.ContentChanged, callback, priority, coalesce, event_filter, force)
+
+  def CreateEventEraseElement(self, addr, callback, priority=ScTaskPriority.Normal, coalesce=None, event_filter=None, force=False):
+    return self.CreateEventInternal(addr, ScPythonEventType.EraseElement, callback, priority, coalesce, event_filter, force)
+
+  def GetPriority(self, eid) -> ScTaskPriority:
+    evt = self.events.get(eid)
+    if evt is None:
+      return ScTaskPriority.Normal
+
+    return evt.priority
+
+  def IsForced(self, eid) -> bool:
+    evt = self.events.get(eid)
+    return evt is not None and evt.force
+
+  def GetEventType(self, eid):
+    evt = self.events.get(eid)
+    if evt is None:
+      return None
 
-  def CreateEventAddOutputEdge(self, addr: ScAddr, callback) -> ScEvent:
-    return self.CreateEventInternal(addr, ScPythonEventType.AddOutputEdge, callback)
+    return evt.evt_type
 
-  def CreateEventAddInputEdge(self, addr: ScAddr, callback) -> ScEvent:
-    return self.CreateEventInternal(addr, ScPythonEventType.AddInputEdge, callback)
+  def Coalesce(self, evt_params) -> float:
+    """Returns `None`, if `evt_params` were merged with event that waits for delivery;
+    otherwise returns delay (in seconds) to deliver them. See `ScEvent.Coalesce`
+    """
+    evt = self.events.get(evt_params.id)
+    if evt is None or evt.coalesce is None:
+      return 0.0
 
-  def CreateEventRemoveOutputEdge(self, addr: ScAddr, callback) -> ScEvent:
-    return self.CreateEventInternal(addr, ScPythonEventType.RemoveOutputEdge, callback)
+    return evt.Coalesce(evt_params)
 
-  def CreateEventRemoveInputEdge(self, addr: ScAddr, callback) -> ScEvent:
-    return self.CreateEventInternal(addr, ScPythonEventType.RemoveInputEdge, callback)
+  def DropPending(self, evt_params):
+    """Should be called, when delivery of `evt_params` was dropped. So the next
+    event of the same element isn't merged with it. See `ScEvent.DropPending`
+    """
+    evt = self.events.get(evt_params.id)
+    if evt is not None and evt.coalesce is not None:
+      evt.DropPending(evt_params)
 
-  def CreateEventContentChanged(self, addr: ScAddr, callback) -> ScEvent:
-    return self.CreateEventInternal(addr, ScPythonEventType.ContentChanged, callback)
+  def GetFilteredCount(self) -> int:
+    """Returns number of events, that were filtered out in sc-memory
+    """
+    return sum(sub.evt.GetFilteredCount() for sub in list(self.subscriptions.values()))
 
-  def CreateEventEraseElement(self, addr, callback):
-    return self.CreateEventInternal(addr, ScPythonEventType.EraseElement, callback)
+  def GetMergedCount(self) -> int:
+    """Returns number of events merged by coalescing
+    """
+    return sum(evt.merged for evt in list(self.events.values()))
 
   def EmitEvent(self, evt_params):
     try:
       evt = self.events[evt_params.id]
+      if evt.coalesce is not None:
+        evt_params = evt.TakePending(evt_params)
       evt.Emit(evt_params)
     except KeyError:
       print("Can't find event: {}".format(evt_params.id))
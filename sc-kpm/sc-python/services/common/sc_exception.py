@@ -11,3 +11,8 @@ class ScKnowledgeBaseException(Exception):
 class ScCriticalException(Exception):
   def __init__(self, msg):
     Exception.__init__(self, "Critical error: {}".format(msg))
+
+
+class ScCommandException(Exception):
+  def __init__(self, msg):
+    Exception.__init__(self, "Command error: {}".format(msg))
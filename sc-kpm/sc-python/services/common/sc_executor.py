@@ -0,0 +1,88 @@
+from common.sc_log import Log
+
+import collections
+import threading
+import traceback
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+class _AgentState:
+
+  def __init__(self):
+    self.pending = collections.deque()
+    self.running = 0
+
+
+class ScAgentExecutor:
+  """Runs agent calls in a shared thread pool. Number of concurrent calls
+  of each agent is limited by its `max_concurrency` value. If agent has
+  `keep_order` flag, then its calls are processed one by one in order of submit.
+
+  This class is thread safe
+  """
+
+  def __init__(self, name, max_workers, initializer=None):
+    self.pool = ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix=name,
+        initializer=initializer)
+    self.log = Log(name)
+    self.lock = threading.Lock()
+    self.states = {}
+    self.is_shutdown = False
+
+  def Submit(self, agent, func, *args):
+    """Request to run `func(*args)` of `agent` in a thread pool
+    """
+    with self.lock:
+      if self.is_shutdown:
+        return
+
+      state = self.states.get(agent)
+      if state is None:
+        state = self.states[agent] = _AgentState()
+
+      state.pending.append((func, args))
+      self._schedule(agent, state)
+
+  def Remove(self, agent):
+    """Remove all pending calls of `agent`. Calls that are running at the moment
+    will be finished
+    """
+    with self.lock:
+      state = self.states.pop(agent, None)
+      if state:
+        state.pending.clear()
+
+  def Shutdown(self):
+    with self.lock:
+      self.is_shutdown = True
+      for state in self.states.values():
+        state.pending.clear()
+
+    self.pool.shutdown(wait=True)
+
+  # --- internal functions ---
+  @staticmethod
+  def _limit(agent):
+    return 1 if agent.keep_order else max(1, agent.max_concurrency)
+
+  def _schedule(self, agent, state):
+    # should be called under lock
+    limit = ScAgentExecutor._limit(agent)
+    while not self.is_shutdown and state.running < limit and len(state.pending) > 0:
+      func, args = state.pending.popleft()
+      state.running += 1
+      self.pool.submit(self._run, agent, state, func, args)
+
+  def _run(self, agent, state, func, args):
+    try:
+      func(*args)
+    except:
+      self.log.error('Unhandled exception in {}: {}'.format(
+          agent.__class__.__name__, traceback.format_exc()))
+    finally:
+      with self.lock:
+        state.running -= 1
+        self._schedule(agent, state)
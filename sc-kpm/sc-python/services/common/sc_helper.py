@@ -1,29 +1,38 @@
+from common.sc_cache import ScEventCache
+
 from sc import *
+from scb import *
 
 
 class ScHelper:
 
-  def __init__(self, ctx):
+  def __init__(self, ctx, events=None, cache_size=128):
+    """events - `ScEventManager` of module. If it's specified, then results of
+      `kbGetBinaryRelationLinkAddr` and `kbGetBinaryRelationLinkValue` are cached
+      until sc-elements of relation are changed
+    cache_size - maximum number of cached results
+    """
     self.ctx = ctx
+    self.cache = None if events is None else ScEventCache(events, cache_size)
 
   def kbGetBinaryRelationLinkAddr(self, _addr: ScAddr, _relAddr: ScAddr) -> ScAddr:
     """Find ScLink connected to `_addr` by relation `_relAddr`.
       SCs text:
         _addr => _relAddr: [_link];;
     """
-    templ = ScTemplate()
-
-    templ.TripleWithRelation(
-        _addr,
-        ScType.EdgeDCommonVar,
-        ScType.Link >> '_link',
-        ScType.EdgeAccessVarPosPerm,
-        _relAddr)
-
-    linkAddr = None
-    searchRes = self.ctx.HelperSearchTemplate(templ)
-    if searchRes.Size() > 0:
-      linkAddr = searchRes[0]['_link']
+    if self.cache is None:
+      return self._find_link(_addr, _relAddr)[0]
+
+    key = ('link', _addr.ToInt(), _relAddr.ToInt())
+    linkAddr = self.cache.Get(key)
+    if linkAddr is None:
+      # changes of relation are watched before search
+      token = self.cache.Reserve(key, self._relation_watch(_addr))
+      linkAddr, watch = self._find_link(_addr, _relAddr)
+      if linkAddr is None:
+        self.cache.Release(key, token)
+      else:
+        self.cache.Put(key, linkAddr, watch, token)
 
     return linkAddr
 
@@ -32,7 +41,8 @@ class ScHelper:
     SCs text:
     _addr => _relAddr: [_value];;
     """
-    linkAddr = self.kbGetBinaryRelationLinkAddr(_addr, _relAddr)
+    linkAddr = self._find_link(_addr, _relAddr)[0]
+    self._invalidate(_addr, _relAddr)
 
     # generate new relation if not found
     if linkAddr:
@@ -51,11 +61,31 @@ class ScHelper:
 
     If value found, then returns `ScLinkContent`, otherwise returns None
     """  
-    linkAddr = self.kbGetBinaryRelationLinkAddr(_addr, _relAddr)
-    if linkAddr:
-      return self.ctx.GetLinkContent(linkAddr)
+    if self.cache is None:
+      linkAddr = self.kbGetBinaryRelationLinkAddr(_addr, _relAddr)
+      if linkAddr:
+        return self.ctx.GetLinkContent(linkAddr)
+
+      return None
+
+    key = ('value', _addr.ToInt(), _relAddr.ToInt())
+    value = self.cache.Get(key)
+    if value is None:
+      token = self.cache.Reserve(key, self._relation_watch(_addr))
+      linkAddr, watch = self._find_link(_addr, _relAddr)
+      if linkAddr is None:
+        self.cache.Release(key, token)
+        return None
 
-    return None
+      # content is read, when its changes are already watched
+      self.cache.Watch(key, token, [(linkAddr, ScPythonEventType.ContentChanged)])
+      value = self.ctx.GetLinkContent(linkAddr)
+      if value is None:
+        self.cache.Release(key, token)
+      else:
+        self.cache.Put(key, value, watch, token)
+
+    return value
 
 
   def kbReplaceBinaryRelation(self, _addr: ScAddr, _relAddr: ScAddr, _newTarget: ScAddr) -> bool:
@@ -65,6 +95,8 @@ class ScHelper:
 
     Returns `True`, when new relation created
     """
+    self._invalidate(_addr, _relAddr)
+
     templ = ScTemplate()
     templ.TripleWithRelation(
         _addr,
@@ -95,5 +127,49 @@ class ScHelper:
     
     If value with a specified `rel_addr` doesn't exist, then it would be created. If value exists,
     then this function will change content of sc-link.
+
+    Existing values are found with one iterator and all changes are made with one call of sc-memory.
+    Returns `True`, when all values were set
+    """
+    result = ScHelperImpl.UpdateStructureValues(self.ctx, _addr, _values)
+    for relAddr, _ in _values:
+      self._invalidate(_addr, relAddr)
+
+    return result
+
+  # --- internal functions ---
+  def _relation_watch(self, _addr: ScAddr) -> list:
+    """Returns list of `(addr, ScPythonEventType)` pairs, that invalidate any
+    relation of `_addr`. They are known before search, so they are watched before it
+    """
+    return [(_addr, ScPythonEventType.RemoveOutputEdge)]
+
+  def _find_link(self, _addr: ScAddr, _relAddr: ScAddr) -> tuple:
+    """Returns `ScAddr` of link (`None`, if it wasn't found) and list of
+    `(addr, ScPythonEventType)` pairs of found sc-elements, that invalidate this result
     """
-  pass
+    templ = ScTemplate()
+
+    templ.TripleWithRelation(
+        _addr,
+        ScType.EdgeDCommonVar >> '_edge',
+        ScType.Link >> '_link',
+        ScType.EdgeAccessVarPosPerm >> '_rel_edge',
+        _relAddr)
+
+    searchRes = self.ctx.HelperSearchTemplate(templ)
+    if searchRes.Size() == 0:
+      return None, []
+
+    item = searchRes[0]
+    linkAddr = item['_link']
+    return linkAddr, [
+        (linkAddr, ScPythonEventType.EraseElement),
+        (item['_rel_edge'], ScPythonEventType.EraseElement),
+    ]
+
+  def _invalidate(self, _addr: ScAddr, _relAddr: ScAddr):
+    # events of own changes come later, so results are removed right now
+    if self.cache is not None:
+      self.cache.Invalidate(('link', _addr.ToInt(), _relAddr.ToInt()))
+      self.cache.Invalidate(('value', _addr.ToInt(), _relAddr.ToInt()))
@@ -1,21 +1,210 @@
 from sc import *
 
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class ScKeynodeRegistry:
+  """Keynodes shared by all `ScKeynodes` instances of module.
+  Identifiers, that weren't found, are cached for `negative_ttl` seconds.
+  Keynodes can be loaded from snapshot file (see `LoadSnapshot`), then they are
+  validated on the first request.
+
+  This class is thread safe
+  """
+
+  # time (in seconds) to remember identifiers, that weren't found
+  negative_ttl = 5.0
+
+  def __init__(self):
+    self.lock = threading.Lock()
+    self.resolved = {}
+    # identifier -> time, when it wasn't found
+    self.missed = {}
+    # identifier -> hash of sc-addr, that was loaded from snapshot, but wasn't validated yet
+    self.persisted = {}
+    # identifiers from snapshot, that didn't pass validation
+    self.stale = set()
+    # True, when there are keynodes, that aren't written into snapshot
+    self.changed = False
+
+  def Get(self, ctx: ScMemoryContext, sys_idtf: str) -> ScAddr:
+    """Returns keynode with system identifier `sys_idtf` (invalid `ScAddr`, if it doesn't exist)
+    """
+    return self.ResolveMany(ctx, [sys_idtf])[0]
+
+  def GetMany(self, ctx: ScMemoryContext, sys_idtfs: [str]) -> [ScAddr]:
+    """The same as `Get`, but for list of identifiers. Identifiers, that aren't cached,
+    are found with one call of sc-memory
+    """
+    return self.ResolveMany(ctx, sys_idtfs)
+
+  def Peek(self, sys_idtf: str) -> ScAddr:
+    """Returns cached keynode without access to sc-memory
+    """
+    with self.lock:
+      return self.resolved.get(sys_idtf, ScAddr())
+
+  def ResolveMany(self, ctx: ScMemoryContext, sys_idtfs: [str], types: list = None) -> [ScAddr]:
+    """Returns keynodes for list of identifiers.
+    types - list of `ScType` (or `None`) for each identifier. If type isn't `None`,
+      then keynode is created with this type, when it doesn't exist
+    """
+    result = [None] * len(sys_idtfs)
+    request_idx = []
+    validate_idx = []
+
+    now = time.monotonic()
+    with self.lock:
+      for idx, sys_idtf in enumerate(sys_idtfs):
+        addr = self.resolved.get(sys_idtf)
+        if addr is not None:
+          result[idx] = addr
+          continue
+
+        addr_hash = self.persisted.pop(sys_idtf, None)
+        if addr_hash is not None:
+          validate_idx.append((idx, addr_hash))
+          continue
+
+        el_type = None if types is None else types[idx]
+        missed_time = self.missed.get(sys_idtf)
+        if el_type is None and missed_time is not None and now - missed_time < self.negative_ttl:
+          result[idx] = ScAddr()
+          continue
+
+        request_idx.append(idx)
+
+    for idx, addr_hash in validate_idx:
+      addr = ScAddrFromHash(addr_hash)
+      # repository could be changed after snapshot was made
+      if ctx.IsElement(addr) and ctx.HelperGetSystemIdtf(addr) == sys_idtfs[idx]:
+        result[idx] = addr
+        with self.lock:
+          self.resolved[sys_idtfs[idx]] = addr
+      else:
+        request_idx.append(idx)
+        with self.lock:
+          self.stale.add(sys_idtfs[idx])
+
+    if len(request_idx) == 0:
+      return result
+
+    request_types = None
+    if types is not None:
+      request_types = [types[idx] for idx in request_idx]
+
+    addrs = ctx.HelperResolveSystemIdtfs([sys_idtfs[idx] for idx in request_idx], request_types)
+
+    with self.lock:
+      for idx, addr in zip(request_idx, addrs):
+        result[idx] = addr
+        if addr.IsValid():
+          self.resolved[sys_idtfs[idx]] = addr
+          self.missed.pop(sys_idtfs[idx], None)
+          self.changed = True
+        else:
+          self.missed[sys_idtfs[idx]] = now
+
+    return result
+
+  def Invalidate(self, sys_idtf: str = None):
+    """Removes identifier `sys_idtf` from cache (all identifiers, if it's `None`)
+    """
+    with self.lock:
+      if sys_idtf is None:
+        self.resolved.clear()
+        self.missed.clear()
+        self.persisted.clear()
+      else:
+        self.resolved.pop(sys_idtf, None)
+        self.missed.pop(sys_idtf, None)
+        self.persisted.pop(sys_idtf, None)
+
+  def LoadSnapshot(self, path: str = None) -> bool:
+    """Loads keynodes from snapshot file `path` (by default it's `python.keynodes_snapshot`
+    config value). Snapshot is ignored, if it was made for another generation of repository
+    (for example, repository was rebuilt after that). Returns `True`, when snapshot was loaded
+    """
+    path = path or getScConfigValue('python', 'keynodes_snapshot')
+    generation = getScStorageGeneration()
+    if not path or not generation:
+      return False
+
+    keynodes = self._read_snapshot(path, generation)
+    if keynodes is None:
+      return False
+
+    with self.lock:
+      for sys_idtf, addr_hash in keynodes.items():
+        if sys_idtf not in self.resolved and isinstance(addr_hash, int):
+          self.persisted[sys_idtf] = addr_hash
+
+    return True
+
+  def SaveSnapshot(self, path: str = None) -> bool:
+    """Writes resolved keynodes into snapshot file `path` (by default it's `python.keynodes_snapshot`
+    config value). Keynodes, that are already in this file (written by other modules), are kept
+    """
+    path = path or getScConfigValue('python', 'keynodes_snapshot')
+    generation = getScStorageGeneration()
+    if not path or not generation:
+      return False
+
+    keynodes = self._read_snapshot(path, generation) or {}
+    with self.lock:
+      for sys_idtf in self.stale:
+        keynodes.pop(sys_idtf, None)
+      keynodes.update(self.persisted)
+      keynodes.update({sys_idtf: addr.ToInt() for sys_idtf, addr in self.resolved.items()})
+      self.changed = False
+
+    # write into temporary file, so other modules never read partially written snapshot
+    tmp_path = None
+    try:
+      fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+      with os.fdopen(fd, 'w') as f:
+        json.dump({'generation': generation, 'keynodes': keynodes}, f)
+      os.replace(tmp_path, path)
+    except OSError:
+      if tmp_path is not None and os.path.exists(tmp_path):
+        os.remove(tmp_path)
+      return False
+
+    return True
+
+  # --- internal functions ---
+  @staticmethod
+  def _read_snapshot(path: str, generation: str) -> dict:
+    try:
+      with open(path) as f:
+        data = json.load(f)
+    except (OSError, ValueError):
+      return None
+
+    if not isinstance(data, dict) or data.get('generation') != generation:
+      return None
+
+    keynodes = data.get('keynodes')
+    return keynodes if isinstance(keynodes, dict) else None
+
 
 class ScKeynodes:
 
+  # registry shared by all instances
+  registry = ScKeynodeRegistry()
+
   def __init__(self, context):
     self.context = context
-    self.resolved = {}
 
   def __getitem__(self, sys_idtf):
-    if sys_idtf in self.resolved:
-      return self.resolved[sys_idtf]
-
-    addr = self.context.HelperResolveSystemIdtf(sys_idtf, ScType.Unknown)
-    if addr:
-      self.resolved[sys_idtf] = addr
+    return ScKeynodes.registry.Get(self.context, sys_idtf)
 
-    return addr
+  def GetMany(self, sys_idtfs: [str]) -> [ScAddr]:
+    return ScKeynodes.registry.GetMany(self.context, sys_idtfs)
 
   @staticmethod
   def GetResultCodeAddr(res: ScResult) -> ScAddr:
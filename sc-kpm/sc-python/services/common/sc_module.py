@@ -1,15 +1,28 @@
 from common.sc_keynodes import ScKeynodes
-from common.sc_exception import ScKeynodeException
+from common.sc_exception import ScKeynodeException, ScCommandException
 from common.sc_event import ScEventManager, ScEventParams
-from common.sc_agent import ScAgent
+from common.sc_agent import ScAgent, ScAgentCommand, ScAgentCommandDispatcher, ScAgentCommandTracker
+from common.sc_executor import ScAgentExecutor
+from common.sc_task_queue import ScTaskQueue, ScQueuePolicy, ScTaskPriority
+from common.sc_stats import ScAgentStats, ScEventStats
 from common.sc_log import Log
 
+import asyncio
+import heapq
+import json
+import os
+import itertools
+import multiprocessing
+import shutil
 import urllib.request
 import time
 import sys
+import threading
 import traceback
 import queue
 
+from concurrent.futures import Future, ProcessPoolExecutor
+
 from scb import *
 from sc import *
 
@@ -18,59 +31,353 @@ class Task:
   def __init__(self, func, *args):
     self.func = func
     self.args = args
+    # function, that is called when task is dropped by queue
+    self.on_drop = None
 
   def do(self):
     self.func(*self.args)
 
+
+class DispatchStats:
+  """Counters of module main loop. Use them to check dispatch throughput
+  """
+
+  def __init__(self):
+    self.ticks = 0
+    self.tasks = 0
+    self.last_tick_tasks = 0
+    self.max_tick_tasks = 0
+    self.idle_time = 0.0
+
+  def OnTick(self, tasks_count, idle_time):
+    self.ticks += 1
+    self.tasks += tasks_count
+    self.last_tick_tasks = tasks_count
+    self.max_tick_tasks = max(self.max_tick_tasks, tasks_count)
+    self.idle_time += idle_time
+
+  def Snapshot(self) -> dict:
+    return {
+        'ticks': self.ticks,
+        'tasks': self.tasks,
+        'tasks_per_tick': (self.tasks / self.ticks) if self.ticks > 0 else 0.0,
+        'last_tick_tasks': self.last_tick_tasks,
+        'max_tick_tasks': self.max_tick_tasks,
+        'idle_time': self.idle_time,
+    }
+
+
 class ScModule:
 
+  # maximum number of tasks that processed during one iteration of main loop
+  dispatch_max_tasks = 1000
+  # maximum time (in seconds) to process tasks during one iteration of main loop
+  dispatch_max_time = 0.05
+  # maximum time (in seconds) to wait a new task, when there are no any tasks in queue
+  dispatch_wait_timeout = 0.01
+  # number of threads in pool, that runs agents with `max_concurrency` > 0
+  executor_max_workers = 4
+  # number of processes in pool, that runs `offload_func` of command agents
+  process_pool_max_workers = 2
+  # maximum number of tasks in queue (0 - unbounded). Tasks of `CallLater`,
+  # `CallDelayed` and forced events are appended even if queue is full
+  task_queue_max_size = 0
+  # `ScQueuePolicy` that used when task queue is full
+  task_queue_policy = ScQueuePolicy.Block
+  # maximum time (in seconds) to block thread that emits event with `ScQueuePolicy.Block`
+  task_queue_block_timeout = 1.0
+  # maximum number of higher priority tasks, that can be processed while lower priority task waits
+  task_queue_starvation_limit = 100
+  # if True, then module collects latency histograms of events (see `GetStats`)
+  collect_event_stats = False
+  # if True, then module collects statistics of its agents (see `GetStats`)
+  collect_agent_stats = True
+  # interval (in seconds) to write `GetStats` into file `<python.stats_path>/<module class name>.json`.
+  # 0 - don't write it
+  stats_dump_interval = 0
+
   ctx = property()
   events = property()
+  executor = property()
+  process_pool = property()
 
   @ctx.getter
   def ctx(self) -> ScMemoryContext:
+    """Returns memory context of module. If it called from a thread of
+    module `executor`, then returns memory context of that thread
+    """
+    worker_ctx = getattr(self.__worker, 'ctx', None)
+    if worker_ctx is not None:
+      return worker_ctx
+
     return self.__sc_context
 
   @events.getter
   def events(self) -> ScEventManager:
     return self.__events
 
+  @executor.getter
+  def executor(self) -> ScAgentExecutor:
+    """Returns thread pool to run agents. It creates on first call
+    """
+    with self.__executor_lock:
+      if self.__executor is None:
+        self.__executor = ScAgentExecutor(
+            self.__class__.__name__,
+            self.executor_max_workers,
+            self._initialize_worker)
+
+      return self.__executor
+
+  @process_pool.getter
+  def process_pool(self) -> ProcessPoolExecutor:
+    """Returns pool of worker processes. It creates on first call.
+    Current process is embedded into sc-memory, so worker processes are
+    started with python interpreter specified by `python.executable` config
+    value (`python3` found in PATH by default)
+    """
+    with self.__executor_lock:
+      if self.__process_pool is None:
+        mp_context = multiprocessing.get_context('spawn')
+        executable = getScConfigValue('python', 'executable') or shutil.which('python3')
+        if executable:
+          mp_context.set_executable(executable)
+
+        self.__process_pool = ProcessPoolExecutor(
+            max_workers=self.process_pool_max_workers,
+            mp_context=mp_context)
+
+      return self.__process_pool
+
   def __init__(self, ctx, cpp_bridge, keynodes=[]):
     self.__sc_context = ctx
+    self.__worker = threading.local()
+    self.__executor = None
+    self.__process_pool = None
+    self.__executor_lock = threading.Lock()
+    # memory contexts of executor threads, that are destroyed on shutdown
+    self.__worker_contexts = []
+    self.__worker_lock = threading.Lock()
     self.keynodes = ScKeynodes(self.__sc_context)
 
     self.cpp = cpp_bridge
     assert self.cpp
 
     self.__events = ScEventManager(self.cpp)
+    ScKeynodes.registry.LoadSnapshot()
     self.KeynodesCheck(keynodes)
+    if ScKeynodes.registry.changed:
+      ScKeynodes.registry.SaveSnapshot()
 
     self.is_running = True
-    self.task_queue = queue.Queue()
+    self.task_queue = ScTaskQueue(
+        self.task_queue_max_size,
+        self.task_queue_policy,
+        self.task_queue_block_timeout,
+        self.task_queue_starvation_limit,
+        self._on_task_dropped)
+    self.command_dispatcher = ScAgentCommandDispatcher(self)
+    self.command_tracker = ScAgentCommandTracker(self)
+    self.dispatch_stats = DispatchStats()
+    self.event_stats = ScEventStats()
+    self.agent_stats = ScAgentStats()
+    self.__last_stats_dump = time.monotonic()
+    self.__delayed = []
+    self.__delayed_lock = threading.Lock()
+    self.__delayed_counter = itertools.count()
     self.log = Log(self.__class__.__name__)
 
   def KeynodesCheck(self, keynodes_list):
-    for idtf in keynodes_list:
-      addr = self.keynodes[idtf]
+    addrs = self.keynodes.GetMany(keynodes_list)
+    for idtf, addr in zip(keynodes_list, addrs):
       if not addr:
         raise ScKeynodeException(idtf)
 
   # --- handlers calls in main thread ---
   def HandleOnClose(self):
-    self.CallLater(self.Stop)
+    self.CallLaterWithPriority(ScTaskPriority.High, self.Stop)
+
+  def HandleOnEvent(self, eid, addr, edge_addr, other_addr, emit_time=None):
+    params = ScEventParams(eid, addr, edge_addr, other_addr, emit_time)
+    # one native event is shared by all subscribers of the same sc-element
+    self._enqueue_events(self.__events.Fanout(params))
 
-  def HandleOnEvent(self, eid, addr, edge_addr, other_addr):
-    params = ScEventParams(eid, addr, edge_addr, other_addr)
-    self.CallLater(self.DoEmitEvent, params)
+  def HandleOnEventBatch(self, items):
+    """Handles list of `(eid, addr, edge_addr, other_addr, emit_time)` tuples,
+    that were emitted in sc-memory while python was busy
+    """
+    params = []
+    for eid, addr, edge_addr, other_addr, emit_time in items:
+      params.extend(self.__events.Fanout(ScEventParams(eid, addr, edge_addr, other_addr, emit_time)))
+
+    self._enqueue_events(params)
 
   # --- tasks ---
   def DoEmitEvent(self, evt_params):
+    if not self.collect_event_stats:
+      self.__events.EmitEvent(evt_params)
+      return
+
+    start = time.monotonic()
     self.__events.EmitEvent(evt_params)
+    run_time = time.monotonic() - start
+
+    wait_time = None
+    if evt_params.emit_time is not None:
+      wait_time = start - evt_params.emit_time
+
+    self.event_stats.AddEvent(
+        self.__events.GetEventType(evt_params.id), wait_time, run_time)
+
+  def _enqueue_events(self, params_list):
+    entries = []
+
+    def flush():
+      if len(entries) == 1:
+        task, key, priority = entries[0]
+        self.task_queue.put(task, key, priority=priority)
+      elif len(entries) > 1:
+        self.task_queue.put_many(entries)
+      entries.clear()
+
+    for params in params_list:
+      delay = self.__events.Coalesce(params)
+      if delay is None:
+        continue
+
+      priority = self.__events.GetPriority(params.id)
+      if delay > 0.0:
+        self.CallDelayedWithPriority(delay, priority, self.DoEmitEvent, params)
+        continue
+
+      if self.__events.IsForced(params.id):
+        # keep order of events
+        flush()
+        self.task_queue.put(Task(self.DoEmitEvent, params), force=True, priority=priority)
+        continue
+
+      key = None
+      if self.task_queue.policy == ScQueuePolicy.Coalesce:
+        key = (params.id, params.addr.ToInt(), params.other_addr.ToInt())
+
+      entries.append((Task(self.DoEmitEvent, params), key, priority))
+
+    flush()
+
+  def _on_task_dropped(self, task):
+    # pending state of coalesced event should be removed, otherwise
+    # all next events of its element would be merged with it
+    if task.func == self.DoEmitEvent:
+      self.__events.DropPending(task.args[0])
+    elif task.on_drop is not None:
+      task.on_drop()
 
   def CallLater(self, func, *args):
-    self.task_queue.put(Task(func, *args))
+    """Request to call `func(*args)` in main thread of module.
+    Tasks added with this function are never dropped by `task_queue` policy
+    """
+    self.CallLaterWithPriority(ScTaskPriority.Normal, func, *args)
+
+  def CallLaterWithPriority(self, priority, func, *args):
+    """The same as `CallLater`, but task is added into a `priority` lane of queue
+    """
+    self.task_queue.put(Task(func, *args), force=True, priority=priority)
+
+  def CallLaterBounded(self, priority, key, on_drop, func, *args) -> bool:
+    """Request to call `func(*args)` in main thread of module. Unlike `CallLater`, task
+    is a subject of `task_queue` policy: it can be dropped (then `on_drop()` is called,
+    if it isn't `None`) or coalesced with queued task with the same `key`.
+    Returns `True`, when task was queued
+    """
+    task = Task(func, *args)
+    task.on_drop = on_drop
+    return self.task_queue.put(task, key, priority=priority)
+
+  def CallDelayed(self, delay, func, *args):
+    """Request to call `func(*args)` in main thread of module after `delay` seconds
+    """
+    self.CallDelayedWithPriority(delay, ScTaskPriority.Normal, func, *args)
+
+  def CallDelayedWithPriority(self, delay, priority, func, *args):
+    with self.__delayed_lock:
+      heapq.heappush(self.__delayed, (
+          time.monotonic() + delay,
+          next(self.__delayed_counter),
+          priority,
+          Task(func, *args)))
+
+  def _process_delayed(self):
+    """Moves delayed tasks, which time has come, into queue.
+    Returns time (in seconds) until the next delayed task or `None`
+    """
+    with self.__delayed_lock:
+      now = time.monotonic()
+      while len(self.__delayed) > 0 and self.__delayed[0][0] <= now:
+        _, _, priority, task = heapq.heappop(self.__delayed)
+        self.task_queue.put(task, force=True, priority=priority)
+
+      if len(self.__delayed) > 0:
+        return self.__delayed[0][0] - now
+
+    return None
+
+  def RunCoroutine(self, coro) -> Future:
+    """Runs coroutine `coro` (for example, result of `async def RunImpl`).
+    Returns `concurrent.futures.Future` of its result. This module doesn't have
+    event loop, so coroutine runs until complete and blocks main thread (returned
+    future is already resolved). Use `AsyncScModule` to run them concurrently
+    """
+    future = Future()
+    loop = asyncio.new_event_loop()
+    try:
+      future.set_result(loop.run_until_complete(coro))
+    except Exception as ex:
+      future.set_exception(ex)
+    finally:
+      loop.close()
+
+    self._on_coroutine_done(future)
+    return future
+
+  def _on_coroutine_done(self, future):
+    if future.cancelled():
+      return
+
+    ex = future.exception()
+    if ex:
+      self.log.error('Unhandled exception in coroutine: {}'.format(
+          ''.join(traceback.format_exception(type(ex), ex, ex.__traceback__))))
 
   # --- overloads ---
+  def RunCommands(self, commands, timeout=None) -> list:
+    """Creates and initiates commands with one call of sc-memory.
+    commands - list of `(cmd_class_addr, params)` tuples
+    timeout - time (in seconds) to wait for commands. When it's expired, then futures of
+      not finished commands are resolved with `concurrent.futures.TimeoutError`
+
+    Returns list of `concurrent.futures.Future`, that are resolved with `ScResult`
+    of commands, when they are finished. Futures are resolved in main thread
+    of module, so don't wait for them there
+    """
+    cmd_addrs = ScAgentCommand.CreateCommands(self.ctx, commands)
+    futures = self.command_tracker.Track(cmd_addrs, timeout)
+
+    started = ScAgentCommand.RunCommands(self.ctx, cmd_addrs)
+    for cmd_addr, is_started in zip(cmd_addrs, started):
+      if not is_started:
+        future = self.command_tracker.Untrack(cmd_addr)
+        if future is not None:
+          future.set_exception(ScCommandException("Can't initiate command {}".format(cmd_addr.ToInt())))
+
+    return futures
+
+  def RunCommandsAsync(self, commands, timeout=None) -> list:
+    """The same as `RunCommands`, but returns list of `asyncio` awaitables.
+    It should be called from a running event loop (for example, in `AsyncScModule`).
+    Cancel of awaitable stops tracking of its command
+    """
+    return [asyncio.wrap_future(future) for future in self.RunCommands(commands, timeout)]
+
   def OnInitialize(self, params):
     """This function calls when module initialized.
     You should overload it to run code of your module on initialize
@@ -90,23 +397,88 @@ class ScModule:
   def Initialize(self):
     self.cpp.onClose = self.HandleOnClose
     self.cpp.onEvent = self.HandleOnEvent
+    self.cpp.onEventBatch = self.HandleOnEventBatch
+    # buffer of events in bridge is bounded in the same way as task queue
+    self.cpp.SetBatchLimit(
+        self.task_queue_max_size,
+        self.task_queue_policy.value,
+        -1.0 if self.task_queue_block_timeout is None else self.task_queue_block_timeout)
     # notify c++ code that bridge is ready for work
     self.cpp.Ready()
 
     self.OnInitialize(self.cpp.InitParams())
 
+  def _initialize_worker(self):
+    # each thread of executor works with its own memory context
+    self.__worker.ctx = ScMemoryContext.Create(
+        '{}_{}'.format(self.__class__.__name__, threading.current_thread().name))
+    with self.__worker_lock:
+      self.__worker_contexts.append(self.__worker.ctx)
+
   def Shutdown(self):
     self.OnShutdown()
+    self.command_tracker.Clear()
+    with self.__executor_lock:
+      if self.__executor is not None:
+        self.__executor.Shutdown()
+        self.__executor = None
+
+      if self.__process_pool is not None:
+        self.__process_pool.shutdown(wait=True)
+        self.__process_pool = None
+
+    # threads of executor are finished, so nobody uses their contexts
+    with self.__worker_lock:
+      for worker_ctx in self.__worker_contexts:
+        worker_ctx.Destroy()
+      self.__worker_contexts.clear()
+
     self.cpp.onClose = None
     self.cpp.onEvent = None
+    self.cpp.onEventBatch = None
     self.cpp.Finish()
 
   def EmitEvents(self):
+    """Process tasks from a queue. It waits until any task appears in a queue
+    (but not longer, then `dispatch_wait_timeout`), and then process all queued tasks,
+    while `dispatch_max_tasks` and `dispatch_max_time` budget isn't exceeded.
+
+    Returns number of processed tasks
+    """
+    if self.collect_event_stats:
+      self.event_stats.AddQueueDepth(self.task_queue.qsize())
+
+    wait_timeout = self.dispatch_wait_timeout
+    next_delayed = self._process_delayed()
+    if next_delayed is not None:
+      wait_timeout = min(wait_timeout, next_delayed)
+
+    wait_start = time.monotonic()
     try:
-      task = self.task_queue.get(block=True, timeout=0.01)
-      task.do()
+      task = self.task_queue.get(block=True, timeout=wait_timeout)
     except queue.Empty:
-      pass
+      self.dispatch_stats.OnTick(0, time.monotonic() - wait_start)
+      return 0
+
+    tick_start = time.monotonic()
+    idle_time = tick_start - wait_start
+    deadline = tick_start + self.dispatch_max_time
+
+    processed = 0
+    while True:
+      task.do()
+      processed += 1
+
+      if not self.is_running or processed >= self.dispatch_max_tasks or time.monotonic() >= deadline:
+        break
+
+      try:
+        task = self.task_queue.get_nowait()
+      except queue.Empty:
+        break
+
+    self.dispatch_stats.OnTick(processed, idle_time)
+    return processed
 
   def Run(self):
     if self.cpp:
@@ -115,9 +487,55 @@ class ScModule:
       while self.is_running:
         self.EmitEvents()
         self.OnUpdate()
+        self._dump_stats_periodic()
 
       self.Shutdown()
 
+  def GetStats(self) -> dict:
+    """Returns snapshot of module statistics. It can be called from any thread
+    """
+    stats = {
+        'dispatch': self.dispatch_stats.Snapshot(),
+        'queue': self.task_queue.Snapshot(),
+        'merged_events': self.__events.GetMergedCount(),
+        'filtered_events': self.__events.GetFilteredCount(),
+        'bridge_dropped_events': self.cpp.GetDroppedEvents(),
+    }
+    if self.collect_event_stats:
+      stats.update(self.event_stats.Snapshot())
+    if self.collect_agent_stats:
+      stats['agents'] = self.agent_stats.Snapshot()
+
+    return stats
+
+  def DumpStats(self, path=None) -> bool:
+    """Writes `GetStats()` into json file `path`. By default it's
+    `<python.stats_path>/<module class name>.json`
+    """
+    if path is None:
+      stats_path = getScConfigValue('python', 'stats_path')
+      if not stats_path:
+        return False
+      path = os.path.join(stats_path, self.__class__.__name__ + '.json')
+
+    try:
+      with open(path, 'w') as f:
+        json.dump(self.GetStats(), f, default=str)
+    except OSError:
+      self.log.error("Can't write stats into {}: {}".format(path, traceback.format_exc()))
+      return False
+
+    return True
+
+  def _dump_stats_periodic(self):
+    if self.stats_dump_interval <= 0:
+      return
+
+    now = time.monotonic()
+    if now - self.__last_stats_dump >= self.stats_dump_interval:
+      self.__last_stats_dump = now
+      self.DumpStats()
+
   # Set of usefull functions
   @staticmethod
   def GetDataByUrl(url):
@@ -0,0 +1,141 @@
+from common.sc_module import ScModule
+
+import asyncio
+import queue
+import threading
+import time
+
+
+class AsyncScModule(ScModule):
+  """Module that runs its main loop on asyncio event loop.
+  Events and tasks are queued into `task_queue` (with the same policy and priorities
+  as in `ScModule`) and processed by the loop with `dispatch_max_tasks` and
+  `dispatch_max_time` budget, so agents can implement `async def RunImpl`
+  (or `async def DoCommand`) and await any I/O without blocking event delivery
+  for other agents of this module
+  """
+
+  # interval (in seconds) between OnUpdate calls
+  update_interval = 0.01
+
+  def __init__(self, ctx, cpp_bridge, keynodes=[]):
+    ScModule.__init__(self, ctx, cpp_bridge, keynodes)
+    self.loop = asyncio.new_event_loop()
+    self.drain_lock = threading.Lock()
+    self.drain_scheduled = False
+    self.last_drain = time.monotonic()
+
+  # --- tasks ---
+  def _enqueue_events(self, params_list):
+    ScModule._enqueue_events(self, params_list)
+    self._wakeup()
+
+  def CallLaterWithPriority(self, priority, func, *args):
+    ScModule.CallLaterWithPriority(self, priority, func, *args)
+    self._wakeup()
+
+  def CallLaterBounded(self, priority, key, on_drop, func, *args) -> bool:
+    result = ScModule.CallLaterBounded(self, priority, key, on_drop, func, *args)
+    self._wakeup()
+    return result
+
+  def CallDelayedWithPriority(self, delay, priority, func, *args):
+    self.loop.call_soon_threadsafe(
+        self.loop.call_later, delay, self.CallLaterWithPriority, priority, func, *args)
+
+  def _wakeup(self):
+    # schedule processing of task queue on event loop, if it isn't scheduled yet
+    with self.drain_lock:
+      if self.drain_scheduled:
+        return
+      self.drain_scheduled = True
+
+    self.loop.call_soon_threadsafe(self._drain)
+
+  def _drain(self):
+    """Process queued tasks, while `dispatch_max_tasks` and `dispatch_max_time` budget isn't exceeded.
+    Other callbacks of event loop run between such calls
+    """
+    with self.drain_lock:
+      self.drain_scheduled = False
+
+    if self.collect_event_stats:
+      self.event_stats.AddQueueDepth(self.task_queue.qsize())
+
+    tick_start = time.monotonic()
+    deadline = tick_start + self.dispatch_max_time
+
+    processed = 0
+    while self.is_running and processed < self.dispatch_max_tasks and time.monotonic() < deadline:
+      try:
+        task = self.task_queue.get_nowait()
+      except queue.Empty:
+        break
+
+      task.do()
+      processed += 1
+
+    self.dispatch_stats.OnTick(processed, tick_start - self.last_drain)
+    self.last_drain = time.monotonic()
+
+    if self.is_running and not self.task_queue.empty():
+      self._wakeup()
+
+  def RunCoroutine(self, coro):
+    """Schedules coroutine `coro` on the module event loop.
+    Returns `concurrent.futures.Future` of its result. This function is thread safe
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+    future.add_done_callback(self._on_coroutine_done)
+    return future
+
+  # --- overloads ---
+  def Stop(self):
+    self.is_running = False
+    if self.loop.is_running():
+      self.loop.stop()
+
+  # --- common state functions ---
+  def EmitEvents(self):
+    """Process all callbacks that are ready to run at the moment
+    """
+    self.loop.call_soon(self.loop.stop)
+    self.loop.run_forever()
+
+  def _update(self):
+    if not self.is_running:
+      return
+
+    self.OnUpdate()
+    self._dump_stats_periodic()
+    self.loop.call_later(self.update_interval, self._update)
+
+  def _cancel_tasks(self):
+    tasks = asyncio.all_tasks(self.loop)
+    if len(tasks) == 0:
+      return
+
+    for task in tasks:
+      task.cancel()
+
+    self.loop.run_until_complete(
+        asyncio.gather(*tasks, return_exceptions=True))
+
+  def Run(self):
+    if self.cpp:
+      asyncio.set_event_loop(self.loop)
+      # wait until cpp bridge will be initialized
+      self.Initialize()
+      if self.is_running:
+        self.loop.call_soon(self._update)
+        self.loop.run_forever()
+
+      self._cancel_tasks()
+      self.Shutdown()
+      self.loop.close()
+
+  # Set of usefull functions
+  async def GetDataByUrlAsync(self, url):
+    """The same as `GetDataByUrl`, but doesn't block event loop
+    """
+    return await self.loop.run_in_executor(None, ScModule.GetDataByUrl, url)
@@ -1,18 +1,38 @@
+from common.sc_event import ScEventFilter
+
 from sc import *
 
+import threading
+
 
 class Iterator:
-  def __init__(self, it):
+  """Iterates elements with `index` of iterator constructions.
+  Elements are fetched from sc-memory by batches of `batch_size`
+  """
+
+  batch_size = 256
+
+  def __init__(self, it, index=2):
     self.iter = it
+    self.index = index
+    self.batch = []
+    self.pos = 0
+
+  def __iter__(self):
+    return self
 
   def __next__(self):
     return self.next()
 
   def next(self):
-    if self.iter.Next():
-      return self.iter.Get(2)
+    if self.pos >= len(self.batch):
+      self.batch = self.iter.NextBatchAt(self.batch_size, self.index)
+      self.pos = 0
+      if len(self.batch) == 0:
+        raise StopIteration
 
-    raise StopIteration
+    self.pos += 1
+    return self.batch[self.pos - 1]
 
 
 class ScSet:
@@ -55,6 +75,39 @@ class ScSet:
 
     return False
 
+  def HasMany(self, elAddrs: [ScAddr]) -> [bool]:
+    """The same as `Has`, but for list of elements. Checks them with one call of sc-memory
+    """
+    return ScSetImpl.HasMany(self.ctx, self.addr, elAddrs)
+
+  def AddMany(self, elAddrs: [ScAddr]) -> [bool]:
+    """The same as `Add`, but for list of elements. Adds them with one call of sc-memory
+    """
+    return ScSetImpl.AddMany(self.ctx, self.addr, elAddrs)
+
+  def RemoveMany(self, elAddrs: [ScAddr]) -> [bool]:
+    """The same as `Remove`, but for list of elements. Removes them with one call of sc-memory
+    """
+    return ScSetImpl.RemoveMany(self.ctx, self.addr, elAddrs)
+
+  def Union(self, other: 'ScSet', target: 'ScSet' = None) -> [ScAddr]:
+    """Returns list of elements, that are in this set or in `other` one.
+    If `target` set is specified, then these elements are added into it
+    """
+    return ScSetImpl.Union(self.ctx, self.addr, other.addr, self._target_addr(target))
+
+  def Intersect(self, other: 'ScSet', target: 'ScSet' = None) -> [ScAddr]:
+    """Returns list of elements, that are in this set and in `other` one.
+    If `target` set is specified, then these elements are added into it
+    """
+    return ScSetImpl.Intersect(self.ctx, self.addr, other.addr, self._target_addr(target))
+
+  def Difference(self, other: 'ScSet', target: 'ScSet' = None) -> [ScAddr]:
+    """Returns list of elements, that are in this set, but not in `other` one.
+    If `target` set is specified, then these elements are added into it
+    """
+    return ScSetImpl.Difference(self.ctx, self.addr, other.addr, self._target_addr(target))
+
   def Clear(self):
     """Remove all elements from a set
     """
@@ -63,8 +116,29 @@ class ScSet:
         ScType.EdgeAccessConstPosPerm,
         ScType.Unknown)
 
-    while it.Next():
-      self.ctx.DeleteElement(it.Get(1))
+    for edge in Iterator(it, 1):
+      self.ctx.DeleteElement(edge)
+
+  def Count(self) -> int:
+    """Returns number of elements in set. They are counted in sc-memory
+    """
+    return ScSetImpl.Count(self.ctx, self.addr, ScType.Unknown)
+
+  def CountByType(self, el_type: ScType) -> int:
+    """Returns number of elements in set, that have type `el_type`
+    """
+    return ScSetImpl.Count(self.ctx, self.addr, el_type)
+
+  def Iterate(self, type_filter: ScType = ScType.Unknown) -> Iterator:
+    """Create iterator for elements of set, that have type `type_filter`.
+    Elements are filtered in sc-memory
+    """
+    it = self.ctx.Iterator3(
+        self.addr,
+        ScType.EdgeAccessConstPosPerm,
+        type_filter)
+
+    return Iterator(it)
 
   def __iter__(self):
     """Create iterator for iterate all elements of set
@@ -72,12 +146,172 @@ class ScSet:
     for el in _set.IterElements():
         # process element
     """
+    return self.Iterate()
+
+  @staticmethod
+  def _target_addr(target: 'ScSet') -> ScAddr:
+    return ScAddr() if target is None else target.addr
+
+
+class ScSetMirror(ScSet):
+  """Local copy of `ScSet` elements, so `Has`, `len` and iteration don't access sc-memory.
+  Copy is updated by events of set element, that are processed by module. Events can come
+  in any order and addresses of erased edges can be reused, so membership of element is
+  checked in sc-memory on each event. These events are never dropped by module queue.
+  Changes made with this object are visible immediately. Call `Sync` to get changes,
+  that were made by other contexts and weren't processed yet.
+
+  This class is thread safe
+  """
+
+  def __init__(self, ctx, addr, events):
+    """events - `ScEventManager` of module
+    """
+    ScSet.__init__(self, ctx, addr)
+    self.events = events
+    self.lock = threading.Lock()
+    # edge hash -> element hash
+    self.edges = {}
+    # element hash -> (element, set of edge hashes)
+    self.elements = {}
+
+    # subscribe before loading, so changes made while loading aren't lost
+    self.evt_add = events.CreateEventAddOutputEdge(
+        addr, self._on_edge_event,
+        event_filter=ScEventFilter(edge_type=ScType.EdgeAccessConstPosPerm), force=True)
+    self.evt_remove = events.CreateEventRemoveOutputEdge(addr, self._on_edge_event, force=True)
+    self.Sync()
+
+  def Destroy(self):
+    """Unsubscribes from events of set element
+    """
+    self.events.DestroyEvent(self.evt_add)
+    self.events.DestroyEvent(self.evt_remove)
+
+  def Sync(self):
+    """Reloads elements from sc-memory. When it returns, all changes made
+    before the call are visible
+    """
     it = self.ctx.Iterator3(
         self.addr,
         ScType.EdgeAccessConstPosPerm,
         ScType.Unknown)
 
-    return Iterator(it)
+    edges = {}
+    elements = {}
+    batch = it.NextBatch(Iterator.batch_size)
+    while len(batch) > 0:
+      for _, edge, el in batch:
+        self._add(edges, elements, edge, el)
+      batch = it.NextBatch(Iterator.batch_size)
+
+    with self.lock:
+      self.edges = edges
+      self.elements = elements
+
+  def Has(self, elAddr: ScAddr) -> bool:
+    with self.lock:
+      return elAddr.ToInt() in self.elements
+
+  def HasMany(self, elAddrs: [ScAddr]) -> [bool]:
+    with self.lock:
+      return [el.ToInt() in self.elements for el in elAddrs]
+
+  def Add(self, elAddr: ScAddr) -> bool:
+    result = ScSet.Add(self, elAddr)
+    if result:
+      self._reload_elements([elAddr])
+    return result
+
+  def AddMany(self, elAddrs: [ScAddr]) -> [bool]:
+    result = ScSet.AddMany(self, elAddrs)
+    self._reload_elements([el for el, added in zip(elAddrs, result) if added])
+    return result
+
+  def Remove(self, elAddr: ScAddr) -> bool:
+    result = ScSet.Remove(self, elAddr)
+    if result:
+      self._reload_elements([elAddr])
+    return result
+
+  def RemoveMany(self, elAddrs: [ScAddr]) -> [bool]:
+    result = ScSet.RemoveMany(self, elAddrs)
+    self._reload_elements([el for el, removed in zip(elAddrs, result) if removed])
+    return result
+
+  def Clear(self):
+    ScSet.Clear(self)
+    self.Sync()
+
+  def Count(self) -> int:
+    return len(self)
+
+  def __len__(self):
+    with self.lock:
+      return len(self.elements)
+
+  def __iter__(self):
+    with self.lock:
+      return iter([item[0] for item in self.elements.values()])
+
+  # --- internal functions ---
+  @staticmethod
+  def _add(edges, elements, edge: ScAddr, el: ScAddr):
+    edge_hash = edge.ToInt()
+    el_hash = el.ToInt()
+    prev_el_hash = edges.get(edge_hash)
+    if prev_el_hash == el_hash:
+      return
+
+    # address of erased edge is reused
+    if prev_el_hash is not None:
+      ScSetMirror._remove(edges, elements, edge)
+
+    edges[edge_hash] = el_hash
+    item = elements.get(el_hash)
+    if item is None:
+      elements[el_hash] = (el, {edge_hash})
+    else:
+      item[1].add(edge_hash)
+
+  @staticmethod
+  def _remove(edges, elements, edge: ScAddr):
+    edge_hash = edge.ToInt()
+    el_hash = edges.pop(edge_hash, None)
+    if el_hash is None:
+      return
+
+    el_edges = elements[el_hash][1]
+    el_edges.discard(edge_hash)
+    if len(el_edges) == 0:
+      del elements[el_hash]
+
+  def _reload_elements(self, elAddrs: [ScAddr]):
+    # edges to each element are found again, so result doesn't depend on
+    # events of these changes, that will come later
+    found = []
+    for el in elAddrs:
+      el_edges = []
+      if self.ctx.IsElement(el):
+        it = self.ctx.Iterator3(self.addr, ScType.EdgeAccessConstPosPerm, el)
+        el_edges = it.NextBatchAt(Iterator.batch_size, 1)
+      found.append((el, el_edges))
+
+    with self.lock:
+      for el, el_edges in found:
+        el_hash = el.ToInt()
+        item = self.elements.pop(el_hash, None)
+        if item is not None:
+          for edge_hash in item[1]:
+            if self.edges.get(edge_hash) == el_hash:
+              del self.edges[edge_hash]
+
+        for edge in el_edges:
+          self._add(self.edges, self.elements, edge, el)
+
+  def _on_edge_event(self, evt_params):
+    # event could be late, so element is checked in sc-memory
+    self._reload_elements([evt_params.other_addr])
 
 
 # ---------------------------------------
@@ -90,18 +324,23 @@ class ScRelationSet:
       => nrel_relation: el4;;
   """
 
-  def __init__(self, ctx, addr, relAddr):
+  def __init__(self, ctx, addr, relAddr, index: 'ScRelationIndex' = None):
     """
     addr - ScAddr of element
     relAddr - ScAddr of relation
+    index - `ScRelationIndex` of relation, that is used to check elements
     """
     self.ctx = ctx
     self.addr = addr
     self.relAddr = relAddr
+    self.index = index
 
   def Has(self, elAddr: ScAddr) -> bool:
     """Check if specified element exists in set
     """
+    if self.index is not None:
+      return self.index.HasPair(self.addr, elAddr)
+
     it = self.ctx.Iterator5(
         self.addr,
         ScType.EdgeDCommonConst,
@@ -120,6 +359,9 @@ class ScRelationSet:
       edge = self.ctx.CreateEdge(
           ScType.EdgeAccessConstPosPerm, self.relAddr, edge)
 
+      if self.index is not None and edge.IsValid():
+        self.index._add_pair(edge, self.addr, elAddr)
+
       return edge.IsValid()
 
     return False
@@ -137,6 +379,8 @@ class ScRelationSet:
 
     if it.Next():
       self.ctx.DeleteElement(it.Get(1))
+      if self.index is not None:
+        self.index._remove_pair(it.Get(3))
       return True
 
     return False
@@ -151,20 +395,190 @@ class ScRelationSet:
         ScType.EdgeAccessConstPosPerm,
         self.relAddr)
 
-    while it.Next():
-      self.ctx.DeleteElement(it.Get(1))
+    batch = it.NextBatch(Iterator.batch_size)
+    while len(batch) > 0:
+      for _, edge, _, rel_edge, _ in batch:
+        self.ctx.DeleteElement(edge)
+        if self.index is not None:
+          self.index._remove_pair(rel_edge)
+      batch = it.NextBatch(Iterator.batch_size)
+
+  def Sources(self, target: ScAddr) -> [ScAddr]:
+    """Returns list of elements, that are linked with `target` by relation
+    (not only this set element). If set has `index`, then sc-memory isn't accessed
+    """
+    if self.index is not None:
+      return self.index.Sources(target)
 
-  def __iter__(self):
-    """Create iterator for iterate all elements of set
-    Usage:
-    for el in _set.IterElements():
-        # process element
+    it = self.ctx.Iterator5(
+        ScType.Unknown,
+        ScType.EdgeDCommonConst,
+        target,
+        ScType.EdgeAccessConstPosPerm,
+        self.relAddr)
+
+    return list(Iterator(it, 0))
+
+  def Count(self) -> int:
+    """Returns number of elements in set. They are counted in sc-memory
+    """
+    return ScSetImpl.CountRelation(self.ctx, self.addr, self.relAddr, ScType.Unknown)
+
+  def CountByType(self, el_type: ScType) -> int:
+    """Returns number of elements in set, that have type `el_type`
+    """
+    return ScSetImpl.CountRelation(self.ctx, self.addr, self.relAddr, el_type)
+
+  def Iterate(self, type_filter: ScType = ScType.Unknown) -> Iterator:
+    """Create iterator for elements of set, that have type `type_filter`.
+    Elements are filtered in sc-memory
     """
     it = self.ctx.Iterator5(
         self.addr,
         ScType.EdgeDCommonConst,
-        ScType.Unknown,
+        type_filter,
         ScType.EdgeAccessConstPosPerm,
         self.relAddr)
 
     return Iterator(it)
+
+  def __iter__(self):
+    """Create iterator for iterate all elements of set
+    Usage:
+    for el in _set.IterElements():
+        # process element
+    """
+    return self.Iterate()
+
+
+class ScRelationIndex:
+  """Reverse index of relation: target -> sources, that are linked with it by relation.
+  This allows to check pairs of relation without access to sc-memory. Index is loaded once
+  and updated by events of relation element, that are processed by module. Events can come
+  in any order and addresses of erased edges can be reused, so each changed pair is checked
+  in sc-memory. These events are never dropped by module queue. Changes made with
+  `ScRelationSet`, that uses this index, are visible immediately.
+
+  This class is thread safe
+  """
+
+  def __init__(self, ctx, relAddr, events):
+    """relAddr - ScAddr of relation
+    events - `ScEventManager` of module
+    """
+    self.ctx = ctx
+    self.relAddr = relAddr
+    self.events = events
+    self.lock = threading.Lock()
+    # relation edge hash -> (source hash, target hash)
+    self.pairs = {}
+    # target hash -> {source hash: [source, number of pairs]}
+    self.sources = {}
+
+    # subscribe before loading, so changes made while loading aren't lost
+    self.evt_add = events.CreateEventAddOutputEdge(
+        relAddr, self._on_edge_event,
+        event_filter=ScEventFilter(other_type=ScType.EdgeDCommonConst, edge_type=ScType.EdgeAccessConstPosPerm),
+        force=True)
+    self.evt_remove = events.CreateEventRemoveOutputEdge(relAddr, self._on_edge_event, force=True)
+    self.Sync()
+
+  def Destroy(self):
+    """Unsubscribes from events of relation element
+    """
+    self.events.DestroyEvent(self.evt_add)
+    self.events.DestroyEvent(self.evt_remove)
+
+  def Sync(self):
+    """Reloads pairs of relation from sc-memory. When it returns, all changes made
+    before the call are visible
+    """
+    pairs = {}
+    sources = {}
+    for src, _, trg, rel_edge in ScSetImpl.GetRelationPairs(self.ctx, self.relAddr):
+      self._add(pairs, sources, rel_edge, src, trg)
+
+    with self.lock:
+      self.pairs = pairs
+      self.sources = sources
+
+  def Sources(self, target: ScAddr) -> [ScAddr]:
+    """Returns list of elements, that are linked with `target` by relation
+    """
+    with self.lock:
+      items = self.sources.get(target.ToInt())
+      return [] if items is None else [item[0] for item in items.values()]
+
+  def HasPair(self, source: ScAddr, target: ScAddr) -> bool:
+    """Check if `source` is linked with `target` by relation
+    """
+    with self.lock:
+      items = self.sources.get(target.ToInt())
+      return items is not None and source.ToInt() in items
+
+  def __len__(self):
+    with self.lock:
+      return len(self.pairs)
+
+  # --- internal functions ---
+  @staticmethod
+  def _add(pairs, sources, rel_edge: ScAddr, src: ScAddr, trg: ScAddr):
+    rel_hash = rel_edge.ToInt()
+    if rel_hash in pairs:
+      return
+
+    src_hash, trg_hash = src.ToInt(), trg.ToInt()
+    pairs[rel_hash] = (src_hash, trg_hash)
+    items = sources.setdefault(trg_hash, {})
+    item = items.get(src_hash)
+    if item is None:
+      items[src_hash] = [src, 1]
+    else:
+      item[1] += 1
+
+  @staticmethod
+  def _remove(pairs, sources, rel_edge: ScAddr):
+    pair = pairs.pop(rel_edge.ToInt(), None)
+    if pair is None:
+      return
+
+    src_hash, trg_hash = pair
+    items = sources[trg_hash]
+    item = items[src_hash]
+    item[1] -= 1
+    if item[1] == 0:
+      del items[src_hash]
+      if len(items) == 0:
+        del sources[trg_hash]
+
+  def _add_pair(self, rel_edge: ScAddr, src: ScAddr, trg: ScAddr):
+    with self.lock:
+      self._add(self.pairs, self.sources, rel_edge, src, trg)
+
+  def _remove_pair(self, rel_edge: ScAddr):
+    with self.lock:
+      self._remove(self.pairs, self.sources, rel_edge)
+
+  def _load_pair(self, rel_edge: ScAddr) -> tuple:
+    """Returns `(source, target)` of pair, if `rel_edge` links relation with pair edge
+    in sc-memory right now; otherwise returns `None`
+    """
+    rel, pair_edge = self.ctx.GetEdgeInfo(rel_edge)
+    if rel is None or rel != self.relAddr or self.ctx.GetElementType(rel_edge) != ScType.EdgeAccessConstPosPerm:
+      return None
+
+    if self.ctx.GetElementType(pair_edge) != ScType.EdgeDCommonConst:
+      return None
+
+    src, trg = self.ctx.GetEdgeInfo(pair_edge)
+    return None if src is None else (src, trg)
+
+  def _on_edge_event(self, evt_params):
+    # event could be late and address of relation edge could be reused,
+    # so pair is checked in sc-memory
+    rel_edge = evt_params.edge_addr
+    pair = self._load_pair(rel_edge)
+    with self.lock:
+      self._remove(self.pairs, self.sources, rel_edge)
+      if pair is not None:
+        self._add(self.pairs, self.sources, rel_edge, pair[0], pair[1])
@@ -0,0 +1,232 @@
+import bisect
+import cProfile
+import threading
+
+
+class ScHistogram:
+  """Histogram with exponential buckets. It isn't thread safe
+  """
+
+  # upper bounds of buckets for time values (in seconds): 1us ... ~16s
+  kTimeBounds = [0.000001 * (2 ** i) for i in range(25)]
+  # upper bounds of buckets for sizes: 1 ... ~1M
+  kSizeBounds = [2 ** i for i in range(21)]
+
+  def __init__(self, bounds=kTimeBounds):
+    self.bounds = bounds
+    # the last bucket is for values greater, than the last bound
+    self.counts = [0] * (len(bounds) + 1)
+    self.count = 0
+    self.sum = 0.0
+    self.min = None
+    self.max = None
+
+  def Add(self, value):
+    self.counts[bisect.bisect_left(self.bounds, value)] += 1
+    self.count += 1
+    self.sum += value
+    if self.min is None or value < self.min:
+      self.min = value
+    if self.max is None or value > self.max:
+      self.max = value
+
+  def Percentile(self, p):
+    """Returns upper bound of bucket, that contains `p` (0..1) percentile
+    """
+    if self.count == 0:
+      return None
+
+    need = p * self.count
+    total = 0
+    for idx, c in enumerate(self.counts):
+      total += c
+      if total >= need and c > 0:
+        return self.bounds[idx] if idx < len(self.bounds) else self.max
+
+    return self.max
+
+  def Snapshot(self) -> dict:
+    return {
+        'count': self.count,
+        'sum': self.sum,
+        'min': self.min,
+        'max': self.max,
+        'mean': (self.sum / self.count) if self.count > 0 else None,
+        'p50': self.Percentile(0.5),
+        'p90': self.Percentile(0.9),
+        'p99': self.Percentile(0.99),
+        'buckets': [
+            [self.bounds[idx] if idx < len(self.bounds) else None, c]
+            for idx, c in enumerate(self.counts) if c > 0
+        ],
+    }
+
+
+class ScEventStats:
+  """Collects statistics of event dispatch in module:
+  - per event type histograms of wait time (from emit in sc-memory to the start of callback)
+    and run time of callback;
+  - histogram of module queue depth samples.
+
+  This class is thread safe
+  """
+
+  def __init__(self):
+    self.lock = threading.Lock()
+    self.wait = {}
+    self.run = {}
+    self.queue_depth = ScHistogram(ScHistogram.kSizeBounds)
+
+  def AddEvent(self, evt_type, wait_time, run_time):
+    with self.lock:
+      wait = self.wait.get(evt_type)
+      if wait is None:
+        wait = self.wait[evt_type] = ScHistogram()
+        self.run[evt_type] = ScHistogram()
+
+      if wait_time is not None:
+        wait.Add(wait_time)
+      self.run[evt_type].Add(run_time)
+
+  def AddQueueDepth(self, depth):
+    with self.lock:
+      self.queue_depth.Add(depth)
+
+  def Snapshot(self) -> dict:
+    with self.lock:
+      return {
+          'events': {
+              str(evt_type): {
+                  'wait': self.wait[evt_type].Snapshot(),
+                  'run': self.run[evt_type].Snapshot(),
+              } for evt_type in self.wait
+          },
+          'queue_depth': self.queue_depth.Snapshot(),
+      }
+
+
+class _AgentCounters:
+
+  def __init__(self):
+    self.invocations = 0
+    self.rejections = 0
+    self.exceptions = 0
+    self.results = {}
+    self.wall = ScHistogram()
+    self.cpu = ScHistogram()
+
+  def Snapshot(self) -> dict:
+    return {
+        'invocations': self.invocations,
+        'rejections': self.rejections,
+        'exceptions': self.exceptions,
+        'results': dict(self.results),
+        'wall': self.wall.Snapshot(),
+        'cpu': self.cpu.Snapshot(),
+    }
+
+
+class _AgentProfile:
+
+  def __init__(self):
+    self.profile = cProfile.Profile()
+    # profiler can't be used by several threads at the same time
+    self.lock = threading.Lock()
+    self.runs = 0
+
+
+class ScAgentStats:
+  """Registry of per agent class statistics: number of invocations, rejections
+  by `CheckImpl`, exceptions and result codes, histograms of wall and CPU time of runs.
+  Also it can capture `cProfile` of chosen agent classes.
+
+  This class is thread safe
+  """
+
+  def __init__(self):
+    self.lock = threading.Lock()
+    self.agents = {}
+    self.profiles = {}
+
+  def AddRejection(self, name):
+    with self.lock:
+      self._get(name).rejections += 1
+
+  def AddException(self, name):
+    with self.lock:
+      counters = self._get(name)
+      counters.invocations += 1
+      counters.exceptions += 1
+
+  def AddRun(self, name, result, wall_time, cpu_time=None):
+    """Adds finished run of agent `name`.
+    result - name of result code
+    cpu_time - CPU time of run (`None` for async runs, that can't be measured)
+    """
+    with self.lock:
+      counters = self._get(name)
+      counters.invocations += 1
+      counters.results[result] = counters.results.get(result, 0) + 1
+      counters.wall.Add(wall_time)
+      if cpu_time is not None:
+        counters.cpu.Add(cpu_time)
+
+  def StartProfile(self, name):
+    """Starts capture of `cProfile` for agent class `name`
+    """
+    with self.lock:
+      if name not in self.profiles:
+        self.profiles[name] = _AgentProfile()
+
+  def StopProfile(self, name) -> cProfile.Profile:
+    """Stops capture of `cProfile` for agent class `name` and returns captured profile
+    (`None` if it wasn't started). Use `pstats.Stats(profile)` to analyze it
+    """
+    with self.lock:
+      prof = self.profiles.pop(name, None)
+
+    if prof is None:
+      return None
+
+    # wait for the current profiled run
+    with prof.lock:
+      return prof.profile
+
+  def DumpProfile(self, name, path) -> bool:
+    """Stops capture of `cProfile` for agent class `name` and writes it into file `path`
+    """
+    profile = self.StopProfile(name)
+    if profile is None:
+      return False
+
+    profile.dump_stats(path)
+    return True
+
+  def Call(self, name, func, *args):
+    """Calls `func(*args)` with profiler, if capture is started for agent class `name`.
+    Runs, that come while profiler is busy in other thread, aren't profiled
+    """
+    prof = self.profiles.get(name)
+    if prof is None or not prof.lock.acquire(blocking=False):
+      return func(*args)
+
+    try:
+      prof.runs += 1
+      return prof.profile.runcall(func, *args)
+    finally:
+      prof.lock.release()
+
+  def Snapshot(self) -> dict:
+    with self.lock:
+      return {
+          name: dict(counters.Snapshot(), profiling=name in self.profiles)
+          for name, counters in self.agents.items()
+      }
+
+  # --- internal functions ---
+  def _get(self, name) -> _AgentCounters:
+    counters = self.agents.get(name)
+    if counters is None:
+      counters = self.agents[name] = _AgentCounters()
+
+    return counters
@@ -0,0 +1,286 @@
+from enum import Enum
+
+import collections
+import queue
+import threading
+import time
+
+
+class ScQueuePolicy(Enum):
+  """Policies of `ScTaskQueue` when it's full:
+  Block - wait until queue has free space (not longer, then `block_timeout`)
+  DropOldest - remove the oldest task from queue and append new one
+  DropNewest - don't append new task
+  Coalesce - replace queued task with the same key by a new one (replaced task is
+             passed to `on_drop`). When there are no such task and queue is full,
+             then don't append new task
+  """
+  Block = 0
+  DropOldest = 1
+  DropNewest = 2
+  Coalesce = 3
+
+
+class ScTaskPriority(Enum):
+  """Priority lanes of `ScTaskQueue`. Tasks with higher priority are processed first
+  """
+  High = 0
+  Normal = 1
+  Low = 2
+
+
+class _Entry:
+
+  def __init__(self, key, task, force=False):
+    self.key = key
+    self.task = task
+    # forced tasks are never dropped
+    self.force = force
+
+
+class _Lane:
+
+  def __init__(self):
+    self.entries = collections.deque()
+    # number of tasks from higher lanes processed, while this lane waits
+    self.skipped = 0
+    self.high_water = 0
+
+
+class ScTaskQueue:
+  """Thread safe queue of module tasks with optional bound and priority lanes.
+  It has the same interface as `queue.Queue` to get tasks
+  """
+
+  def __init__(self, max_size=0, policy=ScQueuePolicy.Block, block_timeout=None, starvation_limit=100, on_drop=None):
+    """
+    max_size - maximum number of tasks in queue (0 - unbounded)
+    policy - `ScQueuePolicy` that used when queue is full
+    block_timeout - maximum time (in seconds) to wait for a free space with `ScQueuePolicy.Block`,
+      after that new task is dropped. `None` - wait without timeout
+    starvation_limit - maximum number of tasks from higher priority lanes, that can be processed
+      while a lower priority lane waits. After that one task from a lower lane is processed
+    on_drop - function, that is called with each dropped or replaced by coalescing task
+              (outside of queue lock)
+    """
+    self.max_size = max_size
+    self.policy = policy
+    self.block_timeout = block_timeout
+    self.starvation_limit = starvation_limit
+    self.on_drop = on_drop
+
+    self.lanes = [_Lane() for _ in ScTaskPriority]
+    self.size = 0
+    self.keys = {}
+    self.mutex = threading.Lock()
+    self.not_empty = threading.Condition(self.mutex)
+    self.not_full = threading.Condition(self.mutex)
+    # dropped tasks, that wait for `on_drop` call
+    self.dropped_tasks = []
+
+    # stats
+    self.dropped = 0
+    self.coalesced = 0
+    self.high_water = 0
+
+  def put(self, task, key=None, force=False, priority=ScTaskPriority.Normal):
+    """Append task into queue.
+    key - hashable value to coalesce tasks with `ScQueuePolicy.Coalesce` policy
+    force - if True, then task is appended even if queue is full, and it's never
+            removed by `DropOldest` policy. `ScModule.CallLater` always uses it
+    priority - `ScTaskPriority` lane of task
+
+    Returns `True`, when task was appended or coalesced; otherwise - `False`
+    """
+    with self.mutex:
+      result = self._put(task, key, force, priority)
+      dropped = self._take_dropped()
+
+    self._notify_dropped(dropped)
+    return result
+
+  def put_many(self, items):
+    """Append list of `(task, key, priority)` items into queue
+    with one lock acquisition. See `put` for details.
+
+    Returns number of appended or coalesced tasks
+    """
+    with self.mutex:
+      result = sum(1 for task, key, priority in items if self._put(task, key, False, priority))
+      dropped = self._take_dropped()
+
+    self._notify_dropped(dropped)
+    return result
+
+  def get(self, block=True, timeout=None):
+    with self.not_empty:
+      if not block:
+        if self.size == 0:
+          raise queue.Empty
+      elif timeout is None:
+        while self.size == 0:
+          self.not_empty.wait()
+      else:
+        end_time = time.monotonic() + timeout
+        while self.size == 0:
+          remaining = end_time - time.monotonic()
+          if remaining <= 0.0:
+            raise queue.Empty
+          self.not_empty.wait(remaining)
+
+      task = self._pop()
+      self.not_full.notify()
+
+      return task
+
+  def get_nowait(self):
+    return self.get(block=False)
+
+  def qsize(self):
+    with self.mutex:
+      return self.size
+
+  def empty(self):
+    return self.qsize() == 0
+
+  def Snapshot(self) -> dict:
+    with self.mutex:
+      return {
+          'size': self.size,
+          'max_size': self.max_size,
+          'policy': self.policy.name,
+          'dropped': self.dropped,
+          'coalesced': self.coalesced,
+          'high_water': self.high_water,
+          'lanes': {
+              priority.name: {
+                  'size': len(self.lanes[priority.value].entries),
+                  'high_water': self.lanes[priority.value].high_water,
+              } for priority in ScTaskPriority
+          },
+      }
+
+  # --- internal functions ---
+  def _put(self, task, key, force, priority):
+    if self.policy == ScQueuePolicy.Coalesce and key is not None:
+      entry = self.keys.get(key)
+      if entry is not None:
+        # replaced task won't be processed, so owner of it should be notified
+        if self.on_drop is not None:
+          self.dropped_tasks.append(entry.task)
+        entry.task = task
+        self.coalesced += 1
+        return True
+
+    if not force and self._is_full():
+      if self.policy == ScQueuePolicy.Block:
+        if not self._wait_not_full():
+          self._drop(task)
+          return False
+      elif self.policy == ScQueuePolicy.DropOldest:
+        oldest = self._pop_oldest()
+        # there are just forced tasks in queue, so drop the new one
+        if oldest is None:
+          self._drop(task)
+          return False
+        self._drop(oldest)
+      else:
+        self._drop(task)
+        return False
+
+    lane = self.lanes[priority.value]
+    entry = _Entry(key, task, force)
+    lane.entries.append(entry)
+    lane.high_water = max(lane.high_water, len(lane.entries))
+    self.size += 1
+    if self.policy == ScQueuePolicy.Coalesce and key is not None:
+      self.keys[key] = entry
+
+    self.high_water = max(self.high_water, self.size)
+    self.not_empty.notify()
+
+    return True
+
+  def _drop(self, task):
+    self.dropped += 1
+    if self.on_drop is not None:
+      self.dropped_tasks.append(task)
+
+  def _take_dropped(self):
+    if len(self.dropped_tasks) == 0:
+      return None
+
+    dropped, self.dropped_tasks = self.dropped_tasks, []
+    return dropped
+
+  def _notify_dropped(self, dropped):
+    if dropped is None:
+      return
+
+    for task in dropped:
+      self.on_drop(task)
+
+  def _is_full(self):
+    return self.max_size > 0 and self.size >= self.max_size
+
+  def _wait_not_full(self):
+    if self.block_timeout is None:
+      while self._is_full():
+        self.not_full.wait()
+      return True
+
+    end_time = time.monotonic() + self.block_timeout
+    while self._is_full():
+      remaining = end_time - time.monotonic()
+      if remaining <= 0.0:
+        return False
+      self.not_full.wait(remaining)
+
+    return True
+
+  def _select_lane(self):
+    selected = None
+    for lane in self.lanes:
+      if len(lane.entries) == 0:
+        continue
+
+      if selected is None:
+        selected = lane
+      elif lane.skipped >= self.starvation_limit:
+        # lower lane waits too long, so process it instead
+        selected = lane
+        break
+
+    for lane in self.lanes:
+      if lane is selected:
+        lane.skipped = 0
+      elif len(lane.entries) > 0:
+        lane.skipped += 1
+
+    return selected
+
+  def _remove_key(self, entry):
+    if entry.key is not None and self.keys.get(entry.key) is entry:
+      del self.keys[entry.key]
+
+  def _pop(self):
+    lane = self._select_lane()
+    entry = lane.entries.popleft()
+    self.size -= 1
+    self._remove_key(entry)
+
+    return entry.task
+
+  def _pop_oldest(self):
+    # remove the oldest not forced task with the lowest priority and return it
+    for lane in reversed(self.lanes):
+      for idx, entry in enumerate(lane.entries):
+        if entry.force:
+          continue
+
+        del lane.entries[idx]
+        self.size -= 1
+        self._remove_key(entry)
+        return entry.task
+
+    return None
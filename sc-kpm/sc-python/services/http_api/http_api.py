@@ -1,6 +1,7 @@
 """This module implements http API for SmartHome
 """
 import asyncio
+import json
 import os
 import threading
 import tornado
@@ -64,6 +65,33 @@ class ContentHandler(tornado.web.RequestHandler):
     self.finish()
 
 
+class StatsHandler(tornado.web.RequestHandler):
+  """Returns statistics of http module and statistics of other modules,
+  that they write into `python.stats_path` directory (see `ScModule.stats_dump_interval`)
+  """
+
+  def initialize(self, module):
+    self.module = module
+
+  def get(self):
+    result = {}
+    stats_path = getScConfigValue('python', 'stats_path')
+    if stats_path and os.path.isdir(stats_path):
+      for file_name in sorted(os.listdir(stats_path)):
+        if not file_name.endswith('.json'):
+          continue
+        try:
+          with open(os.path.join(stats_path, file_name)) as f:
+            result[file_name[:-len('.json')]] = json.load(f)
+        except (OSError, ValueError):
+          pass
+
+    result[self.module.__class__.__name__] = self.module.GetStats()
+
+    self.set_header('Content-Type', 'application/json')
+    self.write(json.dumps(result, default=str))
+
+
 class ServerThread(threading.Thread):
 
   def __init__(self, module, address='', port=8090):
@@ -88,6 +116,7 @@ class ServerThread(threading.Thread):
     self.app = tornado.web.Application([
         (r"/ws_json", ScJsonSocketHandler, { 'evt_manager': self.module.events, 'ioloop': ioloop }),
         (r"/content/([0-9]+)", ContentHandler),
+        (r"/stats", StatsHandler, {'module': self.module}),
         (r'/assets/(.*)', self.staticHandler, {'path': self.assets_path}),
 
         # should be a last
@@ -105,18 +105,27 @@ class ScJsonSocketHandler(websocket.WebSocketHandler):
   def handleKeynodes(self, ctx, payload):
     result = [0] * len(payload)
 
-    idx = 0
-    for cmd in payload:
+    # all keynodes are resolved with one call of sc-memory. Registry of module keynodes
+    # isn't used, because clients can remove and create elements with any identifiers
+    request_idx = []
+    idtfs = []
+    types = []
+    for idx, cmd in enumerate(payload):
       cmdType = cmd['command']
-      idtf = cmd['idtf']
 
       if cmdType == 'find':
-        result[idx] = ctx.HelperResolveSystemIdtf(idtf, ScType.Unknown).ToInt()
+        types.append(None)
       elif cmdType == 'resolve':
-        elType = ScType(cmd['elType'])
-        result[idx] = ctx.HelperResolveSystemIdtf(idtf, elType).ToInt()
+        types.append(ScType(cmd['elType']))
+      else:
+        continue
 
-      idx += 1
+      request_idx.append(idx)
+      idtfs.append(cmd['idtf'])
+
+    addrs = ctx.HelperResolveSystemIdtfs(idtfs, types)
+    for idx, addr in zip(request_idx, addrs):
+      result[idx] = addr.ToInt()
 
     return result
 
@@ -0,0 +1,5 @@
+# Functions of offload tests. They run in worker processes, so this module doesn't import `sc` and `scb`
+
+
+def double_value(payload):
+  return payload[1] * 2
@@ -4,6 +4,10 @@ from common import *
 from sc import *
 
 from sc_tests.test_utils import *
+from sc_tests.offload_funcs import double_value
+
+
+import concurrent.futures
 
 class TestScAgent(TestCase):
 
@@ -38,3 +42,318 @@ class TestScAgent(TestCase):
     result_addr = ScAgentCommand.GetCommandResultAddr(ctx, cmd)
     self.assertFalse(result_addr.IsValid())
 
+
+  def test_offload_payload(self):
+    ctx = TestScAgent.MemoryCtx()
+
+    cmd_class = ctx.CreateNode(ScType.NodeConstClass)
+    node = ctx.CreateNode(ScType.NodeConst)
+    link_str = ctx.CreateLink()
+    self.assertTrue(ctx.SetLinkContent(link_str, 'text'))
+    link_int = ctx.CreateLink()
+    self.assertTrue(ctx.SetLinkContent(link_int, 56))
+
+    class Agent(ScAgentCommand):
+      offload_params = [1, 2, 3, 4]
+
+    agent = Agent(TestScAgent.module, cmd_class)
+    agent.cmd_addr = ScAgentCommand.CreateCommand(ctx, cmd_class, [node, link_str, link_int])
+
+    payload = agent.MakeOffloadPayload()
+    self.assertEqual(payload, {
+      1: node.ToInt(),
+      2: 'text',
+      3: 56,
+      4: None
+    })
+
+    agent.Unregister()
+
+  def test_offload(self):
+    ctx = TestScAgent.MemoryCtx()
+    module = TestScAgent.module
+
+    cmd_class = ctx.CreateNode(ScType.NodeConstClass)
+    link_int = ctx.CreateLink()
+    self.assertTrue(ctx.SetLinkContent(link_int, 21))
+    link_str = ctx.CreateLink()
+    self.assertTrue(ctx.SetLinkContent(link_str, 'text'))
+
+    class Agent(ScAgentCommand):
+      offload_func = double_value
+      offload_params = [1]
+
+      def ApplyOffloadResult(self, data):
+        if not isinstance(data, int):
+          return ScResult.ErrorInvalidParams
+
+        link = self.module.ctx.CreateLink()
+        self.module.ctx.SetLinkContent(link, data)
+        self.result_set.Add(link)
+        return ScResult.Ok
+
+    agent = Agent(module, cmd_class)
+    try:
+      cmds = ScAgentCommand.CreateCommands(ctx, [(cmd_class, [link_int]), (cmd_class, [link_str])])
+      futures = module.command_tracker.Track(cmds)
+      self.assertEqual(ScAgentCommand.RunCommands(ctx, cmds), [True, True])
+
+      WaitFor(module, lambda: not all(f.done() for f in futures), 10)
+
+      self.assertEqual([f.result() for f in futures], [ScResult.Ok, ScResult.ErrorInvalidParams])
+      for cmd in cmds:
+        self.assertTrue(ctx.HelperCheckEdge(
+            ScKeynodes.kCommandFinishedAddr(), cmd, ScType.EdgeAccessConstPosPerm))
+
+      it = ctx.Iterator3(
+          ScAgentCommand.GetCommandResultAddr(ctx, cmds[0]),
+          ScType.EdgeAccessConstPosPerm,
+          ScType.Link)
+      self.assertTrue(it.Next())
+      self.assertEqual(ctx.GetLinkContent(it.Get(2)).AsInt(), 42)
+
+      # runs are recorded, when offloaded functions are finished
+      stats = module.agent_stats.Snapshot()['Agent']
+      self.assertEqual(stats['invocations'], 2)
+      self.assertEqual(stats['results'], {'Ok': 1, 'ErrorInvalidParams': 1})
+    finally:
+      agent.Unregister()
+
+  def test_command_dispatcher(self):
+    ctx = TestScAgent.MemoryCtx()
+    module = TestScAgent.module
+
+    cmd_class1 = ctx.CreateNode(ScType.NodeConstClass)
+    cmd_class2 = ctx.CreateNode(ScType.NodeConstClass)
+
+    class Agent(ScAgentCommand):
+      def __init__(self, module, cmd_class_addr):
+        self.runs = []
+        ScAgentCommand.__init__(self, module, cmd_class_addr)
+
+      def DoCommand(self):
+        self.runs.append(self.cmd_addr)
+        return ScResult.Ok
+
+    agent1 = Agent(module, cmd_class1)
+    agent2 = Agent(module, cmd_class2)
+
+    try:
+      # agents share one event
+      self.assertIsNotNone(module.command_dispatcher.evt)
+      self.assertIsNone(agent1.evt)
+
+      cmd = ScAgentCommand.CreateCommand(ctx, cmd_class1, [])
+      self.assertTrue(ScAgentCommand.RunCommand(ctx, cmd))
+
+      WaitFor(module, lambda: len(agent1.runs) == 0, 3)
+
+      self.assertEqual(agent1.runs, [cmd])
+      self.assertEqual(agent2.runs, [])
+    finally:
+      agent1.Unregister()
+      agent2.Unregister()
+
+    self.assertIsNone(module.command_dispatcher.evt)
+
+  def test_command_params(self):
+    ctx = TestScAgent.MemoryCtx()
+
+    cmd_class = ctx.CreateNode(ScType.NodeConstClass)
+    params = [ctx.CreateNode(ScType.NodeConst) for _ in range(3)]
+
+    agent = ScAgentCommand(TestScAgent.module, cmd_class)
+    try:
+      agent.cmd_addr = ScAgentCommand.CreateCommand(ctx, cmd_class, params)
+
+      self.assertEqual(agent.GetParam(1), params[0])
+      self.assertEqual(agent.GetParam(3), params[2])
+      self.assertFalse(agent.GetParam(4).IsValid())
+
+      self.assertEqual(agent.GetParams(), {
+        1: params[0],
+        2: params[1],
+        3: params[2],
+      })
+    finally:
+      agent.Unregister()
+
+  def test_command_params_many(self):
+    ctx = TestScAgent.MemoryCtx()
+
+    cmd_class = ctx.CreateNode(ScType.NodeConstClass)
+    params = [ctx.CreateNode(ScType.NodeConst) for _ in range(2)]
+
+    agent = ScAgentCommand(TestScAgent.module, cmd_class)
+    try:
+      agent.cmd_addr = ScAgentCommand.CreateCommand(ctx, cmd_class, params)
+
+      # attributes with index greater then `kMaxParams`
+      index = ScAgentCommand.kMaxParams + 1
+      param = ctx.CreateNode(ScType.NodeConst)
+      rrel_addr = ctx.HelperResolveSystemIdtf('rrel_{}'.format(index), ScType.NodeConstRole)
+      edge = ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, agent.cmd_addr, param)
+      ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, rrel_addr, edge)
+
+      # attribute, that isn't `rrel_<index>`
+      other_attr = ctx.CreateNode(ScType.NodeConstRole)
+      edge = ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, agent.cmd_addr, ctx.CreateNode(ScType.NodeConst))
+      ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, other_attr, edge)
+
+      self.assertEqual(agent.GetParams(), {
+        1: params[0],
+        2: params[1],
+        index: param,
+      })
+      self.assertEqual(agent.GetParam(index), param)
+    finally:
+      agent.Unregister()
+
+  def test_run_commands(self):
+    ctx = TestScAgent.MemoryCtx()
+    module = TestScAgent.module
+
+    cmd_class = ctx.CreateNode(ScType.NodeConstClass)
+    param = ctx.CreateNode(ScType.NodeConst)
+
+    class Agent(ScAgentCommand):
+      def DoCommand(self):
+        if self.GetParam(1).IsValid():
+          return ScResult.Ok
+        return ScResult.ErrorInvalidParams
+
+    agent = Agent(module, cmd_class)
+    try:
+      futures = module.RunCommands([
+          (cmd_class, [param]),
+          (cmd_class, []),
+      ])
+      self.assertEqual(len(futures), 2)
+
+      WaitFor(module, lambda: not all(f.done() for f in futures), 3)
+
+      self.assertEqual(futures[0].result(), ScResult.Ok)
+      self.assertEqual(futures[1].result(), ScResult.ErrorInvalidParams)
+      self.assertEqual(len(module.command_tracker.futures), 0)
+    finally:
+      agent.Unregister()
+
+  def test_run_commands_timeout(self):
+    ctx = TestScAgent.MemoryCtx()
+    module = TestScAgent.module
+
+    # there are no agents of this class, so commands aren't finished
+    cmd_class = ctx.CreateNode(ScType.NodeConstClass)
+
+    futures = module.RunCommands([(cmd_class, [])], timeout=0.1)
+
+    WaitFor(module, lambda: not futures[0].done(), 3)
+
+    with self.assertRaises(concurrent.futures.TimeoutError):
+      futures[0].result()
+    self.assertEqual(len(module.command_tracker.futures), 0)
+
+    # cancelled command isn't tracked
+    futures = module.RunCommands([(cmd_class, [])])
+    self.assertEqual(len(module.command_tracker.futures), 1)
+    self.assertTrue(futures[0].cancel())
+    self.assertEqual(len(module.command_tracker.futures), 0)
+
+  def test_memoize(self):
+    ctx = TestScAgent.MemoryCtx()
+    module = TestScAgent.module
+
+    cmd_class = ctx.CreateNode(ScType.NodeConstClass)
+    link = ctx.CreateLink()
+    ctx.SetLinkContent(link, 'value')
+
+    class Agent(ScAgentCommand):
+      memoize = True
+
+      def __init__(self, module, cmd_class_addr):
+        self.calls = 0
+        ScAgentCommand.__init__(self, module, cmd_class_addr)
+
+      def DoCommand(self):
+        self.calls += 1
+        return ScResult.Ok
+
+    def run_command():
+      cmd = ScAgentCommand.CreateCommand(ctx, cmd_class, [link])
+      futures = module.command_tracker.Track([cmd])
+      self.assertTrue(ScAgentCommand.RunCommand(ctx, cmd))
+
+      WaitFor(module, lambda: not futures[0].done(), 3)
+
+      self.assertEqual(futures[0].result(), ScResult.Ok)
+      return ScAgentCommand.GetCommandResultAddr(ctx, cmd)
+
+    agent = Agent(module, cmd_class)
+    try:
+      res1 = run_command()
+      res2 = run_command()
+      self.assertEqual(agent.calls, 1)
+      self.assertEqual(res1, res2)
+
+      # change of parameter invalidates memoized result
+      ctx.SetLinkContent(link, 'new_value')
+      WaitFor(module, lambda: len(agent.memo) > 0, 3)
+
+      res3 = run_command()
+      self.assertEqual(agent.calls, 2)
+      self.assertNotEqual(res1, res3)
+    finally:
+      agent.Unregister()
+
+  def test_memoize_result_changed(self):
+    ctx = TestScAgent.MemoryCtx()
+    module = TestScAgent.module
+
+    cmd_class = ctx.CreateNode(ScType.NodeConstClass)
+    param = ctx.CreateNode(ScType.NodeConst)
+
+    class Agent(ScAgentCommand):
+      memoize = True
+
+      def __init__(self, module, cmd_class_addr):
+        self.calls = 0
+        ScAgentCommand.__init__(self, module, cmd_class_addr)
+
+      def DoCommand(self):
+        self.calls += 1
+        self.result_set.Add(param)
+        return ScResult.Ok
+
+    def run_command():
+      cmd = ScAgentCommand.CreateCommand(ctx, cmd_class, [param])
+      futures = module.command_tracker.Track([cmd])
+      self.assertTrue(ScAgentCommand.RunCommand(ctx, cmd))
+
+      WaitFor(module, lambda: not futures[0].done(), 3)
+
+      self.assertEqual(futures[0].result(), ScResult.Ok)
+      return ScAgentCommand.GetCommandResultAddr(ctx, cmd)
+
+    agent = Agent(module, cmd_class)
+    try:
+      # own changes of result structure don't invalidate it
+      res1 = run_command()
+      self.assertEqual(len(agent.memo), 1)
+
+      # new element in result structure invalidates it
+      ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, res1, ctx.CreateNode(ScType.NodeConst))
+      WaitFor(module, lambda: len(agent.memo) > 0, 3)
+
+      self.assertEqual(len(agent.memo), 0)
+
+      res2 = run_command()
+      self.assertEqual(agent.calls, 2)
+
+      # erased result structure isn't used, even if its event isn't processed yet
+      ctx.DeleteElement(res2)
+      res3 = run_command()
+      self.assertEqual(agent.calls, 3)
+      self.assertTrue(ctx.IsElement(res3))
+      self.assertNotEqual(res2, res3)
+    finally:
+      agent.Unregister()
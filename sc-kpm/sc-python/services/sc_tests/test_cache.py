@@ -0,0 +1,76 @@
+from unittest import TestCase
+
+from common import *
+from sc import *
+from scb import *
+
+from sc_tests.test_utils import *
+
+class TestScEventCache(TestCase):
+
+  def test_lru(self):
+    cache = ScEventCache(TestScEventCache.module.events, 2)
+
+    cache.Put('a', 1)
+    cache.Put('b', 2)
+    self.assertEqual(cache.Get('a'), 1)
+
+    # `b` is the least recently used
+    cache.Put('c', 3)
+    self.assertIsNone(cache.Get('b'))
+    self.assertEqual(cache.Get('a'), 1)
+    self.assertEqual(cache.Get('c'), 3)
+
+    snapshot = cache.Snapshot()
+    self.assertEqual(snapshot['size'], 2)
+    self.assertEqual(snapshot['hits'], 3)
+    self.assertEqual(snapshot['misses'], 1)
+    self.assertEqual(snapshot['evictions'], 1)
+
+    cache.Invalidate('a')
+    self.assertIsNone(cache.Get('a'))
+    self.assertEqual(len(cache), 1)
+
+  def test_invalidate_by_event(self):
+    ctx = TestScEventCache.MemoryCtx()
+    module = TestScEventCache.module
+
+    link = ctx.CreateLink()
+    cache = ScEventCache(module.events)
+    cache.Put('key', 'value', [(link, ScPythonEventType.ContentChanged)])
+    self.assertEqual(cache.Get('key'), 'value')
+
+    ctx.SetLinkContent(link, 'new_value')
+
+    WaitFor(module, lambda: len(cache) > 0, 3)
+
+    self.assertIsNone(cache.Get('key'))
+    self.assertEqual(cache.Snapshot()['invalidations'], 1)
+
+  def test_reserve(self):
+    ctx = TestScEventCache.MemoryCtx()
+    module = TestScEventCache.module
+
+    link = ctx.CreateLink()
+    cache = ScEventCache(module.events)
+
+    # value is changed, while it's loaded
+    token = cache.Reserve('key', [(link, ScPythonEventType.ContentChanged)])
+    ctx.SetLinkContent(link, 'value')
+
+    WaitFor(module, lambda: not token.invalidated, 3)
+
+    self.assertFalse(cache.Put('key', 'old_value', token=token))
+    self.assertIsNone(cache.Get('key'))
+
+    # invalidated by own change
+    token = cache.Reserve('key', [(link, ScPythonEventType.ContentChanged)])
+    cache.Invalidate('key')
+    self.assertFalse(cache.Put('key', 'old_value', token=token))
+
+    token = cache.Reserve('key', [(link, ScPythonEventType.ContentChanged)])
+    self.assertTrue(cache.Put('key', 'value', token=token))
+    self.assertEqual(cache.Get('key'), 'value')
+    self.assertEqual(len(cache.reserved), 0)
+
+    cache.Clear()
@@ -1,12 +1,10 @@
 from unittest import TestCase
-from datetime import datetime
 
 from common import *
 from sc import *
 
 from sc_tests.test_utils import *
 
-import time
 
 class TestEvents(TestCase):
 
@@ -15,13 +13,7 @@ class TestEvents(TestCase):
     events = TestEvents.module.events
 
     def waitTimeout(seconds, checkFunc):
-      start = datetime.now()
-      delta = 0
-
-      while not checkFunc() and delta < seconds:
-        TestEvents.module.EmitEvents()
-        delta = (datetime.now() - start).seconds
-        time.sleep(0.1)
+      WaitFor(TestEvents.module, checkFunc, seconds)
 
     addr1 = ctx.CreateNode(ScType.NodeConst)
     addr2 = ctx.CreateNode(ScType.NodeConst)
@@ -46,4 +38,223 @@ class TestEvents(TestCase):
     edge1 = ctx.CreateEdge(ScType.EdgeAccess, addr1, addr2)
     waitTimeout(3, check.isPassed)
 
-    self.assertTrue(check.isPassed())
\ No newline at end of file
+    self.assertTrue(check.isPassed())
+
+  def test_event_stats(self):
+    ctx = TestEvents.MemoryCtx()
+    module = TestEvents.module
+    events = module.events
+
+    addr1 = ctx.CreateNode(ScType.NodeConst)
+    addr2 = ctx.CreateNode(ScType.NodeConst)
+
+    emited = []
+    evt = events.CreateEventAddOutputEdge(addr1, emited.append)
+
+    module.collect_event_stats = True
+    try:
+      ctx.CreateEdge(ScType.EdgeAccess, addr1, addr2)
+
+      WaitFor(module, lambda: len(emited) == 0, 3)
+    finally:
+      module.collect_event_stats = False
+      events.DestroyEvent(evt)
+
+    self.assertEqual(len(emited), 1)
+    self.assertIsNotNone(emited[0].emit_time)
+
+    stats = module.GetStats()
+    self.assertTrue('events' in stats)
+    self.assertTrue('queue_depth' in stats)
+
+    evt_stats = stats['events'][str(ScPythonEventType.AddOutputEdge)]
+    self.assertGreater(evt_stats['run']['count'], 0)
+    self.assertGreater(evt_stats['wait']['count'], 0)
+
+  def test_event_coalesce(self):
+    ctx = TestEvents.MemoryCtx()
+    module = TestEvents.module
+    events = module.events
+
+    link = ctx.CreateLink()
+    # edge of each event marks its params
+    edges = [ctx.CreateNode(ScType.NodeConst) for _ in range(6)]
+
+    emited = []
+    evt = events.CreateEventContentChanged(link, emited.append, coalesce=0.2)
+
+    try:
+      eid = evt.evt.GetID()
+      merged_events = module.GetStats()['merged_events']
+
+      # events come into module before it processes them, so they are merged
+      for edge in edges[:5]:
+        module.HandleOnEvent(eid, link, edge, link)
+
+      self.assertTrue(WaitFor(module, lambda: len(emited) == 1, 10))
+      self.assertEqual(emited[0].edge_addr, edges[4])
+      self.assertEqual(evt.merged, 4)
+      self.assertEqual(module.GetStats()['merged_events'] - merged_events, 4)
+
+      # event in coalescing window is delivered after it
+      module.HandleOnEvent(eid, link, edges[5], link)
+      self.assertTrue(WaitFor(module, lambda: len(emited) == 2, 10))
+      self.assertEqual(emited[1].edge_addr, edges[5])
+      self.assertEqual(evt.merged, 4)
+    finally:
+      events.DestroyEvent(evt)
+
+  def test_event_coalesce_dropped(self):
+    ctx = TestEvents.MemoryCtx()
+    module = TestEvents.module
+    events = module.events
+
+    link = ctx.CreateLink()
+
+    emited = []
+    evt = events.CreateEventContentChanged(link, emited.append, coalesce=0)
+
+    task_queue = module.task_queue
+    max_size, policy = task_queue.max_size, task_queue.policy
+    try:
+      eid = evt.evt.GetID()
+
+      # queue is full, so event is dropped
+      task_queue.max_size = 1
+      task_queue.policy = ScQueuePolicy.DropNewest
+      try:
+        module.CallLater(lambda: None)
+        module.HandleOnEvent(eid, link, ScAddr(), link)
+      finally:
+        task_queue.max_size = max_size
+        task_queue.policy = policy
+
+      while module.EmitEvents() > 0:
+        pass
+
+      self.assertEqual(len(emited), 0)
+
+      # the next event of the same element isn't merged with dropped one
+      module.HandleOnEvent(eid, link, ScAddr(), link)
+      while module.EmitEvents() > 0:
+        pass
+
+      self.assertEqual(len(emited), 1)
+      self.assertEqual(evt.merged, 0)
+    finally:
+      events.DestroyEvent(evt)
+
+  def test_call_delayed(self):
+    module = TestEvents.module
+
+    called = []
+    module.CallDelayed(0.2, called.append, 1)
+
+    module.EmitEvents()
+    self.assertEqual(len(called), 0)
+
+    WaitFor(module, lambda: len(called) == 0, 2)
+
+    self.assertEqual(called, [1])
+
+  def test_shared_subscription(self):
+    ctx = TestEvents.MemoryCtx()
+    module = TestEvents.module
+    events = module.events
+
+    addr1 = ctx.CreateNode(ScType.NodeConst)
+    addr2 = ctx.CreateNode(ScType.NodeConst)
+
+    emited1 = []
+    emited2 = []
+    evt1 = events.CreateEventAddOutputEdge(addr1, emited1.append)
+    evt2 = events.CreateEventAddOutputEdge(addr1, emited2.append)
+
+    def wait(check):
+      WaitFor(module, lambda: not check(), 3)
+
+    try:
+      self.assertNotEqual(evt1.GetID(), evt2.GetID())
+      # both events use one native subscription
+      self.assertIs(evt1.evt, evt2.evt)
+
+      ctx.CreateEdge(ScType.EdgeAccess, addr1, addr2)
+      wait(lambda: len(emited1) > 0 and len(emited2) > 0)
+
+      self.assertEqual(len(emited1), 1)
+      self.assertEqual(len(emited2), 1)
+      self.assertEqual(emited1[0].id, evt1.GetID())
+      self.assertEqual(emited2[0].id, evt2.GetID())
+
+      events.DestroyEvent(evt1)
+      self.assertTrue(evt2.evt.GetID() in events.subscriptions)
+
+      ctx.CreateEdge(ScType.EdgeAccess, addr1, addr2)
+      wait(lambda: len(emited2) > 1)
+
+      self.assertEqual(len(emited1), 1)
+      self.assertEqual(len(emited2), 2)
+    finally:
+      events.DestroyEvent(evt1)
+      events.DestroyEvent(evt2)
+
+    self.assertFalse(evt2.evt.GetID() in events.subscriptions)
+
+  def test_event_batch(self):
+    ctx = TestEvents.MemoryCtx()
+    module = TestEvents.module
+    events = module.events
+
+    addr1 = ctx.CreateNode(ScType.NodeConst)
+    addr2 = ctx.CreateNode(ScType.NodeConst)
+
+    emited = []
+    evt = events.CreateEventAddOutputEdge(addr1, emited.append)
+
+    try:
+      eid = evt.evt.GetID()
+      module.HandleOnEventBatch([
+          (eid, addr1, ScAddr(), addr2, None),
+          (eid, addr1, ScAddr(), addr2, None),
+      ])
+
+      while module.EmitEvents() > 0:
+        pass
+
+      self.assertEqual(len(emited), 2)
+      self.assertEqual(emited[0].id, evt.GetID())
+      self.assertEqual(emited[0].other_addr, addr2)
+    finally:
+      events.DestroyEvent(evt)
+
+  def test_event_filter(self):
+    ctx = TestEvents.MemoryCtx()
+    module = TestEvents.module
+    events = module.events
+
+    addr1 = ctx.CreateNode(ScType.NodeConst)
+    addr2 = ctx.CreateNode(ScType.NodeConst)
+    addr3 = ctx.CreateNode(ScType.NodeConst)
+    cls = ctx.CreateNode(ScType.NodeConstClass)
+    ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, cls, addr3)
+
+    emited = []
+    evt = events.CreateEventAddOutputEdge(
+        addr1, emited.append, event_filter=ScEventFilter(other_in_class=cls))
+
+    try:
+      ctx.CreateEdge(ScType.EdgeAccess, addr1, addr2)
+      ctx.CreateEdge(ScType.EdgeAccess, addr1, addr3)
+
+      WaitFor(module, lambda: len(emited) == 0, 3)
+
+      # wait a bit more to be sure, that filtered event doesn't come
+      for _ in range(10):
+        module.EmitEvents()
+
+      self.assertEqual(len(emited), 1)
+      self.assertEqual(emited[0].other_addr, addr3)
+      self.assertEqual(evt.evt.GetFilteredCount(), 1)
+      self.assertGreaterEqual(module.GetStats()['filtered_events'], 1)
+    finally:
+      events.DestroyEvent(evt)
@@ -91,82 +91,144 @@ class TestScHelper(TestCase):
 
     self.assertEqual(value, 'test_data')
 
-  # def test_updateStructureValues(self):
-  #   ctx = TestScHelper.MemoryCtx()
-
-  #   addr = ctx.CreateNode(ScType.NodeConstStruct)
-  #   other_addr = ctx.CreateNode(ScType.NodeConstNoRole)
-
-  #   rrel_name = ctx.CreateNode(ScType.NodeConstRole)
-  #   rrel_mass = ctx.CreateNode(ScType.NodeConstRole)
-  #   rrel_height = ctx.CreateNode(ScType.NodeConstRole)
-  #   rrel_other = ctx.CreateNode(ScType.NodeConstRole)
-  #   rrel_new = ctx.CreateNode(ScType.NodeConstRole)
-
-  #   # empty structure setup
-  #   name = 'name_1'
-  #   mass = 78.9
-  #   height = 178
-
-  #   helper = ScHelper(ctx)
-  #   helper.kbUpdateStructureValues(addr, [
-  #     (rrel_name, name),
-  #     (rrel_mass, mass),
-  #     (rrel_height, height),
-  #     (rrel_other, other_addr)
-  #   ])
-
-  #   templ = ScTemplate()
-  #   templ.TripleWithRelation(addr, ScType.EdgeAccessVarPosPerm, ScType.Link >> "_name", ScType.EdgeAccessVarPosPerm, rrel_name)
-  #   templ.TripleWithRelation(addr, ScType.EdgeAccessVarPosPerm, ScType.Link >> "_mass", ScType.EdgeAccessVarPosPerm, rrel_mass)
-  #   templ.TripleWithRelation(addr, ScType.EdgeAccessVarPosPerm, ScType.Link >> "_height", ScType.EdgeAccessVarPosPerm, rrel_height)
-  #   templ.TripleWithRelation(addr, ScType.EdgeAccessVarPosPerm, ScType.NodeVar >> "_other", ScType.EdgeAccessVarPosPerm, rrel_other)
-
-  #   result = ctx.HelperSearchTemplate(templ)
-  #   self.assertEqual(result.Size(), 1)
-
-  #   self.assertEqual(result[0]['_other'], other_addr)
-    
-  #   name_content = ctx.GetLinkContent(result[0]['_name'])
-  #   self.assertEqual(name_content.GetType(), ScLinkContent.String)
-  #   self.assertEqual(name_content.GetValue().AsString(), name)
-
-  #   mass_content = ctx.GetLinkContent(result[0]['_mass'])
-  #   self.assertEqual(mass_content.GetType(), ScLinkContent.Float)
-  #   self.assertEqual(mass_content.GetValue().AsFloat(), mass)
-
-  #   height_content = ctx.GetLinkContent(result[0]['_height'])
-  #   self.assertEqual(height_content.GetType(), ScLinkContent.Int)
-  #   self.assertEqual(height_content.GetValue().AsFloat(), height)
-
-  #   # update existing
-  #   helper.kbUpdateStructureValues(addr, [
-  #     (rrel_name, mass),
-  #     (rrel_other, name),
-  #     (rrel_new, height),
-  #     (rrel_mass, other_addr)
-  #   ])
-
-  #   templ = ScTemplate()
-  #   templ.TripleWithRelation(addr, ScType.EdgeAccessVarPosPerm, ScType.NodeVar >> "_mass", ScType.EdgeAccessVarPosPerm, rrel_mass)
-  #   templ.TripleWithRelation(addr, ScType.EdgeAccessVarPosPerm, ScType.Link >> "_name", ScType.EdgeAccessVarPosPerm, rrel_name)
-  #   templ.TripleWithRelation(addr, ScType.EdgeAccessVarPosPerm, ScType.Link >> "_height", ScType.EdgeAccessVarPosPerm, rrel_height)
-  #   templ.TripleWithRelation(addr, ScType.EdgeAccessVarPosPerm, ScType.Link >> "_other", ScType.EdgeAccessVarPosPerm, rrel_other)
-  #   templ.TripleWithRelation(addr, ScType.EdgeAccessVarPosPerm, ScType.Link >> "_new", ScType.EdgeAccessVarPosPerm, rrel_new)
-
-  #   result = ctx.HelperSearchTemplate(templ)
-  #   self.assertEqual(result.Size(), 1)
-
-  #   self.assertEqual(result[0]['_mass'], other_addr)
-
-  #   name_content = ctx.GetLinkContent(result[0]['_name'])
-  #   self.assertEqual(name_content.GetType(), ScLinkContent.Float)
-  #   self.assertEqual(name_content.GetValue().AsString(), mass)
-
-  #   ohter_content = ctx.GetLinkContent(result[0]['_other'])
-  #   self.assertEqual(ohter_content.GetType(), ScLinkContent.String)
-  #   self.assertEqual(ohter_content.GetValue().AsString(), name)
-
-  #   new_content = ctx.GetLinkContent(result[0]['_new'])
-  #   self.assertEqual(new_content.GetType(), ScLinkContent.Int)
-  #   self.assertEqual(new_content.GetValue().AsString(), height)
\ No newline at end of file
+  def test_cache(self):
+    ctx = TestScHelper.MemoryCtx()
+    module = TestScHelper.module
+
+    addr = ctx.CreateNode(ScType.NodeConst)
+    relAddr = ctx.CreateNode(ScType.NodeConstNoRole)
+
+    helper = ScHelper(ctx, module.events)
+    self.assertIsNone(helper.kbGetBinaryRelationLinkValue(addr, relAddr))
+
+    helper.kbSetBinaryRelationLinkValue(addr, relAddr, 'test_data')
+    self.assertEqual(helper.kbGetBinaryRelationLinkValue(addr, relAddr).AsString(), 'test_data')
+    self.assertEqual(helper.kbGetBinaryRelationLinkValue(addr, relAddr).AsString(), 'test_data')
+    self.assertEqual(helper.cache.Snapshot()['hits'], 1)
+
+    # own changes are visible immediately
+    helper.kbSetBinaryRelationLinkValue(addr, relAddr, 'test_data2')
+    self.assertEqual(helper.kbGetBinaryRelationLinkValue(addr, relAddr).AsString(), 'test_data2')
+
+    # changes of other contexts come with events
+    linkAddr = helper.kbGetBinaryRelationLinkAddr(addr, relAddr)
+    ctx.SetLinkContent(linkAddr, 'test_data3')
+
+    WaitFor(module, lambda: helper.kbGetBinaryRelationLinkValue(addr, relAddr).AsString() != 'test_data3', 3)
+    self.assertEqual(helper.kbGetBinaryRelationLinkValue(addr, relAddr).AsString(), 'test_data3')
+
+    ctx.DeleteElement(linkAddr)
+    WaitFor(module, lambda: helper.kbGetBinaryRelationLinkAddr(addr, relAddr) is not None, 3)
+    self.assertIsNone(helper.kbGetBinaryRelationLinkAddr(addr, relAddr))
+
+    helper.cache.Clear()
+
+  def test_cache_updateStructureValues(self):
+    ctx = TestScHelper.MemoryCtx()
+    module = TestScHelper.module
+
+    addr = ctx.CreateNode(ScType.NodeConst)
+    relAddr = ctx.CreateNode(ScType.NodeConstRole)
+
+    helper = ScHelper(ctx, module.events)
+    helper.kbSetBinaryRelationLinkValue(addr, relAddr, 'test_data')
+    linkAddr = helper.kbGetBinaryRelationLinkAddr(addr, relAddr)
+
+    # the same link is a value of structure
+    edge = ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, addr, linkAddr)
+    ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, relAddr, edge)
+
+    self.assertEqual(helper.kbGetBinaryRelationLinkValue(addr, relAddr).AsString(), 'test_data')
+
+    # cached value is updated without events
+    self.assertTrue(helper.kbUpdateStructureValues(addr, [(relAddr, 'test_data2')]))
+    self.assertEqual(helper.kbGetBinaryRelationLinkValue(addr, relAddr).AsString(), 'test_data2')
+
+    helper.cache.Clear()
+
+  def test_updateStructureValues(self):
+    ctx = TestScHelper.MemoryCtx()
+
+    addr = ctx.CreateNode(ScType.NodeConstStruct)
+    other_addr = ctx.CreateNode(ScType.NodeConstNoRole)
+
+    rrel_name = ctx.CreateNode(ScType.NodeConstRole)
+    rrel_mass = ctx.CreateNode(ScType.NodeConstRole)
+    rrel_height = ctx.CreateNode(ScType.NodeConstRole)
+    rrel_other = ctx.CreateNode(ScType.NodeConstRole)
+    rrel_new = ctx.CreateNode(ScType.NodeConstRole)
+
+    # empty structure setup
+    name = 'name_1'
+    mass = 78.9
+    height = 178
+
+    helper = ScHelper(ctx)
+    self.assertTrue(helper.kbUpdateStructureValues(addr, [
+      (rrel_name, name),
+      (rrel_mass, mass),
+      (rrel_height, height),
+      (rrel_other, other_addr)
+    ]))
+
+    templ = ScTemplate()
+    templ.TripleWithRelation(addr, ScType.EdgeAccessVarPosPerm, ScType.Link >> "_name", ScType.EdgeAccessVarPosPerm, rrel_name)
+    templ.TripleWithRelation(addr, ScType.EdgeAccessVarPosPerm, ScType.Link >> "_mass", ScType.EdgeAccessVarPosPerm, rrel_mass)
+    templ.TripleWithRelation(addr, ScType.EdgeAccessVarPosPerm, ScType.Link >> "_height", ScType.EdgeAccessVarPosPerm, rrel_height)
+    templ.TripleWithRelation(addr, ScType.EdgeAccessVarPosPerm, ScType.Unknown >> "_other", ScType.EdgeAccessVarPosPerm, rrel_other)
+
+    result = ctx.HelperSearchTemplate(templ)
+    self.assertEqual(result.Size(), 1)
+
+    self.assertEqual(result[0]['_other'], other_addr)
+
+    name_content = ctx.GetLinkContent(result[0]['_name'])
+    self.assertEqual(name_content.GetType(), ScLinkContent.String)
+    self.assertEqual(name_content.AsString(), name)
+
+    mass_content = ctx.GetLinkContent(result[0]['_mass'])
+    self.assertEqual(mass_content.GetType(), ScLinkContent.Float)
+    self.assertAlmostEqual(mass_content.AsFloat(), mass, places=5)
+
+    height_content = ctx.GetLinkContent(result[0]['_height'])
+    self.assertEqual(height_content.GetType(), ScLinkContent.Int)
+    self.assertEqual(height_content.AsInt(), height)
+
+    name_link = result[0]['_name']
+
+    # update existing
+    self.assertTrue(helper.kbUpdateStructureValues(addr, [
+      (rrel_name, mass),
+      (rrel_other, name),
+      (rrel_new, height),
+      (rrel_mass, other_addr)
+    ]))
+
+    templ = ScTemplate()
+    templ.TripleWithRelation(addr, ScType.EdgeAccessVarPosPerm, ScType.Unknown >> "_mass", ScType.EdgeAccessVarPosPerm, rrel_mass)
+    templ.TripleWithRelation(addr, ScType.EdgeAccessVarPosPerm, ScType.Link >> "_name", ScType.EdgeAccessVarPosPerm, rrel_name)
+    templ.TripleWithRelation(addr, ScType.EdgeAccessVarPosPerm, ScType.Link >> "_height", ScType.EdgeAccessVarPosPerm, rrel_height)
+    templ.TripleWithRelation(addr, ScType.EdgeAccessVarPosPerm, ScType.Link >> "_other", ScType.EdgeAccessVarPosPerm, rrel_other)
+    templ.TripleWithRelation(addr, ScType.EdgeAccessVarPosPerm, ScType.Link >> "_new", ScType.EdgeAccessVarPosPerm, rrel_new)
+
+    result = ctx.HelperSearchTemplate(templ)
+    self.assertEqual(result.Size(), 1)
+
+    self.assertEqual(result[0]['_mass'], other_addr)
+
+    # content of existing link is changed
+    self.assertEqual(result[0]['_name'], name_link)
+    name_content = ctx.GetLinkContent(result[0]['_name'])
+    self.assertEqual(name_content.GetType(), ScLinkContent.Float)
+    self.assertAlmostEqual(name_content.AsFloat(), mass, places=5)
+
+    other_content = ctx.GetLinkContent(result[0]['_other'])
+    self.assertEqual(other_content.GetType(), ScLinkContent.String)
+    self.assertEqual(other_content.AsString(), name)
+
+    new_content = ctx.GetLinkContent(result[0]['_new'])
+    self.assertEqual(new_content.GetType(), ScLinkContent.Int)
+    self.assertEqual(new_content.AsInt(), height)
+
+    # replaced element isn't deleted
+    self.assertTrue(ctx.IsElement(other_addr))
@@ -0,0 +1,85 @@
+from unittest import TestCase
+
+import json
+import os
+import tempfile
+
+from common import *
+from sc import *
+
+from sc_tests.test_utils import *
+
+class TestScKeynodes(TestCase):
+
+  def test_registry(self):
+    ctx = TestScKeynodes.MemoryCtx()
+    registry = ScKeynodeRegistry()
+
+    addrs = registry.GetMany(ctx, ['sc_result', 'test_keynodes_registry_idtf'])
+    self.assertTrue(addrs[0].IsValid())
+    self.assertFalse(addrs[1].IsValid())
+    self.assertEqual(registry.Peek('sc_result'), addrs[0])
+
+    # missed identifier is cached until ttl ends
+    addr = ctx.CreateNode(ScType.NodeConst)
+    self.assertTrue(ctx.HelperSetSystemIdtf('test_keynodes_registry_idtf', addr))
+    self.assertFalse(registry.Get(ctx, 'test_keynodes_registry_idtf').IsValid())
+
+    registry.Invalidate('test_keynodes_registry_idtf')
+    self.assertEqual(registry.Get(ctx, 'test_keynodes_registry_idtf'), addr)
+
+  def test_registry_resolve(self):
+    ctx = TestScKeynodes.MemoryCtx()
+    registry = ScKeynodeRegistry()
+
+    self.assertFalse(registry.Get(ctx, 'test_keynodes_resolve_idtf').IsValid())
+
+    # resolve with type ignores missed identifiers
+    addrs = registry.ResolveMany(ctx, ['test_keynodes_resolve_idtf'], [ScType.NodeConst])
+    self.assertTrue(addrs[0].IsValid())
+    self.assertEqual(registry.Get(ctx, 'test_keynodes_resolve_idtf'), addrs[0])
+
+  def test_snapshot(self):
+    ctx = TestScKeynodes.MemoryCtx()
+    addr = ctx.CreateNode(ScType.NodeConst)
+    self.assertTrue(ctx.HelperSetSystemIdtf('test_keynodes_snapshot_idtf', addr))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      path = os.path.join(tmp_dir, 'keynodes.json')
+
+      registry = ScKeynodeRegistry()
+      registry.GetMany(ctx, ['sc_result', 'test_keynodes_snapshot_idtf'])
+      self.assertTrue(registry.changed)
+      self.assertTrue(registry.SaveSnapshot(path))
+      self.assertFalse(registry.changed)
+
+      # keynodes from snapshot are validated on the first request
+      registry = ScKeynodeRegistry()
+      self.assertTrue(registry.LoadSnapshot(path))
+      self.assertFalse(registry.Peek('sc_result').IsValid())
+      self.assertEqual(registry.Get(ctx, 'sc_result'), ScKeynodes(ctx)['sc_result'])
+      self.assertEqual(registry.Peek('sc_result'), ScKeynodes(ctx)['sc_result'])
+
+      # element was removed after snapshot was made
+      self.assertTrue(ctx.DeleteElement(addr))
+      registry = ScKeynodeRegistry()
+      self.assertTrue(registry.LoadSnapshot(path))
+      self.assertFalse(registry.Get(ctx, 'test_keynodes_snapshot_idtf').IsValid())
+
+      # stale keynodes aren't written back
+      self.assertTrue(registry.SaveSnapshot(path))
+      with open(path) as f:
+        self.assertNotIn('test_keynodes_snapshot_idtf', json.load(f)['keynodes'])
+
+      # snapshot of another repository generation is ignored
+      with open(path, 'w') as f:
+        json.dump({'generation': 'test_generation', 'keynodes': {'sc_result': 0}}, f)
+      self.assertFalse(ScKeynodeRegistry().LoadSnapshot(path))
+
+  def test_shared(self):
+    ctx = TestScKeynodes.MemoryCtx()
+    keynodes1 = ScKeynodes(ctx)
+    keynodes2 = ScKeynodes(ctx)
+
+    self.assertEqual(keynodes1['sc_result'], keynodes2['sc_result'])
+    self.assertEqual(ScKeynodes.registry.Peek('sc_result'), keynodes1['sc_result'])
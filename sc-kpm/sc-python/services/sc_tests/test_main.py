@@ -6,6 +6,12 @@ from sc_tests.test_helper import TestScHelper
 from sc_tests.test_memory_ctx import TestScMemoryContext
 from sc_tests.test_set import TestScSet
 from sc_tests.test_agent import TestScAgent
+from sc_tests.test_module import TestScModule
+from sc_tests.test_module_async import TestAsyncScModule
+from sc_tests.test_task_queue import TestScTaskQueue
+from sc_tests.test_stats import TestScStats
+from sc_tests.test_cache import TestScEventCache
+from sc_tests.test_keynodes import TestScKeynodes
 
 from sc_tests.test_utils import CreateNodeWithIdtf
 
@@ -34,6 +40,12 @@ def RunTests():
     TestScSet,
     TestEvents,
     TestScHelper,
+    TestScModule,
+    TestAsyncScModule,
+    TestScTaskQueue,
+    TestScStats,
+    TestScEventCache,
+    TestScKeynodes,
     ]
 
   for testItem in tests:
@@ -244,6 +244,51 @@ class TestScMemoryContext(TestCase):
         ScType.Node)
     test_common(itAAFAA)
 
+  def test_iterator_batch(self):
+    ctx = TestScMemoryContext.MemoryCtx()
+
+    addr = ctx.CreateNode(ScType.NodeConst)
+    attr = ctx.CreateNode(ScType.NodeConst)
+    targets = [ctx.CreateNode(ScType.NodeConst) for _ in range(5)]
+    edges = [ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, addr, trg) for trg in targets]
+    attrEdges = [ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, attr, edge) for edge in edges]
+
+    def hashes(addrs):
+      return sorted(a.ToInt() for a in addrs)
+
+    it3 = ctx.Iterator3(addr, ScType.EdgeAccessConstPosPerm, ScType.NodeConst)
+    batch = it3.NextBatch(3)
+    self.assertEqual(len(batch), 3)
+    for src, edge, trg in batch:
+      self.assertEqual(src, addr)
+      self.assertEqual(edges[targets.index(trg)], edge)
+
+    batch = it3.NextBatchAt(3, 2)
+    self.assertEqual(len(batch), 2)
+    self.assertEqual(it3.NextBatchAt(3, 2), [])
+    self.assertFalse(it3.Next())
+
+    it3 = ctx.Iterator3(addr, ScType.EdgeAccessConstPosPerm, ScType.NodeConst)
+    self.assertEqual(hashes(it3.NextBatchAt(10, 2)), hashes(targets))
+
+    it3 = ctx.Iterator3(addr, ScType.EdgeAccessConstPosPerm, ScType.NodeConst)
+    batch = it3.NextBatchHashes(10)
+    self.assertEqual(len(batch), 3 * len(targets))
+    self.assertEqual(sorted(batch[2::3]), hashes(targets))
+
+    it5 = ctx.Iterator5(
+        addr,
+        ScType.EdgeAccessConstPosPerm,
+        ScType.NodeConst,
+        ScType.EdgeAccessConstPosPerm,
+        attr)
+    batch = it5.NextBatch(10)
+    self.assertEqual(len(batch), len(targets))
+    for item in batch:
+      self.assertEqual(len(item), 5)
+      self.assertEqual(item[4], attr)
+      self.assertEqual(attrEdges[edges.index(item[1])], item[3])
+
   def test_helper_sys_idtf(self):
     ctx = TestScMemoryContext.MemoryCtx()
 
@@ -271,6 +316,20 @@ class TestScMemoryContext(TestCase):
     # get
     self.assertEqual(ctx.HelperGetSystemIdtf(addr2), "idtf_1_2_test")
 
+  def test_helper_sys_idtfs(self):
+    ctx = TestScMemoryContext.MemoryCtx()
+
+    addrs = ctx.HelperResolveSystemIdtfs(["sc_result", "test_example_value_idtf"])
+    self.assertEqual(len(addrs), 2)
+    self.assertEqual(addrs[0], ctx.HelperResolveSystemIdtf("sc_result", None))
+    self.assertFalse(addrs[1].IsValid())
+
+    # create new
+    addrs = ctx.HelperResolveSystemIdtfs(
+        ["sc_result", "test_example_idtfs_1"], [None, ScType.NodeConst])
+    self.assertTrue(addrs[1].IsValid())
+    self.assertEqual(ScType.NodeConst, ctx.GetElementType(addrs[1]))
+
   def test_helper_has_edge(self):
     ctx = TestScMemoryContext.MemoryCtx()
 
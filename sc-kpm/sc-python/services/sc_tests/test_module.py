@@ -0,0 +1,123 @@
+from unittest import TestCase
+
+from common import *
+from sc import *
+
+from sc_tests.test_utils import *
+
+import asyncio
+import threading
+import time
+
+class TestScModule(TestCase):
+
+  def test_emit_events_drain(self):
+    module = TestScModule.module
+
+    processed = []
+    for i in range(10):
+      module.CallLater(processed.append, i)
+
+    ticks = module.dispatch_stats.ticks
+    self.assertEqual(module.EmitEvents(), 10)
+    self.assertEqual(processed, list(range(10)))
+
+    stats = module.dispatch_stats.Snapshot()
+    self.assertEqual(stats['ticks'], ticks + 1)
+    self.assertEqual(stats['last_tick_tasks'], 10)
+
+    # nothing to process
+    self.assertEqual(module.EmitEvents(), 0)
+
+  def test_emit_events_budget(self):
+    module = TestScModule.module
+
+    processed = []
+    for i in range(5):
+      module.CallLater(processed.append, i)
+
+    max_tasks = module.dispatch_max_tasks
+    module.dispatch_max_tasks = 2
+    try:
+      self.assertEqual(module.EmitEvents(), 2)
+      self.assertEqual(module.EmitEvents(), 2)
+      self.assertEqual(module.EmitEvents(), 1)
+    finally:
+      module.dispatch_max_tasks = max_tasks
+
+    self.assertEqual(processed, list(range(5)))
+
+  def test_run_coroutine(self):
+    module = TestScModule.module
+
+    async def coro(value):
+      await asyncio.sleep(0)
+      return value * 2
+
+    # coroutine is finished, when it returns
+    future = module.RunCoroutine(coro(21))
+    self.assertTrue(future.done())
+    self.assertEqual(future.result(), 42)
+
+  def test_executor(self):
+    module = TestScModule.module
+
+    class Agent(ScAgent):
+      max_concurrency = 2
+
+    agent = Agent(module)
+
+    lock = threading.Lock()
+    state = {'running': 0, 'max_running': 0, 'done': 0}
+    contexts = []
+    finished = threading.Event()
+
+    def work(count):
+      with lock:
+        state['running'] += 1
+        state['max_running'] = max(state['max_running'], state['running'])
+        contexts.append(module.ctx)
+
+      time.sleep(0.01)
+
+      with lock:
+        state['running'] -= 1
+        state['done'] += 1
+        if state['done'] == count:
+          finished.set()
+
+    count = 10
+    for _ in range(count):
+      module.executor.Submit(agent, work, count)
+
+    self.assertTrue(finished.wait(5))
+    self.assertLessEqual(state['max_running'], Agent.max_concurrency)
+
+    # workers use own memory contexts
+    for ctx in contexts:
+      self.assertNotEqual(ctx, module.ctx)
+      self.assertTrue(ctx.CreateNode(ScType.NodeConst).IsValid())
+
+  def test_executor_keep_order(self):
+    module = TestScModule.module
+
+    class Agent(ScAgent):
+      max_concurrency = 4
+      keep_order = True
+
+    agent = Agent(module)
+
+    processed = []
+    finished = threading.Event()
+
+    def work(value, count):
+      processed.append(value)
+      if len(processed) == count:
+        finished.set()
+
+    count = 20
+    for i in range(count):
+      module.executor.Submit(agent, work, i, count)
+
+    self.assertTrue(finished.wait(5))
+    self.assertEqual(processed, list(range(count)))
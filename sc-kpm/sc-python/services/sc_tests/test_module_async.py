@@ -0,0 +1,109 @@
+from unittest import TestCase
+
+from common import *
+from sc import *
+from scb import *
+
+from sc_tests.test_utils import *
+
+import asyncio
+import threading
+
+class TestAsyncScModule(TestCase):
+
+  def _create_module(self):
+    module = TestAsyncScModule.module
+    async_module = AsyncScModule(module.ctx, module.cpp)
+
+    # tested module shares cpp bridge with test module, so route events into it
+    module.cpp.onEvent = async_module.HandleOnEvent
+    module.cpp.onEventBatch = async_module.HandleOnEventBatch
+
+    return async_module
+
+  def _destroy_module(self, async_module):
+    module = TestAsyncScModule.module
+    module.cpp.onEvent = module.HandleOnEvent
+    module.cpp.onEventBatch = module.HandleOnEventBatch
+
+    async_module._cancel_tasks()
+    async_module.loop.close()
+
+  def test_async_agent(self):
+    ctx = TestAsyncScModule.MemoryCtx()
+    async_module = self._create_module()
+
+    results = []
+
+    class Agent(ScAgent):
+      async def RunImpl(self, evt):
+        await asyncio.sleep(0.01)
+        results.append(evt.other_addr)
+        return ScResult.Ok
+
+    addr1 = ctx.CreateNode(ScType.NodeConst)
+    addr2 = ctx.CreateNode(ScType.NodeConst)
+
+    agent = Agent(async_module)
+    agent.Register(addr1, ScPythonEventType.AddOutputEdge)
+    try:
+      ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, addr1, addr2)
+
+      WaitFor(async_module, lambda: len(results) == 0, 3)
+
+      self.assertEqual(results, [addr2])
+
+      # result of coroutine is recorded, when it's finished
+      stats = async_module.agent_stats.Snapshot()['Agent']
+      self.assertEqual(stats['invocations'], 1)
+      self.assertEqual(stats['results'], {'Ok': 1})
+    finally:
+      agent.Unregister()
+      self._destroy_module(async_module)
+
+  def test_priority(self):
+    async_module = self._create_module()
+
+    processed = []
+    try:
+      async_module.CallLaterWithPriority(ScTaskPriority.Low, processed.append, 'low')
+      async_module.CallLater(processed.append, 'normal')
+      async_module.CallLaterWithPriority(ScTaskPriority.High, processed.append, 'high')
+
+      async_module.EmitEvents()
+      self.assertEqual(processed, ['high', 'normal', 'low'])
+      self.assertEqual(async_module.dispatch_stats.Snapshot()['last_tick_tasks'], 3)
+    finally:
+      self._destroy_module(async_module)
+
+  def test_stop_on_close(self):
+    async_module = self._create_module()
+
+    processed = []
+    try:
+      # stop has higher priority, then queued tasks
+      async_module.CallLater(processed.append, 1)
+      async_module.HandleOnClose()
+      async_module.EmitEvents()
+
+      self.assertFalse(async_module.is_running)
+      self.assertEqual(processed, [])
+    finally:
+      self._destroy_module(async_module)
+
+  def test_stop_running_loop(self):
+    async_module = self._create_module()
+
+    loop = async_module.loop
+    try:
+      loop.call_soon(async_module._update)
+      # don't wait forever, if module isn't stopped
+      timeout = loop.call_later(3, loop.stop)
+
+      threading.Timer(0.05, async_module.HandleOnClose).start()
+      loop.run_forever()
+      timeout.cancel()
+
+      self.assertFalse(async_module.is_running)
+    finally:
+      self._destroy_module(async_module)
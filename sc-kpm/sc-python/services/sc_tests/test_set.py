@@ -73,6 +73,146 @@ class TestScSet(TestCase):
       count += 1
     self.assertEqual(count, len(elements))
 
+  def test_sc_set_many(self):
+    ctx = TestScSet.MemoryCtx()
+
+    addrSet = ctx.CreateNode(ScType.Node)
+    addr1 = ctx.CreateNode(ScType.NodeConst)
+    addr2 = ctx.CreateNode(ScType.Node)
+    addr3 = ctx.CreateNode(ScType.Node)
+
+    _set = ScSet(ctx, addrSet)
+    self.assertTrue(_set.Add(addr2))
+
+    self.assertEqual(_set.AddMany([addr1, addr2, addr3, addr1]), [True, False, True, False])
+    self.assertEqual(_set.HasMany([addr1, addr2, addr3]), [True, True, True])
+
+    self.assertEqual(_set.RemoveMany([addr1, addr3, addr3]), [True, True, False])
+    self.assertEqual(_set.HasMany([addr1, addr2, addr3]), [False, True, False])
+
+  def test_sc_set_algebra(self):
+    ctx = TestScSet.MemoryCtx()
+
+    addr1 = ctx.CreateNode(ScType.NodeConst)
+    addr2 = ctx.CreateNode(ScType.Node)
+    addr3 = ctx.CreateNode(ScType.Node)
+
+    set1 = ScSet(ctx, ctx.CreateNode(ScType.Node))
+    set1.AddMany([addr1, addr2])
+    set2 = ScSet(ctx, ctx.CreateNode(ScType.Node))
+    set2.AddMany([addr2, addr3])
+
+    def hashes(addrs):
+      return sorted(a.ToInt() for a in addrs)
+
+    self.assertEqual(hashes(set1.Union(set2)), hashes([addr1, addr2, addr3]))
+    self.assertEqual(set1.Intersect(set2), [addr2])
+    self.assertEqual(set1.Difference(set2), [addr1])
+    self.assertEqual(set2.Difference(set1), [addr3])
+
+    # materialize result into target set
+    target = ScSet(ctx, ctx.CreateNode(ScType.Node))
+    target.Add(addr1)
+    self.assertEqual(set1.Intersect(set2, target), [addr2])
+    self.assertEqual(target.HasMany([addr1, addr2, addr3]), [True, True, False])
+
+  def test_sc_set_mirror(self):
+    ctx = TestScSet.MemoryCtx()
+    module = TestScSet.module
+
+    addrSet = ctx.CreateNode(ScType.Node)
+    addr1 = ctx.CreateNode(ScType.NodeConst)
+    addr2 = ctx.CreateNode(ScType.Node)
+    addr3 = ctx.CreateNode(ScType.Node)
+
+    ScSet(ctx, addrSet).Add(addr1)
+
+    mirror = ScSetMirror(ctx, addrSet, module.events)
+    self.assertTrue(mirror.Has(addr1))
+    self.assertEqual(len(mirror), 1)
+
+    # own changes are visible immediately
+    self.assertTrue(mirror.Add(addr2))
+    self.assertEqual(mirror.HasMany([addr1, addr2, addr3]), [True, True, False])
+    self.assertTrue(mirror.Remove(addr1))
+    self.assertFalse(mirror.Has(addr1))
+
+    # changes of other contexts come with events
+    edge = ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, addrSet, addr3)
+    WaitFor(module, lambda: not mirror.Has(addr3), 3)
+    self.assertTrue(mirror.Has(addr3))
+
+    # or with explicit barrier
+    ctx.DeleteElement(edge)
+    mirror.Sync()
+    self.assertFalse(mirror.Has(addr3))
+
+    self.assertEqual([el for el in mirror], [addr2])
+    mirror.Clear()
+    self.assertEqual(len(mirror), 0)
+    mirror.Destroy()
+
+  def test_sc_set_mirror_events_order(self):
+    ctx = TestScSet.MemoryCtx()
+    module = TestScSet.module
+
+    addrSet = ctx.CreateNode(ScType.Node)
+    addr1 = ctx.CreateNode(ScType.NodeConst)
+    addr2 = ctx.CreateNode(ScType.NodeConst)
+
+    edge1 = ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, addrSet, addr1)
+    mirror = ScSetMirror(ctx, addrSet, module.events)
+    try:
+      self.assertTrue(mirror.Has(addr1))
+      eid = mirror.evt_add.GetID()
+
+      # remove -> add, then remove event comes after add one
+      ctx.DeleteElement(edge1)
+      edge2 = ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, addrSet, addr1)
+      mirror._on_edge_event(ScEventParams(eid, addrSet, edge2, addr1))
+      mirror._on_edge_event(ScEventParams(eid, addrSet, edge1, addr1))
+      self.assertTrue(mirror.Has(addr1))
+
+      # add event comes after remove
+      edge3 = ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, addrSet, addr2)
+      ctx.DeleteElement(edge3)
+      mirror._on_edge_event(ScEventParams(eid, addrSet, edge3, addr2))
+      self.assertFalse(mirror.Has(addr2))
+
+      # real events don't change result
+      WaitFor(module, lambda: False, 1)
+      self.assertEqual(mirror.HasMany([addr1, addr2]), [True, False])
+      self.assertEqual(len(mirror), 1)
+
+      # subscriptions of mirror aren't dropped by queue
+      self.assertTrue(module.events.IsForced(mirror.evt_add.GetID()))
+      self.assertTrue(module.events.IsForced(mirror.evt_remove.GetID()))
+    finally:
+      mirror.Destroy()
+
+  def test_sc_set_count(self):
+    ctx = TestScSet.MemoryCtx()
+
+    addrSet = ctx.CreateNode(ScType.Node)
+    relAddr = ctx.CreateNode(ScType.NodeConstNoRole)
+    addr1 = ctx.CreateNode(ScType.NodeConst)
+    addr2 = ctx.CreateNode(ScType.NodeConstClass)
+    addr3 = ctx.CreateNode(ScType.NodeConstClass)
+
+    for _set in [ScSet(ctx, addrSet), ScRelationSet(ctx, addrSet, relAddr)]:
+      self.assertEqual(_set.Count(), 0)
+      for a in [addr1, addr2, addr3]:
+        self.assertTrue(_set.Add(a))
+
+      self.assertEqual(_set.Count(), 3)
+      self.assertEqual(_set.CountByType(ScType.NodeConstClass), 2)
+      self.assertEqual(_set.CountByType(ScType.NodeConstAbstract), 0)
+
+      classes = [el for el in _set.Iterate(ScType.NodeConstClass)]
+      self.assertEqual(len(classes), 2)
+      self.assertTrue(addr2 in classes)
+      self.assertTrue(addr3 in classes)
+
   def test_sc_set_relation(self):
     ctx = TestScSet.MemoryCtx()
 
@@ -100,3 +240,74 @@ class TestScSet(TestCase):
     _set.Clear()
     for a in elements:
       self.assertFalse(_set.Has(a))
+
+  def test_sc_relation_index(self):
+    ctx = TestScSet.MemoryCtx()
+    module = TestScSet.module
+
+    relAddr = ctx.CreateNode(ScType.NodeConstNoRole)
+    src1 = ctx.CreateNode(ScType.NodeConst)
+    src2 = ctx.CreateNode(ScType.NodeConst)
+    trg = ctx.CreateNode(ScType.NodeConst)
+
+    ScRelationSet(ctx, src1, relAddr).Add(trg)
+
+    index = ScRelationIndex(ctx, relAddr, module.events)
+    self.assertEqual(len(index), 1)
+    self.assertTrue(index.HasPair(src1, trg))
+    self.assertFalse(index.HasPair(trg, src1))
+    self.assertEqual(index.Sources(trg), [src1])
+
+    # changes made with set are visible immediately
+    _set = ScRelationSet(ctx, src2, relAddr, index)
+    self.assertTrue(_set.Add(trg))
+    self.assertTrue(_set.Has(trg))
+    self.assertEqual(len(_set.Sources(trg)), 2)
+    self.assertTrue(_set.Remove(trg))
+    self.assertFalse(index.HasPair(src2, trg))
+
+    # changes of other contexts come with events
+    edge = ctx.CreateEdge(ScType.EdgeDCommonConst, src2, trg)
+    ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, relAddr, edge)
+    WaitFor(module, lambda: not index.HasPair(src2, trg), 3)
+    self.assertTrue(index.HasPair(src2, trg))
+
+    ctx.DeleteElement(edge)
+    WaitFor(module, lambda: index.HasPair(src2, trg), 3)
+    self.assertFalse(index.HasPair(src2, trg))
+
+    # the same result without index
+    self.assertEqual(ScRelationSet(ctx, src2, relAddr).Sources(trg), [src1])
+    index.Destroy()
+
+  def test_relation_index_events_order(self):
+    ctx = TestScSet.MemoryCtx()
+    module = TestScSet.module
+
+    relAddr = ctx.CreateNode(ScType.NodeConstNoRole)
+    src = ctx.CreateNode(ScType.NodeConst)
+    trg = ctx.CreateNode(ScType.NodeConst)
+
+    index = ScRelationIndex(ctx, relAddr, module.events)
+    try:
+      eid = index.evt_add.GetID()
+
+      # add event comes after pair is removed
+      edge = ctx.CreateEdge(ScType.EdgeDCommonConst, src, trg)
+      rel_edge = ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, relAddr, edge)
+      ctx.DeleteElement(edge)
+      index._on_edge_event(ScEventParams(eid, relAddr, rel_edge, edge))
+      self.assertFalse(index.HasPair(src, trg))
+
+      # remove event of old pair comes after new one is added
+      edge = ctx.CreateEdge(ScType.EdgeDCommonConst, src, trg)
+      rel_edge = ctx.CreateEdge(ScType.EdgeAccessConstPosPerm, relAddr, edge)
+      index._on_edge_event(ScEventParams(eid, relAddr, rel_edge, edge))
+      self.assertTrue(index.HasPair(src, trg))
+      index._on_edge_event(ScEventParams(eid, relAddr, rel_edge, edge))
+      self.assertEqual(len(index), 1)
+
+      self.assertTrue(module.events.IsForced(index.evt_add.GetID()))
+      self.assertTrue(module.events.IsForced(index.evt_remove.GetID()))
+    finally:
+      index.Destroy()
@@ -0,0 +1,72 @@
+from unittest import TestCase
+
+from common.sc_stats import ScHistogram, ScEventStats, ScAgentStats
+
+import pstats
+
+class TestScStats(TestCase):
+
+  def test_histogram(self):
+    hist = ScHistogram([1, 2, 4, 8])
+    for value in [0.5, 1, 3, 3, 100]:
+      hist.Add(value)
+
+    snapshot = hist.Snapshot()
+    self.assertEqual(snapshot['count'], 5)
+    self.assertEqual(snapshot['min'], 0.5)
+    self.assertEqual(snapshot['max'], 100)
+    self.assertEqual(snapshot['buckets'], [[1, 2], [4, 2], [None, 1]])
+    self.assertEqual(snapshot['p50'], 4)
+    self.assertEqual(snapshot['p99'], 100)
+
+  def test_histogram_empty(self):
+    snapshot = ScHistogram().Snapshot()
+    self.assertEqual(snapshot['count'], 0)
+    self.assertIsNone(snapshot['mean'])
+    self.assertIsNone(snapshot['p50'])
+
+  def test_event_stats(self):
+    stats = ScEventStats()
+    stats.AddEvent('type_1', 0.001, 0.0001)
+    stats.AddEvent('type_1', None, 0.0002)
+    stats.AddEvent('type_2', 0.002, 0.0001)
+    stats.AddQueueDepth(10)
+
+    snapshot = stats.Snapshot()
+    self.assertEqual(snapshot['events']['type_1']['wait']['count'], 1)
+    self.assertEqual(snapshot['events']['type_1']['run']['count'], 2)
+    self.assertEqual(snapshot['events']['type_2']['run']['count'], 1)
+    self.assertEqual(snapshot['queue_depth']['count'], 1)
+
+  def test_agent_stats(self):
+    stats = ScAgentStats()
+    stats.AddRun('Agent', 'Ok', 0.01, 0.005)
+    stats.AddRun('Agent', 'Error', 0.02)
+    stats.AddRejection('Agent')
+    stats.AddException('Agent')
+
+    snapshot = stats.Snapshot()['Agent']
+    self.assertEqual(snapshot['invocations'], 3)
+    self.assertEqual(snapshot['rejections'], 1)
+    self.assertEqual(snapshot['exceptions'], 1)
+    self.assertEqual(snapshot['results'], {'Ok': 1, 'Error': 1})
+    self.assertEqual(snapshot['wall']['count'], 2)
+    self.assertEqual(snapshot['cpu']['count'], 1)
+    self.assertFalse(snapshot['profiling'])
+
+  def test_agent_profile(self):
+    stats = ScAgentStats()
+
+    def work(value):
+      return sum(range(value))
+
+    self.assertEqual(stats.Call('Agent', work, 10), 45)
+    self.assertIsNone(stats.StopProfile('Agent'))
+
+    stats.StartProfile('Agent')
+    self.assertEqual(stats.Call('Agent', work, 10), 45)
+    self.assertEqual(stats.Call('Other', work, 10), 45)
+
+    profile = stats.StopProfile('Agent')
+    self.assertIsNotNone(profile)
+    self.assertGreater(pstats.Stats(profile).total_calls, 0)
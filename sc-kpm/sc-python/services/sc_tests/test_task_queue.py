@@ -0,0 +1,146 @@
+from unittest import TestCase
+
+from common import *
+
+import queue
+
+class TestScTaskQueue(TestCase):
+
+  def test_unbounded(self):
+    q = ScTaskQueue()
+    for i in range(100):
+      self.assertTrue(q.put(i))
+
+    self.assertEqual(q.qsize(), 100)
+    self.assertEqual(q.get_nowait(), 0)
+    self.assertEqual(q.get(timeout=0.01), 1)
+    self.assertEqual(q.Snapshot()['high_water'], 100)
+
+  def test_empty(self):
+    q = ScTaskQueue()
+    self.assertTrue(q.empty())
+    with self.assertRaises(queue.Empty):
+      q.get_nowait()
+    with self.assertRaises(queue.Empty):
+      q.get(timeout=0.01)
+
+  def test_block(self):
+    q = ScTaskQueue(2, ScQueuePolicy.Block, block_timeout=0.01)
+    self.assertTrue(q.put(1))
+    self.assertTrue(q.put(2))
+    self.assertFalse(q.put(3))
+    self.assertTrue(q.put(4, force=True))
+
+    self.assertEqual([q.get_nowait() for _ in range(3)], [1, 2, 4])
+    self.assertEqual(q.Snapshot()['dropped'], 1)
+
+  def test_drop_oldest(self):
+    q = ScTaskQueue(2, ScQueuePolicy.DropOldest)
+    for i in range(5):
+      self.assertTrue(q.put(i))
+
+    self.assertEqual([q.get_nowait() for _ in range(2)], [3, 4])
+    self.assertEqual(q.Snapshot()['dropped'], 3)
+
+  def test_drop_newest(self):
+    q = ScTaskQueue(2, ScQueuePolicy.DropNewest)
+    for i in range(5):
+      q.put(i)
+
+    self.assertEqual([q.get_nowait() for _ in range(2)], [0, 1])
+    self.assertEqual(q.Snapshot()['dropped'], 3)
+    self.assertEqual(q.Snapshot()['high_water'], 2)
+
+  def test_coalesce(self):
+    q = ScTaskQueue(3, ScQueuePolicy.Coalesce)
+    self.assertTrue(q.put('a1', key='a'))
+    self.assertTrue(q.put('b1', key='b'))
+    self.assertTrue(q.put('a2', key='a'))
+    self.assertTrue(q.put('c1', key='c'))
+    self.assertFalse(q.put('d1', key='d'))
+
+    self.assertEqual([q.get_nowait() for _ in range(3)], ['a2', 'b1', 'c1'])
+
+    # key is released after task was processed
+    self.assertTrue(q.put('a3', key='a'))
+    self.assertEqual(q.get_nowait(), 'a3')
+
+    stats = q.Snapshot()
+    self.assertEqual(stats['coalesced'], 1)
+    self.assertEqual(stats['dropped'], 1)
+
+  def test_priority(self):
+    q = ScTaskQueue()
+    q.put('low', priority=ScTaskPriority.Low)
+    q.put('normal')
+    q.put('high', priority=ScTaskPriority.High)
+
+    self.assertEqual([q.get_nowait() for _ in range(3)], ['high', 'normal', 'low'])
+
+    lanes = q.Snapshot()['lanes']
+    for name in ['High', 'Normal', 'Low']:
+      self.assertEqual(lanes[name]['size'], 0)
+      self.assertEqual(lanes[name]['high_water'], 1)
+
+  def test_priority_starvation(self):
+    q = ScTaskQueue(starvation_limit=2)
+    q.put('low', priority=ScTaskPriority.Low)
+    for i in range(4):
+      q.put(i, priority=ScTaskPriority.High)
+
+    self.assertEqual([q.get_nowait() for _ in range(5)], [0, 1, 'low', 2, 3])
+
+  def test_drop_oldest_priority(self):
+    q = ScTaskQueue(2, ScQueuePolicy.DropOldest)
+    q.put('high', priority=ScTaskPriority.High)
+    q.put('low', priority=ScTaskPriority.Low)
+    q.put('normal')
+
+    self.assertEqual([q.get_nowait() for _ in range(2)], ['high', 'normal'])
+
+  def test_drop_oldest_forced(self):
+    q = ScTaskQueue(2, ScQueuePolicy.DropOldest)
+    q.put('stop', force=True)
+    q.put('e1')
+    self.assertTrue(q.put('e2'))
+
+    # forced task is never dropped
+    self.assertEqual([q.get_nowait() for _ in range(2)], ['stop', 'e2'])
+
+    # new task is dropped, when there are just forced ones
+    q.put('f1', force=True)
+    q.put('f2', force=True)
+    self.assertFalse(q.put('e3'))
+    self.assertEqual([q.get_nowait() for _ in range(2)], ['f1', 'f2'])
+    self.assertEqual(q.Snapshot()['dropped'], 2)
+
+  def test_on_drop(self):
+    dropped = []
+    q = ScTaskQueue(1, ScQueuePolicy.DropOldest, on_drop=dropped.append)
+    q.put('e1')
+    q.put('e2')
+    self.assertEqual(dropped, ['e1'])
+
+    q = ScTaskQueue(1, ScQueuePolicy.DropNewest, on_drop=dropped.append)
+    q.put_many([('e3', None, ScTaskPriority.Normal), ('e4', None, ScTaskPriority.Normal)])
+    self.assertEqual(dropped, ['e1', 'e4'])
+
+    # task replaced by coalescing isn't counted as dropped, but its owner is notified
+    q = ScTaskQueue(1, ScQueuePolicy.Coalesce, on_drop=dropped.append)
+    q.put('a1', key='a')
+    q.put('a2', key='a')
+    self.assertEqual(dropped, ['e1', 'e4', 'a1'])
+    self.assertEqual(q.Snapshot()['dropped'], 0)
+
+  def test_put_many(self):
+    q = ScTaskQueue(3, ScQueuePolicy.DropNewest)
+    items = [
+        (1, None, ScTaskPriority.Low),
+        (2, None, ScTaskPriority.High),
+        (3, None, ScTaskPriority.Normal),
+        (4, None, ScTaskPriority.Normal),
+    ]
+    self.assertEqual(q.put_many(items), 3)
+
+    self.assertEqual([q.get_nowait() for _ in range(3)], [2, 3, 1])
+    self.assertEqual(q.Snapshot()['dropped'], 1)
@@ -5,7 +5,21 @@ from sc import *
 
 from sc_tests.test_utils import *
 
+import time
+
 def CreateNodeWithIdtf(ctx, _type, _idtf):
   addr = ctx.CreateNode(_type)
   ctx.HelperSetSystemIdtf(_idtf, addr)
   return addr
+
+def WaitFor(module, cond, timeout=3.0) -> bool:
+  """Processes tasks of `module`, until `cond()` returns `True`, but not longer
+  then `timeout` seconds. Returns the last result of `cond()`
+  """
+  deadline = time.monotonic() + timeout
+  while not cond():
+    if time.monotonic() >= deadline:
+      return False
+    module.EmitEvents()
+
+  return True
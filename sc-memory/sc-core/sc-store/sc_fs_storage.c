@@ -22,6 +22,8 @@
 
 gchar * repo_path = 0;
 gchar segments_path[MAX_PATH_LENGTH];  // Path to file, where stored segments in correct state
+gchar generation_path[MAX_PATH_LENGTH];  // Path to file, where stored generation of repository
+gchar * generation = 0;  // Generation of repository, it changes each time, when repository is cleared
 #define SC_DIR_PERMISSIONS -1
 
 const gchar * seg_meta = "_meta";
@@ -122,6 +124,7 @@ sc_bool sc_fs_storage_initialize(const gchar * path, sc_bool clear)
 {
   g_message("Initialize sc-storage from path: %s", path);
   g_snprintf(segments_path, MAX_PATH_LENGTH, "%s/segments.scdb", path);
+  g_snprintf(generation_path, MAX_PATH_LENGTH, "%s/generation", path);
   repo_path = g_strdup(path);
 
   sc_fm_init(repo_path);
@@ -132,6 +135,8 @@ sc_bool sc_fs_storage_initialize(const gchar * path, sc_bool clear)
     g_message("Clear memory");
     if (g_file_test(segments_path, G_FILE_TEST_IS_REGULAR) && g_remove(segments_path) != 0)
       g_error("Can't delete segments file: %s", segments_path);
+    if (g_file_test(generation_path, G_FILE_TEST_IS_REGULAR) && g_remove(generation_path) != 0)
+      g_error("Can't delete generation file: %s", generation_path);
 
     g_message("Clear file memory");
     if (sc_fm_clear() != SC_RESULT_OK)
@@ -141,6 +146,12 @@ sc_bool sc_fs_storage_initialize(const gchar * path, sc_bool clear)
     }
   }
 
+  // new generation is written with the first save of repository
+  if (g_file_get_contents(generation_path, &generation, null_ptr, null_ptr) == FALSE)
+    generation = g_strdup_printf("%" G_GINT64_FORMAT, g_get_real_time());
+  else
+    g_strstrip(generation);
+
   return SC_TRUE;
 }
 
@@ -158,10 +169,17 @@ sc_bool sc_fs_storage_shutdown(sc_segment ** segments, sc_bool save_segments)
   sc_fm_free();
 
   g_free(repo_path);
+  g_free(generation);
+  generation = 0;
 
   return res;
 }
 
+const char * sc_fs_storage_get_generation()
+{
+  return generation;
+}
+
 sc_bool sc_fs_storage_read_from_path(sc_segment ** segments, sc_uint32 * segments_num)
 {
   if (g_file_test(repo_path, G_FILE_TEST_IS_DIR) == FALSE)
@@ -396,6 +414,10 @@ sc_bool sc_fs_storage_write_to_path(sc_segment ** segments)
       }
     }
 
+    if (!g_file_test(generation_path, G_FILE_TEST_IS_REGULAR) &&
+        g_file_set_contents(generation_path, generation, -1, null_ptr) == FALSE)
+      g_critical("Can't write generation into %s", generation_path);
+
     // save file memory
     g_message("Save file memory state");
     if (sc_fm_save() != SC_RESULT_OK)
@@ -49,6 +49,11 @@ sc_bool sc_fs_storage_read_from_path(sc_segment ** segments, sc_uint32 * segment
  */
 sc_bool sc_fs_storage_write_to_path(sc_segment ** segments);
 
+/*! Returns generation of repository. It changes each time, when repository is cleared
+ * (for example, when it's rebuilt by builder)
+ */
+const char * sc_fs_storage_get_generation();
+
 // -------------------------------------------------
 /*! Write specified stream as content
  * @param addr sc-addr of sc-link that contains data
@@ -8,6 +8,7 @@
 #include "sc_memory_version.h"
 #include "sc_memory_private.h"
 #include "sc-store/sc_storage.h"
+#include "sc-store/sc_fs_storage.h"
 #include "sc-store/sc_element.h"
 #include "sc_memory_ext.h"
 #include "sc_helper.h"
@@ -355,3 +356,8 @@ sc_result sc_memory_save(sc_memory_context const * ctx)
 {
   return sc_storage_save(ctx);
 }
+
+sc_char const * sc_memory_get_storage_generation()
+{
+  return sc_fs_storage_get_generation();
+}
@@ -228,4 +228,9 @@ _SC_EXTERN sc_result sc_memory_stat(sc_memory_context const * ctx, sc_stat * sta
  */
 _SC_EXTERN sc_result sc_memory_save(sc_memory_context const * ctx);
 
+/*! Returns generation of sc-memory repository. It changes each time, when repository is cleared,
+ * so it can be used to check, that cached sc-addrs are still actual
+ */
+_SC_EXTERN sc_char const * sc_memory_get_storage_generation();
+
 #endif
@@ -12,6 +12,14 @@
 #include "../utils/sc_cache.hpp"
 #include "../utils/sc_lock.hpp"
 
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <deque>
+#include <mutex>
+#include <vector>
+
 namespace bp = boost::python;
 
 extern "C"
@@ -111,6 +119,22 @@ void AddModuleSearchPaths(py::ScPythonInterpreter::ModulePathSet const & moduleP
 
 class PyBridgeWrap;
 
+// Filter, that is checked in sc-memory thread before event goes into python
+struct PyScEventFilter
+{
+  // other element should have all bits of this type (Unknown - any type)
+  ScType m_otherType;
+  // edge should have all bits of this type (Unknown - any type)
+  ScType m_edgeType;
+  // other element should be an element of this class (invalid - any element)
+  ScAddr m_otherInClass;
+
+  bool IsEmpty() const
+  {
+    return m_otherType.IsUnknown() && m_edgeType.IsUnknown() && !m_otherInClass.IsValid();
+  }
+};
+
 class PyScEvent
 {
   friend class PyBridgeWrap;
@@ -125,12 +149,22 @@ protected:
     ScAddr m_addr;
     ScAddr m_edgeAddr;
     ScAddr m_otherAddr;
+    // time of event emit in seconds (the same clock as python time.monotonic())
+    double m_time;
+    // forced events are never dropped by batch limit
+    bool m_forced;
   };
 
-  explicit PyScEvent(ScEvent * evt, EventID id)
+  explicit PyScEvent(ScEvent * evt, EventID id, PyScEventFilter const & filter = PyScEventFilter())
     : m_id(id)
+    , m_filter(filter)
+    , m_filteredCount(0)
+    , m_forced(false)
   {
     SC_ASSERT(evt != nullptr, ("Should receive valid event pointer"));
+    if (!m_filter.IsEmpty())
+      m_filterCtx.reset(new ScMemoryContext(sc_access_lvl_make_max, "PyScEventFilter"));
+
     m_event.reset(evt);
 
     evt->SetDelegate(
@@ -156,9 +190,53 @@ public:
     return m_id;
   }
 
+  uint64_t GetFilteredCount() const
+  {
+    return m_filteredCount;
+  }
+
+  bool IsForced() const
+  {
+    return m_forced;
+  }
+
+  void SetForced(bool forced)
+  {
+    m_forced = forced;
+  }
+
 private:
+  static bool IsTypeMatched(ScType type, ScType const & mask)
+  {
+    return mask.IsUnknown() || (type & mask) == mask;
+  }
+
+  bool IsFiltered(ScAddr const & edgeAddr, ScAddr const & otherAddr) const
+  {
+    if (!m_filterCtx)
+      return false;
+
+    if (!IsTypeMatched(m_filterCtx->GetElementType(otherAddr), m_filter.m_otherType))
+      return true;
+
+    if (!IsTypeMatched(m_filterCtx->GetElementType(edgeAddr), m_filter.m_edgeType))
+      return true;
+
+    if (m_filter.m_otherInClass.IsValid() &&
+        !m_filterCtx->HelperCheckEdge(m_filter.m_otherInClass, otherAddr, ScType::EdgeAccessConstPosPerm))
+      return true;
+
+    return false;
+  }
+
   bool OnEvent(ScAddr const & addr, ScAddr const & edgeAddr, ScAddr const & otherAddr)
   {
+    if (IsFiltered(edgeAddr, otherAddr))
+    {
+      ++m_filteredCount;
+      return true;
+    }
+
     if (m_onEvent)
     {
       EmitParams params;
@@ -166,6 +244,9 @@ private:
       params.m_addr = addr;
       params.m_edgeAddr = edgeAddr;
       params.m_otherAddr = otherAddr;
+      params.m_time =
+          std::chrono::duration<double>(std::chrono::steady_clock::now().time_since_epoch()).count();
+      params.m_forced = m_forced;
 
       m_onEvent(params);
 
@@ -186,6 +267,11 @@ protected:
 private:
   std::unique_ptr<ScEvent> m_event;
   EventID m_id;
+
+  PyScEventFilter const m_filter;
+  std::unique_ptr<ScMemoryContext> m_filterCtx;
+  std::atomic<uint64_t> m_filteredCount;
+  std::atomic_bool m_forced;
 };
 
 class PyBridgeWrap
@@ -251,6 +337,24 @@ public:
   // calls from PyScEvent to request emit it in main thread
   void EmitEvent(PyScEvent::EmitParams const & params)
   {
+    if (m_batchEnabled)
+    {
+      {
+        std::unique_lock<std::mutex> lock(m_batchMutex);
+        if (!params.m_forced && !WaitBatchSpace(lock))
+          return;
+
+        m_batch.push_back(params);
+        // other thread already delivers events, so it will take this one too
+        if (m_batchDelivering)
+          return;
+        m_batchDelivering = true;
+      }
+
+      EmitBatches();
+      return;
+    }
+
     if (m_eventDelegate)
     {
       py::WithGIL gil;
@@ -259,10 +363,100 @@ public:
           bp::object(params.m_id),
           bp::object(params.m_addr),
           bp::object(params.m_edgeAddr),
-          bp::object(params.m_otherAddr));
+          bp::object(params.m_otherAddr),
+          bp::object(params.m_time));
+    }
+  }
+
+  // delivers all buffered events with one GIL acquisition per batch
+  void EmitBatches()
+  {
+    py::WithGIL gil;
+
+    std::deque<PyScEvent::EmitParams> batch;
+    while (true)
+    {
+      batch.clear();
+      {
+        std::lock_guard<std::mutex> lock(m_batchMutex);
+        if (m_batch.empty())
+        {
+          m_batchDelivering = false;
+          return;
+        }
+        batch.swap(m_batch);
+      }
+      m_batchNotFull.notify_all();
+
+      // delegate could be reset by python, while previous batch was delivered
+      if (m_eventBatchDelegate.is_none())
+      {
+        m_batchDropped += batch.size();
+        continue;
+      }
+
+      try
+      {
+        bp::list items;
+        for (auto const & params : batch)
+        {
+          items.append(bp::make_tuple(
+              params.m_id, params.m_addr, params.m_edgeAddr, params.m_otherAddr, params.m_time));
+        }
+
+        CallPythonFunctionNoGIL(m_eventBatchDelegate, items);
+      }
+      catch (bp::error_already_set const &)
+      {
+        PyErr_Print();
+      }
     }
   }
 
+  bp::object GetEventBatchDelegate() const
+  {
+    return m_eventBatchDelegate;
+  }
+
+  void SetEventBatchDelegate(bp::object const & delegate)
+  {
+    m_eventBatchDelegate = delegate;
+    m_batchEnabled = !delegate.is_none();
+    if (!m_batchEnabled)
+    {
+      // nobody would take buffered events
+      std::lock_guard<std::mutex> lock(m_batchMutex);
+      m_batchDropped += m_batch.size();
+      m_batch.clear();
+    }
+    // don't keep waiting threads, when batches are disabled
+    m_batchNotFull.notify_all();
+  }
+
+  // Limits number of events, that wait for delivery into python (0 - unbounded).
+  // When buffer is full, then new event is processed by `policy` (value of python `ScQueuePolicy`):
+  // - Block - thread of sc-memory waits for free space, but not longer then `blockTimeout`
+  //   seconds (< 0 - without timeout), after that event is dropped;
+  // - DropOldest - the oldest buffered event is dropped;
+  // - DropNewest, Coalesce - new event is dropped.
+  // Forced events (`ScPythonEvent.SetForced`) are never dropped and don't wait.
+  void SetBatchLimit(size_t maxSize, int policy, double blockTimeout)
+  {
+    {
+      std::lock_guard<std::mutex> lock(m_batchMutex);
+      m_batchMaxSize = maxSize;
+      m_batchPolicy = static_cast<BatchPolicy>(policy);
+      m_batchBlockTimeout = blockTimeout;
+    }
+    m_batchNotFull.notify_all();
+  }
+
+  // Returns number of events dropped, because of batch limit
+  uint64_t GetDroppedEvents() const
+  {
+    return m_batchDropped;
+  }
+
   void DestroyEvent(PyScEvent::EventID evtID)
   {
     utils::ScLockScope scope(m_eventsLock);
@@ -278,11 +472,19 @@ public:
   }
 
   boost::shared_ptr<PyScEvent> SubscribeEvent(ScAddr const & elAddr, ScEvent::Type evtType)
+  {
+    return SubscribeEventFiltered(elAddr, evtType, PyScEventFilter());
+  }
+
+  boost::shared_ptr<PyScEvent> SubscribeEventFiltered(
+      ScAddr const & elAddr,
+      ScEvent::Type evtType,
+      PyScEventFilter const & filter)
   {
     utils::ScLockScope scope(m_eventsLock);
 
     ScEvent * scEvt = new ScEvent(m_ctx, elAddr, evtType);
-    boost::shared_ptr<PyScEvent> const evt(new PyScEvent(scEvt, ++ms_idCounter));
+    boost::shared_ptr<PyScEvent> const evt(new PyScEvent(scEvt, ++ms_idCounter, filter));
 
     SC_ASSERT(m_events.find(evt->GetID()) == m_events.end(), ());
     m_events[evt->GetID()] = evt;
@@ -299,6 +501,60 @@ public:
   }
 
 protected:
+  // values of python `ScQueuePolicy`
+  enum class BatchPolicy : int
+  {
+    Block = 0,
+    DropOldest = 1,
+    DropNewest = 2,
+    Coalesce = 3
+  };
+
+  // Should be called with locked `m_batchMutex`.
+  // Returns false, when new event should be dropped
+  bool WaitBatchSpace(std::unique_lock<std::mutex> & lock)
+  {
+    auto const hasSpace = [this]() {
+      return !m_batchEnabled || m_batchMaxSize == 0 || m_batch.size() < m_batchMaxSize;
+    };
+
+    if (hasSpace())
+      return true;
+
+    if (m_batchPolicy == BatchPolicy::Block)
+    {
+      // thread, that holds GIL, would never get free space, because python
+      // can't take events. So buffer exceeds its limit in this case
+      if (PyGILState_Check())
+        return true;
+
+      if (m_batchBlockTimeout < 0.0)
+      {
+        m_batchNotFull.wait(lock, hasSpace);
+        return true;
+      }
+
+      if (m_batchNotFull.wait_for(lock, std::chrono::duration<double>(m_batchBlockTimeout), hasSpace))
+        return true;
+    }
+    else if (m_batchPolicy == BatchPolicy::DropOldest)
+    {
+      auto const it = std::find_if(m_batch.begin(), m_batch.end(), [](PyScEvent::EmitParams const & params) {
+        return !params.m_forced;
+      });
+      // there are just forced events in buffer, so drop the new one
+      if (it != m_batch.end())
+      {
+        m_batch.erase(it);
+        ++m_batchDropped;
+        return true;
+      }
+    }
+
+    ++m_batchDropped;
+    return false;
+  }
+
   // calls from c++
   void OnCloseRequest()
   {
@@ -315,6 +571,17 @@ private:
   utils::ScLock m_eventsLock;
   EventsMap m_events;
 
+  std::atomic_bool m_batchEnabled = {false};
+  std::mutex m_batchMutex;
+  std::condition_variable m_batchNotFull;
+  std::deque<PyScEvent::EmitParams> m_batch;
+  bool m_batchDelivering = false;
+  size_t m_batchMaxSize = 0;
+  BatchPolicy m_batchPolicy = BatchPolicy::Block;
+  double m_batchBlockTimeout = -1.0;
+  std::atomic<uint64_t> m_batchDropped = {0};
+  bp::object m_eventBatchDelegate;
+
 public:
   // delegates that will be used in python module
   bp::object m_closeDelegate;
@@ -382,17 +649,32 @@ BOOST_PYTHON_MODULE(scb)
       .value("RemoveInputEdge", ScEvent::Type::RemoveInputEdge)
       .value("RemoveOutputEdge", ScEvent::Type::RemoveOutputEdge);
 
+  bp::class_<PyScEventFilter>("ScPythonEventFilter", bp::init<>())
+      .def_readwrite("other_type", &PyScEventFilter::m_otherType)
+      .def_readwrite("edge_type", &PyScEventFilter::m_edgeType)
+      .def_readwrite("other_in_class", &PyScEventFilter::m_otherInClass);
+
   bp::class_<PyScEvent, boost::noncopyable>("ScPythonEvent", bp::no_init)
       .def("Destroy", bp::make_function(&PyScEvent::Destroy))
-      .def("GetID", bp::make_function(&PyScEvent::GetID));
+      .def("GetID", bp::make_function(&PyScEvent::GetID))
+      .def("GetFilteredCount", bp::make_function(&PyScEvent::GetFilteredCount))
+      .def("IsForced", bp::make_function(&PyScEvent::IsForced))
+      .def("SetForced", bp::make_function(&PyScEvent::SetForced));
 
   bp::class_<PyBridgeWrap, boost::noncopyable>("ScPythonBridge", bp::no_init)
       .def("Ready", bp::make_function(&PyBridgeWrap::Ready))
       .def("Finish", bp::make_function(&PyBridgeWrap::Finish))
       .def("SubscribeEvent", bp::make_function(&PyBridgeWrap::SubscribeEvent))
+      .def("SubscribeEventFiltered", bp::make_function(&PyBridgeWrap::SubscribeEventFiltered))
       .def("DestroyEvent", bp::make_function(&PyBridgeWrap::DestroyEvent))
+      .def("SetBatchLimit", bp::make_function(&PyBridgeWrap::SetBatchLimit))
+      .def("GetDroppedEvents", bp::make_function(&PyBridgeWrap::GetDroppedEvents))
       .def_readwrite("onClose", &PyBridgeWrap::m_closeDelegate)
       .def_readwrite("onEvent", &PyBridgeWrap::m_eventDelegate)
+      .add_property(
+          "onEventBatch",
+          bp::make_function(&PyBridgeWrap::GetEventBatchDelegate),
+          bp::make_function(&PyBridgeWrap::SetEventBatchDelegate))
       .def("InitParams", bp::make_function(&PyBridgeWrap::GetInitParams));
 }
 
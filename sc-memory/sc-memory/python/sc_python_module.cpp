@@ -1,4 +1,5 @@
 #include "sc_python_module.hpp"
+#include "sc_python_threads.hpp"
 
 #include "../sc_memory.hpp"
 #include "../sc_stream.hpp"
@@ -6,7 +7,11 @@
 
 #include "../kpm/sc_agent.hpp"
 
+#include <algorithm>
+#include <array>
 #include <iostream>
+#include <unordered_map>
+#include <unordered_set>
 
 extern "C"
 {
@@ -427,7 +432,7 @@ bp::object _context_getLinkContent(ScMemoryContext & self, ScAddr const & linkAd
   return bp::object();
 }
 
-template <typename TIteratorType>
+template <typename TIteratorType, size_t kSize>
 class PyIteratorWrap
 {
 public:
@@ -458,12 +463,75 @@ public:
     return m_iter->Get(index);
   }
 
+  // Returns list of tuples for next `count` constructions
+  bp::list NextBatch(size_t count) const
+  {
+    ScAddrVector const addrs = Fetch(count);
+
+    bp::list result;
+    for (size_t i = 0; i < addrs.size(); i += kSize)
+    {
+      bp::list item;
+      for (size_t j = 0; j < kSize; ++j)
+        item.append(addrs[i + j]);
+      result.append(bp::tuple(item));
+    }
+
+    return result;
+  }
+
+  // Returns list of elements with `index` in next `count` constructions
+  bp::list NextBatchAt(size_t count, uint8_t index) const
+  {
+    if (index >= kSize)
+      SC_THROW_EXCEPTION(utils::ExceptionInvalidParams, "Index should be less than " << kSize);
+
+    ScAddrVector const addrs = Fetch(count);
+
+    bp::list result;
+    for (size_t i = index; i < addrs.size(); i += kSize)
+      result.append(addrs[i]);
+
+    return result;
+  }
+
+  // Returns flat list of hashes of elements in next `count` constructions
+  bp::list NextBatchHashes(size_t count) const
+  {
+    ScAddrVector const addrs = Fetch(count);
+
+    bp::list result;
+    for (auto const & addr : addrs)
+      result.append(addr.Hash());
+
+    return result;
+  }
+
 protected:
+  ScAddrVector Fetch(size_t count) const
+  {
+    SC_ASSERT(m_iter.get(), ());
+
+    ScAddrVector result;
+    result.reserve(std::min<size_t>(count, 1024) * kSize);
+    {
+      py::WithoutGIL noGIL;
+      for (size_t i = 0; i < count && m_iter->Next(); ++i)
+      {
+        for (size_t j = 0; j < kSize; ++j)
+          result.push_back(m_iter->Get(j));
+      }
+    }
+
+    return result;
+  }
+
+
   TIteratorType m_iter;
 };
 
-using PyIterator3 = PyIteratorWrap<ScIterator3Ptr>;
-using PyIterator5 = PyIteratorWrap<ScIterator5Ptr>;
+using PyIterator3 = PyIteratorWrap<ScIterator3Ptr, 3>;
+using PyIterator5 = PyIteratorWrap<ScIterator5Ptr, 5>;
 
 bp::object _context_iterator3(ScMemoryContext & self, bp::object & param1, bp::object & param2, bp::object & param3)
 {
@@ -618,6 +686,50 @@ bp::object _context_helperResolveSysIdtf(
   return bp::object(resultAddr);
 }
 
+// idtfs - list of system identifiers
+// types - list of ScType (None - just find element) or None to find all elements
+bp::list _context_helperResolveSysIdtfs(ScMemoryContext & self, bp::list idtfs, bp::object const & types = bp::object())
+{
+  bp::ssize_t const count = bp::len(idtfs);
+  std::vector<std::string> _idtfs;
+  std::vector<ScType> _types(count);
+  _idtfs.reserve(count);
+  for (bp::ssize_t i = 0; i < count; ++i)
+  {
+    bp::extract<std::string> se(idtfs[i]);
+    if (!se.check())
+      SC_THROW_EXCEPTION(utils::ExceptionInvalidType, "Identifiers should be instances of str");
+    _idtfs.emplace_back(static_cast<std::string>(se));
+
+    if (types.is_none())
+      continue;
+
+    bp::object const type = types[i];
+    if (type.is_none())
+      continue;
+
+    bp::extract<ScType> te(type);
+    if (!te.check())
+      SC_THROW_EXCEPTION(utils::ExceptionInvalidType, "Types should be None or instances of ScType");
+    _types[i] = static_cast<ScType>(te);
+  }
+
+  ScAddrVector result(count);
+  {
+    py::WithoutGIL noGIL;
+    for (bp::ssize_t i = 0; i < count; ++i)
+      result[i] = self.HelperResolveSystemIdtf(_idtfs[i], _types[i]);
+  }
+
+  bp::list resultList;
+  for (auto const & addr : result)
+    resultList.append(addr);
+
+  return resultList;
+}
+
+BOOST_PYTHON_FUNCTION_OVERLOADS(_context_helperResolveSysIdtfs_overload, _context_helperResolveSysIdtfs, 2, 3)
+
 bp::object _context_helperFindBySystemIdtf(ScMemoryContext & self, bp::object & idtf)
 {
   bp::extract<std::string> se(idtf);
@@ -735,7 +847,13 @@ private:
 bp::object _context_helperGenTemplate(ScMemoryContext & self, PyTemplate & templ, PyTemplateGenParams & params)
 {
   PyTemplateGenResult result;
-  if (self.HelperGenTemplate(templ.GetItemRef(), result.GetResultRef(), params.GetItemRef()))
+  bool generated;
+  {
+    py::WithoutGIL noGIL;
+    generated = self.HelperGenTemplate(templ.GetItemRef(), result.GetResultRef(), params.GetItemRef());
+  }
+
+  if (generated)
   {
     result.Update();
     return bp::object(result);
@@ -747,7 +865,10 @@ bp::object _context_helperGenTemplate(ScMemoryContext & self, PyTemplate & templ
 bp::object _context_helperSearchTemplate(ScMemoryContext & self, PyTemplate & templ)
 {
   PyTemplateSearchResult result;
-  self.HelperSearchTemplate(templ.GetItemRef(), result.GetResultRef());
+  {
+    py::WithoutGIL noGIL;
+    self.HelperSearchTemplate(templ.GetItemRef(), result.GetResultRef());
+  }
   result.Update();
   return bp::object(result);
 }
@@ -787,6 +908,12 @@ std::string GetConfigValue(std::string const & group, std::string const & key)
   return value ? std::string(value) : "";
 }
 
+std::string GetStorageGeneration()
+{
+  char const * value = sc_memory_get_storage_generation();
+  return value ? std::string(value) : "";
+}
+
 class ScAgentCommandImpl
 {
 public:
@@ -800,11 +927,68 @@ public:
     return ScAgentAction::CreateCommand(ctx, cmdClassAddr, _params);
   }
 
+  // commands - list of (cmdClassAddr, [params]) tuples
+  static bp::list CreateCommands(ScMemoryContext & ctx, bp::list commands)
+  {
+    std::vector<std::pair<ScAddr, ScAddrVector>> _commands;
+    bp::ssize_t const count = bp::len(commands);
+    _commands.reserve(count);
+    for (bp::ssize_t i = 0; i < count; ++i)
+    {
+      bp::object const cmd = commands[i];
+      bp::object const params = cmd[1];
+
+      ScAddrVector _params;
+      bp::ssize_t const paramsCount = bp::len(params);
+      for (bp::ssize_t j = 0; j < paramsCount; ++j)
+        _params.emplace_back(bp::extract<ScAddr>(params[j]));
+
+      _commands.emplace_back(bp::extract<ScAddr>(cmd[0]), std::move(_params));
+    }
+
+    ScAddrVector result;
+    result.reserve(_commands.size());
+    {
+      py::WithoutGIL noGIL;
+      for (auto const & cmd : _commands)
+        result.emplace_back(ScAgentAction::CreateCommand(ctx, cmd.first, cmd.second));
+    }
+
+    bp::list resultList;
+    for (auto const & addr : result)
+      resultList.append(addr);
+
+    return resultList;
+  }
+
   static bool RunCommand(ScMemoryContext & ctx, ScAddr const & cmdAddr)
   {
     return ScAgentAction::InitiateCommand(ctx, cmdAddr);
   }
 
+  static bp::list RunCommands(ScMemoryContext & ctx, bp::list cmdAddrs)
+  {
+    ScAddrVector _cmdAddrs;
+    bp::ssize_t const count = bp::len(cmdAddrs);
+    _cmdAddrs.reserve(count);
+    for (bp::ssize_t i = 0; i < count; ++i)
+      _cmdAddrs.emplace_back(bp::extract<ScAddr>(cmdAddrs[i]));
+
+    std::vector<bool> result;
+    result.reserve(_cmdAddrs.size());
+    {
+      py::WithoutGIL noGIL;
+      for (auto const & addr : _cmdAddrs)
+        result.push_back(ScAgentAction::InitiateCommand(ctx, addr));
+    }
+
+    bp::list resultList;
+    for (bool const r : result)
+      resultList.append(r);
+
+    return resultList;
+  }
+
   static bool RunCommandWait(ScMemoryContext & ctx, ScAddr const & cmdAddr, uint32_t waitTimeOutMS = 5000)
   {
     return ScAgentAction::InitiateCommandWait(ctx, cmdAddr, waitTimeOutMS);
@@ -816,6 +1000,399 @@ public:
   }
 };
 
+class ScSetImpl
+{
+public:
+  static bp::list HasMany(ScMemoryContext & ctx, ScAddr const & setAddr, bp::list elements)
+  {
+    ScAddrVector const _elements = ToAddrVector(elements);
+
+    std::vector<bool> result;
+    result.reserve(_elements.size());
+    {
+      py::WithoutGIL noGIL;
+      for (auto const & addr : _elements)
+        result.push_back(ctx.HelperCheckEdge(setAddr, addr, ScType::EdgeAccessConstPosPerm));
+    }
+
+    return ToList(result);
+  }
+
+  static bp::list AddMany(ScMemoryContext & ctx, ScAddr const & setAddr, bp::list elements)
+  {
+    ScAddrVector const _elements = ToAddrVector(elements);
+
+    std::vector<bool> result;
+    result.reserve(_elements.size());
+    {
+      py::WithoutGIL noGIL;
+      for (auto const & addr : _elements)
+        result.push_back(Add(ctx, setAddr, addr));
+    }
+
+    return ToList(result);
+  }
+
+  static bp::list RemoveMany(ScMemoryContext & ctx, ScAddr const & setAddr, bp::list elements)
+  {
+    ScAddrVector const _elements = ToAddrVector(elements);
+
+    std::vector<bool> result;
+    result.reserve(_elements.size());
+    {
+      py::WithoutGIL noGIL;
+      for (auto const & addr : _elements)
+      {
+        ScIterator3Ptr it = ctx.Iterator3(setAddr, ScType::EdgeAccessConstPosPerm, addr);
+        result.push_back(it->Next() && ctx.EraseElement(it->Get(1)));
+      }
+    }
+
+    return ToList(result);
+  }
+
+  // If targetAddr is valid, then result is added into it
+  static bp::list Union(
+      ScMemoryContext & ctx,
+      ScAddr const & setAddr,
+      ScAddr const & otherAddr,
+      ScAddr const & targetAddr)
+  {
+    return Apply(ctx, setAddr, otherAddr, targetAddr, Operation::Union);
+  }
+
+  static bp::list Intersect(
+      ScMemoryContext & ctx,
+      ScAddr const & setAddr,
+      ScAddr const & otherAddr,
+      ScAddr const & targetAddr)
+  {
+    return Apply(ctx, setAddr, otherAddr, targetAddr, Operation::Intersect);
+  }
+
+  static bp::list Difference(
+      ScMemoryContext & ctx,
+      ScAddr const & setAddr,
+      ScAddr const & otherAddr,
+      ScAddr const & targetAddr)
+  {
+    return Apply(ctx, setAddr, otherAddr, targetAddr, Operation::Difference);
+  }
+
+  // Returns number of unique elements with type elType in set
+  static size_t Count(ScMemoryContext & ctx, ScAddr const & setAddr, ScType const & elType)
+  {
+    py::WithoutGIL noGIL;
+
+    ScIterator3Ptr it = ctx.Iterator3(setAddr, ScType::EdgeAccessConstPosPerm, elType);
+    return CountUnique(it, 2);
+  }
+
+  // Returns number of unique elements with type elType, that are linked with addr by relation relAddr
+  static size_t CountRelation(
+      ScMemoryContext & ctx,
+      ScAddr const & addr,
+      ScAddr const & relAddr,
+      ScType const & elType)
+  {
+    py::WithoutGIL noGIL;
+
+    ScIterator5Ptr it =
+        ctx.Iterator5(addr, ScType::EdgeDCommonConst, elType, ScType::EdgeAccessConstPosPerm, relAddr);
+    return CountUnique(it, 2);
+  }
+
+  // Returns list of (source, edge, target, relation edge) tuples of all pairs of relation relAddr
+  static bp::list GetRelationPairs(ScMemoryContext & ctx, ScAddr const & relAddr)
+  {
+    std::vector<std::array<ScAddr, 4>> pairs;
+    {
+      py::WithoutGIL noGIL;
+
+      ScIterator3Ptr it = ctx.Iterator3(relAddr, ScType::EdgeAccessConstPosPerm, ScType::EdgeDCommonConst);
+      while (it->Next())
+      {
+        std::array<ScAddr, 4> item;
+        item[1] = it->Get(2);
+        item[3] = it->Get(1);
+        if (ctx.GetEdgeInfo(item[1], item[0], item[2]))
+          pairs.push_back(item);
+      }
+    }
+
+    bp::list result;
+    for (auto const & item : pairs)
+      result.append(bp::make_tuple(item[0], item[1], item[2], item[3]));
+
+    return result;
+  }
+
+private:
+  using AddrSet = std::unordered_set<ScAddr, ScAddrHashFunc<uint64_t>>;
+
+  enum class Operation : uint8_t
+  {
+    Union,
+    Intersect,
+    Difference
+  };
+
+  static ScAddrVector ToAddrVector(bp::list const & addrs)
+  {
+    ScAddrVector result;
+    bp::ssize_t const count = bp::len(addrs);
+    result.reserve(count);
+    for (bp::ssize_t i = 0; i < count; ++i)
+      result.emplace_back(bp::extract<ScAddr>(addrs[i]));
+
+    return result;
+  }
+
+  template <typename T>
+  static bp::list ToList(std::vector<T> const & values)
+  {
+    bp::list result;
+    for (auto const & value : values)
+      result.append(static_cast<T>(value));
+
+    return result;
+  }
+
+  template <typename TIteratorType>
+  static size_t CountUnique(TIteratorType const & it, size_t index)
+  {
+    AddrSet elements;
+    while (it->Next())
+      elements.insert(it->Get(index));
+
+    return elements.size();
+  }
+
+  static bool Add(ScMemoryContext & ctx, ScAddr const & setAddr, ScAddr const & addr)
+  {
+    if (ctx.HelperCheckEdge(setAddr, addr, ScType::EdgeAccessConstPosPerm))
+      return false;
+
+    return ctx.CreateEdge(ScType::EdgeAccessConstPosPerm, setAddr, addr).IsValid();
+  }
+
+  // Returns unique elements of set in order of iteration
+  static ScAddrVector GetElements(ScMemoryContext & ctx, ScAddr const & setAddr, AddrSet & elements)
+  {
+    ScAddrVector result;
+    ScIterator3Ptr it = ctx.Iterator3(setAddr, ScType::EdgeAccessConstPosPerm, ScType::Unknown);
+    while (it->Next())
+    {
+      ScAddr const addr = it->Get(2);
+      if (elements.insert(addr).second)
+        result.push_back(addr);
+    }
+
+    return result;
+  }
+
+  static bp::list Apply(
+      ScMemoryContext & ctx,
+      ScAddr const & setAddr,
+      ScAddr const & otherAddr,
+      ScAddr const & targetAddr,
+      Operation op)
+  {
+    ScAddrVector result;
+    {
+      py::WithoutGIL noGIL;
+
+      AddrSet elements;
+      ScAddrVector const setElements = GetElements(ctx, setAddr, elements);
+
+      AddrSet otherElementsSet;
+      ScAddrVector const otherElements = GetElements(ctx, otherAddr, otherElementsSet);
+
+      switch (op)
+      {
+      case Operation::Union:
+        result = setElements;
+        for (auto const & addr : otherElements)
+        {
+          if (elements.find(addr) == elements.end())
+            result.push_back(addr);
+        }
+        break;
+
+      case Operation::Intersect:
+        for (auto const & addr : setElements)
+        {
+          if (otherElementsSet.find(addr) != otherElementsSet.end())
+            result.push_back(addr);
+        }
+        break;
+
+      case Operation::Difference:
+        for (auto const & addr : setElements)
+        {
+          if (otherElementsSet.find(addr) == otherElementsSet.end())
+            result.push_back(addr);
+        }
+        break;
+      }
+
+      if (targetAddr.IsValid())
+      {
+        for (auto const & addr : result)
+          Add(ctx, targetAddr, addr);
+      }
+    }
+
+    return ToList(result);
+  }
+};
+
+class ScHelperImpl
+{
+public:
+  // values - list of (relAddr, value) tuples, where value is ScAddr, int, float or str
+  static bool UpdateStructureValues(ScMemoryContext & ctx, ScAddr const & structAddr, bp::list values)
+  {
+    std::vector<StructValue> _values;
+    bp::ssize_t const count = bp::len(values);
+    _values.reserve(count);
+    for (bp::ssize_t i = 0; i < count; ++i)
+    {
+      bp::object const item = values[i];
+      _values.emplace_back(bp::extract<ScAddr>(item[0]), item[1]);
+    }
+
+    py::WithoutGIL noGIL;
+
+    // relation -> (edge, target) of existing values
+    std::unordered_map<ScAddr, std::pair<ScAddr, ScAddr>, ScAddrHashFunc<uint64_t>> existing;
+    ScIterator5Ptr it = ctx.Iterator5(
+        structAddr, ScType::EdgeAccessConstPosPerm, ScType::Unknown, ScType::EdgeAccessConstPosPerm, ScType::Unknown);
+    while (it->Next())
+      existing.emplace(it->Get(4), std::make_pair(it->Get(1), it->Get(2)));
+
+    bool result = true;
+    for (auto const & value : _values)
+    {
+      auto found = existing.find(value.m_relAddr);
+      bool const hasLink = found != existing.end() && ctx.GetElementType(found->second.second).IsLink();
+
+      if (value.m_kind == StructValue::Kind::Addr)
+      {
+        if (found != existing.end() && found->second.second == value.m_addr)
+          continue;
+
+        // link is a value of structure, but other elements can be used somewhere else
+        if (found != existing.end())
+          ctx.EraseElement(hasLink ? found->second.second : found->second.first);
+
+        ScAddr const edge = CreateValue(ctx, structAddr, value.m_relAddr, value.m_addr);
+        result = edge.IsValid() && result;
+        existing[value.m_relAddr] = std::make_pair(edge, value.m_addr);
+        continue;
+      }
+
+      if (hasLink)
+      {
+        result = value.SetContent(ctx, found->second.second) && result;
+        continue;
+      }
+
+      if (found != existing.end())
+        ctx.EraseElement(found->second.first);
+
+      ScAddr const linkAddr = ctx.CreateLink();
+      result = value.SetContent(ctx, linkAddr) && result;
+
+      ScAddr const edge = CreateValue(ctx, structAddr, value.m_relAddr, linkAddr);
+      result = edge.IsValid() && result;
+      existing[value.m_relAddr] = std::make_pair(edge, linkAddr);
+    }
+
+    return result;
+  }
+
+private:
+  struct StructValue
+  {
+    enum class Kind : uint8_t
+    {
+      Addr,
+      Int,
+      Float,
+      String
+    };
+
+    StructValue(ScAddr const & relAddr, bp::object const & value)
+      : m_relAddr(relAddr)
+    {
+      bp::extract<ScAddr> a(value);
+      bp::extract<int32_t> i(value);
+      bp::extract<double> d(value);
+      bp::extract<std::string> s(value);
+
+      if (a.check())
+      {
+        m_kind = Kind::Addr;
+        m_addr = a;
+      }
+      else if (i.check())
+      {
+        m_kind = Kind::Int;
+        m_int = i;
+      }
+      else if (d.check())
+      {
+        m_kind = Kind::Float;
+        m_float = d;
+      }
+      else if (s.check())
+      {
+        m_kind = Kind::String;
+        m_string = static_cast<std::string>(s);
+      }
+      else
+        SC_THROW_EXCEPTION(utils::ExceptionInvalidType, "Values should be instances of ScAddr, int, float or str");
+    }
+
+    bool SetContent(ScMemoryContext & ctx, ScAddr const & linkAddr) const
+    {
+      ScLink link(ctx, linkAddr);
+      switch (m_kind)
+      {
+      case Kind::Int:
+        return link.Set(m_int);
+      case Kind::Float:
+        return link.Set(m_float);
+      case Kind::String:
+        return ctx.SetLinkContent(linkAddr, ScStreamMakeRead(m_string));
+      default:
+        return false;
+      }
+    }
+
+    ScAddr m_relAddr;
+    Kind m_kind = Kind::Addr;
+    ScAddr m_addr;
+    int32_t m_int = 0;
+    double m_float = 0.0;
+    std::string m_string;
+  };
+
+  static ScAddr CreateValue(
+      ScMemoryContext & ctx,
+      ScAddr const & structAddr,
+      ScAddr const & relAddr,
+      ScAddr const & addr)
+  {
+    ScAddr const edge = ctx.CreateEdge(ScType::EdgeAccessConstPosPerm, structAddr, addr);
+    if (edge.IsValid() && ctx.CreateEdge(ScType::EdgeAccessConstPosPerm, relAddr, edge).IsValid())
+      return edge;
+
+    return ScAddr();
+  }
+};
+
 }  // namespace impl
 
 BOOST_PYTHON_MEMBER_FUNCTION_OVERLOADS(ScMemoryContext_CreateLink_overload, ScMemoryContext::CreateLink, 0, 1)
@@ -826,10 +1403,12 @@ BOOST_PYTHON_MODULE(sc)
 
   def("ScAddrFromHash", bp::make_function(&impl::ScAddrFromHash));
   def("getScConfigValue", bp::make_function(&impl::GetConfigValue));
+  def("getScStorageGeneration", bp::make_function(&impl::GetStorageGeneration));
 
   bp::class_<ScMemoryContext, boost::noncopyable>("ScMemoryContext", bp::no_init)
       .def("Create", &impl::_context_CreateInstance, bp::return_value_policy<bp::manage_new_object>())
       .staticmethod("Create")
+      .def("Destroy", &ScMemoryContext::Destroy)
       .def("CreateNode", &ScMemoryContext::CreateNode, bp::return_value_policy<bp::return_by_value>())
       .def("CreateEdge", &ScMemoryContext::CreateEdge)
       .def(
@@ -847,6 +1426,10 @@ BOOST_PYTHON_MODULE(sc)
       .def("Iterator3", impl::_context_iterator3)
       .def("Iterator5", impl::_context_iterator5)
       .def("HelperResolveSystemIdtf", impl::_context_helperResolveSysIdtf)
+      .def(
+          "HelperResolveSystemIdtfs",
+          impl::_context_helperResolveSysIdtfs,
+          impl::_context_helperResolveSysIdtfs_overload(bp::args("idtfs", "types")))
       .def("HelperSetSystemIdtf", &ScMemoryContext::HelperSetSystemIdtf)
       .def("HelperGetSystemIdtf", &ScMemoryContext::HelperGetSystemIdtf)
       .def("HelperFindBySystemIdtf", impl::_context_helperFindBySystemIdtf)
@@ -858,12 +1441,18 @@ BOOST_PYTHON_MODULE(sc)
   bp::class_<impl::PyIterator3, boost::shared_ptr<impl::PyIterator3>, boost::noncopyable>("ScIterator3", bp::no_init)
       .def("Next", &impl::PyIterator3::Next)
       .def("IsValid", &impl::PyIterator3::IsValid)
-      .def("Get", &impl::PyIterator3::Get);
+      .def("Get", &impl::PyIterator3::Get)
+      .def("NextBatch", &impl::PyIterator3::NextBatch)
+      .def("NextBatchAt", &impl::PyIterator3::NextBatchAt)
+      .def("NextBatchHashes", &impl::PyIterator3::NextBatchHashes);
 
   bp::class_<impl::PyIterator5, boost::shared_ptr<impl::PyIterator5>>("ScIterator5", bp::no_init)
       .def("Next", &impl::PyIterator5::Next)
       .def("IsValid", &impl::PyIterator5::IsValid)
-      .def("Get", &impl::PyIterator5::Get);
+      .def("Get", &impl::PyIterator5::Get)
+      .def("NextBatch", &impl::PyIterator5::NextBatch)
+      .def("NextBatchAt", &impl::PyIterator5::NextBatchAt)
+      .def("NextBatchHashes", &impl::PyIterator5::NextBatchHashes);
 
   bp::class_<impl::PyLinkContent>("ScLinkContent", bp::no_init)
       .def("AsString", &impl::PyLinkContent::AsString)
@@ -1004,12 +1593,40 @@ BOOST_PYTHON_MODULE(sc)
   bp::class_<impl::ScAgentCommandImpl>("ScAgentCommandImpl", bp::no_init)
       .def("CreateCommand", &impl::ScAgentCommandImpl::CreateCommand)
       .staticmethod("CreateCommand")
+      .def("CreateCommands", &impl::ScAgentCommandImpl::CreateCommands)
+      .staticmethod("CreateCommands")
       .def("RunCommand", &impl::ScAgentCommandImpl::RunCommand)
       .staticmethod("RunCommand")
+      .def("RunCommands", &impl::ScAgentCommandImpl::RunCommands)
+      .staticmethod("RunCommands")
       .def("RunCommandWait", &impl::ScAgentCommandImpl::RunCommandWait)
       .staticmethod("RunCommandWait")
       .def("GetCommandResultAddr", &impl::ScAgentCommandImpl::GetCommandResultAddr)
       .staticmethod("GetCommandResultAddr");
+
+  bp::class_<impl::ScSetImpl>("ScSetImpl", bp::no_init)
+      .def("HasMany", &impl::ScSetImpl::HasMany)
+      .staticmethod("HasMany")
+      .def("AddMany", &impl::ScSetImpl::AddMany)
+      .staticmethod("AddMany")
+      .def("RemoveMany", &impl::ScSetImpl::RemoveMany)
+      .staticmethod("RemoveMany")
+      .def("Union", &impl::ScSetImpl::Union)
+      .staticmethod("Union")
+      .def("Intersect", &impl::ScSetImpl::Intersect)
+      .staticmethod("Intersect")
+      .def("Difference", &impl::ScSetImpl::Difference)
+      .staticmethod("Difference")
+      .def("Count", &impl::ScSetImpl::Count)
+      .staticmethod("Count")
+      .def("CountRelation", &impl::ScSetImpl::CountRelation)
+      .staticmethod("CountRelation")
+      .def("GetRelationPairs", &impl::ScSetImpl::GetRelationPairs)
+      .staticmethod("GetRelationPairs");
+
+  bp::class_<impl::ScHelperImpl>("ScHelperImpl", bp::no_init)
+      .def("UpdateStructureValues", &impl::ScHelperImpl::UpdateStructureValues)
+      .staticmethod("UpdateStructureValues");
 }
 
 }  // namespace